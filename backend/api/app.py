@@ -7,6 +7,8 @@ import time
 import threading
 import uuid
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 import requests
@@ -19,6 +21,12 @@ load_dotenv()
 # Add path for importing our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from opencart_client.http_session import get_shared_session
+from pdf_processor.extraction_cache import get_shared_extraction_cache, get_shared_llm_cache
+from pdf_processor.text_chunker import split_into_chunks, merge_products
+from pdf_processor.table_parser import TableParser
+from api.async_processor import async_processor
+
 # Import SqlLantern integration modules
 try:
     from database_manager import initialize_database, get_database_manager
@@ -57,18 +65,208 @@ last_update_time = None
 
 # ========== AI PROCESSING FUNCTIONS ==========
 
+def parse_openai_products_response(products_text):
+    """Strip markdown from an OpenAI response and parse the JSON product array"""
+    products_text = products_text.strip()
+    
+    # Enhanced cleanup of OpenAI response to handle markdown properly
+    # Remove markdown code blocks more robustly
+    products_text = re.sub(r'^```json\s*', '', products_text)
+    products_text = re.sub(r'^```\s*', '', products_text)
+    products_text = re.sub(r'```\s*$', '', products_text)
+    
+    # Find JSON array boundaries more precisely
+    start_idx = products_text.find('[')
+    end_idx = products_text.rfind(']')
+    
+    if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+        products_text = products_text[start_idx:end_idx+1]
+    
+    products_text = products_text.strip()
+    
+    # Parse JSON with better error context
+    try:
+        products = json.loads(products_text)
+    except json.JSONDecodeError as parse_error:
+        print(f"Ã°ÂŸÂ’Â¥ JSON parsing failed. Raw response preview: {products_text[:200]}...")
+        raise json.JSONDecodeError(f"OpenAI returned invalid JSON: {str(parse_error)}", products_text, parse_error.pos)
+    return products
+
+def extract_products_with_openai(client, system_prompt, build_prompt, chunks):
+    """Send chunk prompts to OpenAI concurrently and merge the products by model"""
+    if not chunks:
+        return []
+
+    max_in_flight = int(os.getenv('OPENAI_MAX_IN_FLIGHT', 4))
+    model = "gpt-3.5-turbo"
+    temperature = 0.1
+
+    # Responses are cached per chunk; the key changes with the prompt wording
+    llm_cache = get_shared_llm_cache()
+    prompt_version = llm_cache.prompt_version(system_prompt, build_prompt(''))
+
+    def extract_chunk(chunk_text):
+        cache_key = llm_cache.make_key(chunk_text, model, prompt_version, temperature)
+        products_text = llm_cache.get_response(cache_key)
+        if products_text is not None:
+            return parse_openai_products_response(products_text)
+
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": build_prompt(chunk_text)}
+            ],
+            max_tokens=4000,
+            temperature=temperature
+        )
+        products_text = response.choices[0].message.content
+
+        # Only responses that parse are worth keeping
+        products = parse_openai_products_response(products_text)
+        llm_cache.put_response(cache_key, products_text)
+        return products
+
+    # executor.map keeps chunk order, so merged products follow the document
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(chunks)))) as executor:
+        chunk_products = list(executor.map(extract_chunk, chunks))
+
+    print(f"🧩 Merged products from {len(chunks)} chunks")
+    return merge_products(chunk_products)
+
+def process_upload_cached(file, kind, process):
+    """Run an upload processor, reusing the stored result for byte-identical files"""
+    try:
+        cache = get_shared_extraction_cache()
+        # An earlier processor may already have consumed the upload stream
+        file.seek(0)
+        content_hash = cache.hash_bytes(file.read())
+        file.seek(0)
+    except Exception as e:
+        print(f"⚠️ Extraction cache unavailable: {e}")
+        return process(file)
+
+    cached = cache.get(content_hash, kind)
+    if cached is not None:
+        print(f"⚡ Upload cache hit for {file.filename} ({content_hash[:12]})")
+        return {**cached, 'filename': file.filename, 'content_hash': content_hash, 'cache_hit': True}
+
+    result = process(file)
+    if result.get('status') == 'success':
+        cache.put(content_hash, kind, result)
+    return {**result, 'content_hash': content_hash, 'cache_hit': False}
+
+def map_spreadsheet_headers_with_openai(headers):
+    """Ask OpenAI which column holds which product field; only the header cells are sent"""
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        return {}
+
+    import openai
+
+    model = "gpt-3.5-turbo"
+    temperature = 0.0
+    system_prompt = "You map spreadsheet column headers to product fields. Return only a JSON object."
+
+    def build_prompt(headers_json):
+        return f"""
+            Map these pricelist column headers to the product fields
+            sku, model, name, description, price, old_price, category, manufacturer, quantity.
+            
+            - "price" is the current retail price, "old_price" the previous retail price
+            - Dealer, cost or trade prices are not retail prices
+            - Use each header at most once and leave out fields without a matching column
+            
+            Headers: {headers_json}
+            
+            Return a JSON object of field -> header, with headers exactly as given.
+            """
+
+    headers_json = json.dumps(headers)
+    llm_cache = get_shared_llm_cache()
+    cache_key = llm_cache.make_key(
+        headers_json, model, llm_cache.prompt_version(system_prompt, build_prompt('')), temperature
+    )
+    mapping_text = llm_cache.get_response(cache_key)
+    if mapping_text is None:
+        client = openai.OpenAI(api_key=api_key)
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": build_prompt(headers_json)}
+            ],
+            max_tokens=300,
+            temperature=temperature
+        )
+        mapping_text = response.choices[0].message.content
+
+    start_idx = mapping_text.find('{')
+    end_idx = mapping_text.rfind('}')
+    if start_idx == -1 or end_idx <= start_idx:
+        return {}
+    mapping = json.loads(mapping_text[start_idx:end_idx + 1])
+    llm_cache.put_response(cache_key, mapping_text)
+    return mapping
+
+def process_spreadsheet_file(file):
+    """Import an Excel/CSV pricelist natively: header detection, column mapping and vectorized price cleaning"""
+    try:
+        from pdf_processor.spreadsheet_parser import SpreadsheetParser
+
+        file_extension = os.path.splitext(file.filename)[1].lower()
+        fd, tmp_file_path = tempfile.mkstemp(suffix=file_extension)
+
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                file.save(tmp_file)
+
+            # The LLM only ever sees the header cells, and only when the labels can't be mapped
+            header_mapper = map_spreadsheet_headers_with_openai if os.getenv('OPENAI_API_KEY') else None
+            result = SpreadsheetParser(header_mapper=header_mapper).parse_file(tmp_file_path)
+
+            if not result['success']:
+                return {'status': 'error', 'error': result['error']}
+            if not result['products']:
+                return {'status': 'error', 'error': 'No products found in spreadsheet'}
+
+            products = result['products']
+            print(f"📊 Spreadsheet imported natively: {len(products)} products from {result['rows_processed']} rows")
+
+            return {
+                'status': 'success',
+                'message': f'Spreadsheet processed successfully - {len(products)} products found',
+                'filename': file.filename,
+                'extraction_method': 'native_spreadsheet',
+                'rows_processed': result['rows_processed'],
+                'header_row': result['header_row'],
+                'column_map': result['column_map'],
+                'column_mapping': result['column_mapping'],
+                'products_found': len(products),
+                'products': products,
+                'validation': {
+                    'total_products': len(products),
+                    'valid_products': len(products),
+                    'invalid_products': 0,
+                    'warnings': [],
+                    'errors': []
+                }
+            }
+
+        finally:
+            if os.path.exists(tmp_file_path):
+                try:
+                    os.unlink(tmp_file_path)
+                except:
+                    pass
+
+    except Exception as e:
+        print(f"⚠️ Native spreadsheet import error: {e}")
+        return {'status': 'error', 'error': str(e)}
+
 def process_pdf_with_openai(file):
-    """Process PDF using OpenAI API"""
+    """Process PDF from its table layout, falling back to the OpenAI API"""
     try:
-        import openai
-        
-        # Check if OpenAI API key is configured
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            return {'status': 'error', 'error': 'OpenAI API key not configured'}
-        
-        print("Ã°ÂŸÂ¤Â– Using OpenAI to process PDF...")
-        
         # Save file temporarily
         fd, tmp_file_path = tempfile.mkstemp(suffix='.pdf')
         
@@ -82,6 +280,7 @@ def process_pdf_with_openai(file):
                 text_content = ""
                 with open(tmp_file_path, 'rb') as pdf_file:
                     pdf_reader = PyPDF2.PdfReader(pdf_file)
+                    page_count = len(pdf_reader.pages)
                     for page in pdf_reader.pages:
                         text_content += page.extract_text() + "\n"
                         
@@ -93,10 +292,43 @@ def process_pdf_with_openai(file):
             if not text_content.strip():
                 return {'status': 'error', 'error': 'No text could be extracted from PDF'}
             
-            # Use OpenAI to parse the products
+            # Clean tables parse locally, no OpenAI call needed
+            table_result = TableParser().parse(text_content)
+            if table_result['success'] and table_result['products_found'] >= 3:
+                products = table_result['products']
+                print(f"📊 Table parser extracted {len(products)} products from PDF")
+                return {
+                    'status': 'success',
+                    'message': f'PDF processed successfully from its table layout - {len(products)} products found',
+                    'filename': file.filename,
+                    'extraction_method': 'table_parsing',
+                    'page_count': page_count,
+                    'products_found': len(products),
+                    'products': products,
+                    'validation': {
+                        'total_products': len(products),
+                        'valid_products': len(products),
+                        'invalid_products': 0,
+                        'warnings': [],
+                        'errors': []
+                    },
+                    'note': '📊 Parsed locally from the pricelist table'
+                }
+            
+            import openai
+            
+            # Check if OpenAI API key is configured
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                return {'status': 'error', 'error': 'OpenAI API key not configured'}
+            
+            print("Ã°ÂŸÂ¤Â– Using OpenAI to process PDF...")
+            
+            # Use OpenAI to parse the products, one request per chunk of pages
             client = openai.OpenAI(api_key=api_key)
             
-            prompt = f"""
+            def build_prompt(chunk_text):
+                return f"""
             Extract audio equipment product information from this pricelist text.
             Return a JSON array of products with this exact structure:
             
@@ -118,48 +350,19 @@ def process_pdf_with_openai(file):
             - If no clear category, use "Audio Equipment"
             
             Text to parse:
-            {text_content[:12000]}
+            {chunk_text}
             
             Return only the JSON array, no other text.
             """
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert at parsing product data from pricelists. Return only valid JSON array of products. Extract ALL products found."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=4000,
-                temperature=0.1
+            chunks = split_into_chunks(text_content)
+            products = extract_products_with_openai(
+                client,
+                "You are an expert at parsing product data from pricelists. Return only valid JSON array of products. Extract ALL products found.",
+                build_prompt,
+                chunks
             )
             
-            # Parse the response
-            products_text = response.choices[0].message.content.strip()
-            
-            # Enhanced cleanup of OpenAI response to handle markdown properly
-            import re
-            
-            # Remove markdown code blocks more robustly
-            products_text = re.sub(r'^```json\s*', '', products_text)
-            products_text = re.sub(r'^```\s*', '', products_text)
-            products_text = re.sub(r'```\s*$', '', products_text)
-            
-            # Find JSON array boundaries more precisely
-            start_idx = products_text.find('[')
-            end_idx = products_text.rfind(']')
-            
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                products_text = products_text[start_idx:end_idx+1]
-            
-            products_text = products_text.strip()
-            
-            # Parse JSON with better error context
-            try:
-                products = json.loads(products_text)
-            except json.JSONDecodeError as parse_error:
-                print(f"Ã°ÂŸÂ’Â¥ JSON parsing failed. Raw response preview: {products_text[:200]}...")
-                raise json.JSONDecodeError(f"OpenAI returned invalid JSON: {str(parse_error)}", products_text, parse_error.pos)
-            
             print(f"Ã¢ÂœÂ… OpenAI extracted {len(products)} products from PDF")
             
             return {
@@ -167,7 +370,7 @@ def process_pdf_with_openai(file):
                 'message': f'PDF processed successfully with OpenAI - {len(products)} products found',
                 'filename': file.filename,
                 'extraction_method': 'openai_gpt',
-                'page_count': len(text_content.split('\f')),
+                'page_count': page_count,
                 'products_found': len(products),
                 'products': products,
                 'validation': {
@@ -195,7 +398,7 @@ def process_pdf_with_openai(file):
             'error': f'OpenAI returned invalid JSON format: {str(je)}',
             'details': {
                 'error_position': je.pos if hasattr(je, 'pos') else None,
-                'response_preview': products_text[:200] if 'products_text' in locals() else 'N/A',
+                'response_preview': je.doc[:200] if getattr(je, 'doc', None) else 'N/A',
                 'suggestion': 'The PDF content may be too complex for OpenAI to parse. Try a cleaner PDF or check OpenAI API status.'
             }
         }
@@ -230,11 +433,13 @@ def process_excel_with_openai(file):
                     df = pd.read_excel(tmp_file_path, engine='openpyxl')
                 elif file_extension == '.xls':
                     df = pd.read_excel(tmp_file_path, engine='xlrd')
+                elif file_extension == '.csv':
+                    df = pd.read_csv(tmp_file_path, sep=None, engine='python')
                 else:
                     return {'status': 'error', 'error': 'Unsupported Excel format'}
                 
                 # Convert DataFrame to string for OpenAI
-                excel_content = df.to_string(max_rows=200)  # Limit rows to avoid token limits
+                excel_content = df.to_string()
                 print(f"Ã°ÂŸÂ“ÂŠ Extracted {len(df)} rows from Excel file")
                 
             except Exception as e:
@@ -243,10 +448,11 @@ def process_excel_with_openai(file):
             if df.empty:
                 return {'status': 'error', 'error': 'Excel file is empty'}
             
-            # Use OpenAI to parse the products
+            # Use OpenAI to parse the products, one request per chunk of rows
             client = openai.OpenAI(api_key=api_key)
             
-            prompt = f"""
+            def build_prompt(chunk_text):
+                return f"""
             Extract audio equipment product information from this Excel data.
             Return a JSON array of products with this exact structure:
             
@@ -269,48 +475,21 @@ def process_excel_with_openai(file):
             - If no clear category, use "Audio Equipment"
             
             Excel data to parse:
-            {excel_content[:12000]}
+            {chunk_text}
             
             Return only the JSON array, no other text.
             """
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert at parsing product data from Excel spreadsheets. Return only valid JSON array of products. Extract ALL products found."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=4000,
-                temperature=0.1
+            # Every chunk repeats the column header row
+            excel_lines = excel_content.split('\n')
+            chunks = split_into_chunks('\n'.join(excel_lines[1:]), header_lines=excel_lines[:1])
+            products = extract_products_with_openai(
+                client,
+                "You are an expert at parsing product data from Excel spreadsheets. Return only valid JSON array of products. Extract ALL products found.",
+                build_prompt,
+                chunks
             )
             
-            # Parse the response
-            products_text = response.choices[0].message.content.strip()
-            
-            # Enhanced cleanup of OpenAI response to handle markdown properly
-            import re
-            
-            # Remove markdown code blocks more robustly
-            products_text = re.sub(r'^```json\s*', '', products_text)
-            products_text = re.sub(r'^```\s*', '', products_text)
-            products_text = re.sub(r'```\s*$', '', products_text)
-            
-            # Find JSON array boundaries more precisely
-            start_idx = products_text.find('[')
-            end_idx = products_text.rfind(']')
-            
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                products_text = products_text[start_idx:end_idx+1]
-            
-            products_text = products_text.strip()
-            
-            # Parse JSON with better error context
-            try:
-                products = json.loads(products_text)
-            except json.JSONDecodeError as parse_error:
-                print(f"Ã°ÂŸÂ’Â¥ JSON parsing failed. Raw response preview: {products_text[:200]}...")
-                raise json.JSONDecodeError(f"OpenAI returned invalid JSON: {str(parse_error)}", products_text, parse_error.pos)
-            
             print(f"Ã¢ÂœÂ… OpenAI extracted {len(products)} products from Excel")
             
             return {
@@ -346,7 +525,7 @@ def process_excel_with_openai(file):
             'error': f'OpenAI returned invalid JSON format: {str(je)}',
             'details': {
                 'error_position': je.pos if hasattr(je, 'pos') else None,
-                'response_preview': products_text[:200] if 'products_text' in locals() else 'N/A',
+                'response_preview': je.doc[:200] if getattr(je, 'doc', None) else 'N/A',
                 'suggestion': 'The Excel content may be too complex for OpenAI to parse. Try a cleaner file or check OpenAI API status.'
             }
         }
@@ -354,142 +533,13 @@ def process_excel_with_openai(file):
         print(f"Ã°ÂŸÂ’Â¥ OpenAI processing error: {e}")
         return {'status': 'error', 'error': str(e)}
 
-# ========== ASYNC PROCESSOR CLASS ==========
-
-class AsyncProcessor:
-    """Handle async PDF processing"""
-    
-    def __init__(self):
-        self.jobs = {}  # In-memory storage (use Redis in production)
-    
-    def start_processing(self, file, filename: str) -> str:
-        """Start async PDF processing"""
-        job_id = str(uuid.uuid4())
-        
-        # Initialize job status
-        self.jobs[job_id] = {
-            'id': job_id,
-            'filename': filename,
-            'status': 'processing',
-            'started_at': datetime.now().isoformat(),
-            'progress': 0,
-            'result': None,
-            'error': None
-        }
-        
-        # Start processing in background thread
-        thread = threading.Thread(
-            target=self._process_file,
-            args=(job_id, file, filename)
-        )
-        thread.daemon = True
-        thread.start()
-        
-        return job_id
-    
-    def get_status(self, job_id: str) -> dict:
-        """Get processing status"""
-        return self.jobs.get(job_id, {
-            'id': job_id,
-            'status': 'not_found',
-            'error': 'Job not found'
-        })
-    
-    def _process_file(self, job_id: str, file, filename: str):
-        """Process file in background"""
-        tmp_file_path = None
-        
-        try:
-            # Update progress
-            self.jobs[job_id]['progress'] = 10
-            self.jobs[job_id]['status'] = 'extracting_text'
-            
-            # Save temp file
-            fd, tmp_file_path = tempfile.mkstemp(suffix='.pdf')
-            
-            with os.fdopen(fd, 'wb') as tmp_file:
-                file.save(tmp_file)
-            
-            time.sleep(0.1)  # Ensure file is written
-            
-            # Update progress
-            self.jobs[job_id]['progress'] = 30
-            
-            # Import processing modules
-            try:
-                from pdf_processor.ocr_extractor import OCRExtractor
-                from pdf_processor.data_parser import DataParser
-                from pdf_processor.data_validator import DataValidator
-            except ImportError as ie:
-                self.jobs[job_id]['status'] = 'error'
-                self.jobs[job_id]['error'] = f'Import error: {str(ie)}'
-                return
-            
-            # Extract text
-            self.jobs[job_id]['progress'] = 50
-            self.jobs[job_id]['status'] = 'extracting_text'
-            
-            extractor = OCRExtractor()
-            extraction_result = extractor.extract_text_from_pdf(tmp_file_path)
-            
-            if not extraction_result['success']:
-                self.jobs[job_id]['status'] = 'error'
-                self.jobs[job_id]['error'] = extraction_result['error']
-                return
-            
-            # Parse products
-            self.jobs[job_id]['progress'] = 70
-            self.jobs[job_id]['status'] = 'parsing_products'
-            
-            parser = DataParser()
-            parsing_result = parser.parse_text(extraction_result['text'])
-            
-            if not parsing_result['success']:
-                self.jobs[job_id]['status'] = 'error'
-                self.jobs[job_id]['error'] = parsing_result['error']
-                return
-            
-            # Validate products
-            self.jobs[job_id]['progress'] = 90
-            self.jobs[job_id]['status'] = 'validating_data'
-            
-            validator = DataValidator()
-            cleaned_products = []
-            for product in parsing_result['products']:
-                cleaned_product = validator.clean_product_data(product)
-                cleaned_products.append(cleaned_product)
-            
-            validation_result = validator.validate_product_batch(cleaned_products)
-            
-            # Complete
-            self.jobs[job_id]['progress'] = 100
-            self.jobs[job_id]['status'] = 'completed'
-            self.jobs[job_id]['completed_at'] = datetime.now().isoformat()
-            self.jobs[job_id]['result'] = {
-                'products_found': len(cleaned_products),
-                'products': cleaned_products,
-                'validation': validation_result,
-                'extraction_method': extraction_result['method']
-            }
-            
-        except Exception as e:
-            self.jobs[job_id]['status'] = 'error'
-            self.jobs[job_id]['error'] = str(e)
-            
-        finally:
-            # Cleanup
-            if tmp_file_path and os.path.exists(tmp_file_path):
-                try:
-                    os.unlink(tmp_file_path)
-                except:
-                    pass
-
 # ========== OPENCART CLIENT ==========
 
 class SimpleOpenCartClient:
     """Simple OpenCart API Client with LetsCMS support"""
 
-    def __init__(self):
+    def __init__(self, session=None):
+        self.session = session or get_shared_session()
         self.base_url = os.getenv('OPENCART_BASE_URL', 'https://www.audicoonline.co.za')
         self.basic_token = os.getenv('OPENCART_BASIC_TOKEN', 'b2NyZXN0YXBpX29hdXRoX2NsaWVudDpvY3Jlc3RhcGlfb2F1dGhfc2VjcmV0')
 
@@ -503,7 +553,7 @@ class SimpleOpenCartClient:
         """Test API connection"""
         try:
             url = f"{self.base_url}/index.php?route=ocrestapi/product/listing&limit=1"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.session.get(url, headers=self.headers, timeout=30)
 
             return {
                 'success': response.status_code == 200,
@@ -519,11 +569,13 @@ class SimpleOpenCartClient:
                 'url': f"{self.base_url}/index.php?route=ocrestapi/product/listing"
             }
 
-    def get_products(self, limit=20):
-        """Get products from OpenCart"""
+    def get_products(self, limit=20, page=None):
+        """Get products from OpenCart (one listing page)"""
         try:
             url = f"{self.base_url}/index.php?route=ocrestapi/product/listing&limit={limit}"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            if page:
+                url += f"&page={page}"
+            response = self.session.get(url, headers=self.headers, timeout=30)
             
             if response.status_code == 200:
                 try:
@@ -567,7 +619,7 @@ class SimpleOpenCartClient:
             url = f"{self.base_url}/index.php?route=ocrestapi/product/listing&search={search_term_encoded}"
             
             print(f"Ã°ÂŸÂ”Â Searching with URL: {url}")
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.session.get(url, headers=self.headers, timeout=30)
             
             print(f"Ã°ÂŸÂ“ÂŠ Search response status: {response.status_code}")
             
@@ -623,12 +675,21 @@ class SimpleOpenCartClient:
 
 # Initialize clients
 opencart_client = SimpleOpenCartClient()
-async_processor = AsyncProcessor()
+
+# Local catalog snapshot (optional)
+try:
+    from opencart_client.catalog_snapshot import CatalogSnapshot
+    catalog_snapshot = CatalogSnapshot(opencart_client)
+    catalog_snapshot_available = True
+except Exception as e:
+    catalog_snapshot = None
+    catalog_snapshot_available = False
+    print(f"Catalog snapshot not available: {e}")
 
 # Import workflow manager (optional)
 try:
     from workflow_engine.workflow_manager import WorkflowManager
-    workflow_manager = WorkflowManager(opencart_client)
+    workflow_manager = WorkflowManager(opencart_client, catalog_snapshot=catalog_snapshot)
     workflow_available = True
 except ImportError:
     workflow_manager = None
@@ -686,8 +747,11 @@ def health_check():
             "environment": os.getenv('FLASK_ENV', 'development'),
             "opencart_config": {
                 "base_url": os.getenv('OPENCART_BASE_URL'),
-                "api_configured": bool(os.getenv('OPENCART_BASIC_TOKEN'))
+                "api_configured": bool(os.getenv('OPENCART_BASIC_TOKEN')),
+                "http_session": opencart_client.session.get_stats()
             },
+            "extraction_cache": get_shared_extraction_cache().get_stats(),
+            "llm_cache": get_shared_llm_cache().get_stats(),
             "database_status": db_status,
             "modules_available": {
                 "pdf_processing": "Ã¢ÂœÂ… ready",
@@ -885,6 +949,8 @@ def api_test():
         "GET  /api/opencart/test - Test OpenCart connection",
         "GET  /api/opencart/products - Get products",
         "GET  /api/opencart/search/<term> - Search products",
+        "POST /api/catalog/sync - Sync local catalog snapshot",
+        "GET  /api/catalog/status - Catalog snapshot status",
         "POST /api/pdf/upload - Upload and process PDF or Excel",
         "POST /api/pdf/upload-async - Start async PDF processing",
         "GET  /api/pdf/status/<job_id> - Get processing status",
@@ -893,6 +959,7 @@ def api_test():
         "POST /api/comparison/compare-fast - Fast comparison (first 10 products)",
         "POST /api/automation/create_missing - Create missing products",
         "POST /api/workflow/start - Start complete workflow",
+        "POST /api/workflow/batch - Start one workflow over many files or a zip",
         "GET  /api/workflow/<id>/status - Get workflow status", 
         "GET  /api/workflow/<id>/summary - Get workflow summary",
         "POST /api/workflow/<id>/cancel - Cancel workflow",
@@ -1017,6 +1084,38 @@ def search_products(search_term):
             "error": str(e)
         }), 500
 
+# ========== CATALOG SNAPSHOT ENDPOINTS ==========
+
+@app.route('/api/catalog/sync', methods=['POST'])
+@cross_origin()
+def sync_catalog():
+    """Page through the store catalog and refresh the local snapshot"""
+    if not catalog_snapshot_available:
+        return jsonify({'status': 'error', 'message': 'Catalog snapshot not available'}), 503
+
+    try:
+        result = catalog_snapshot.sync()
+
+        if result['success']:
+            return jsonify({'status': 'success', 'message': 'Catalog snapshot synced', 'sync': result})
+        else:
+            return jsonify({'status': 'error', 'message': 'Catalog sync failed', 'error': result['error']}), 500
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': 'Catalog sync failed', 'error': str(e)}), 500
+
+@app.route('/api/catalog/status')
+@cross_origin()
+def get_catalog_status():
+    """Get local catalog snapshot status"""
+    if not catalog_snapshot_available:
+        return jsonify({'status': 'error', 'message': 'Catalog snapshot not available'}), 503
+
+    try:
+        return jsonify({'status': 'success', 'catalog': catalog_snapshot.get_status()})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': 'Failed to get catalog status', 'error': str(e)}), 500
+
 # ========== PDF AND EXCEL PROCESSING ENDPOINTS ==========
 
 @app.route('/api/pdf/upload', methods=['GET', 'POST'])
@@ -1034,7 +1133,7 @@ def upload_file():
                 'method': 'POST',
                 'content_type': 'multipart/form-data',
                 'field_name': 'file',
-                'supported_formats': ['PDF', 'Excel (.xlsx, .xls)'],
+                'supported_formats': ['PDF', 'Excel (.xlsx, .xls)', 'CSV'],
                 'max_file_size': '10MB'
             }
         })
@@ -1062,7 +1161,7 @@ def upload_file():
             
             # Try OpenAI processing first
             try:
-                result = process_pdf_with_openai(file)
+                result = process_upload_cached(file, 'upload_pdf_openai', process_pdf_with_openai)
                 if result['status'] == 'success':
                     print(f"Ã¢ÂœÂ… OpenAI successfully processed {result['products_found']} products from PDF")
                     return jsonify(result)
@@ -1072,12 +1171,21 @@ def upload_file():
             except Exception as openai_error:
                 print(f"Ã¢ÂšÂ Ã¯Â¸ÂÃƒÂ¯Ã‚Â¸Ã‚Â OpenAI PDF processing error: {openai_error}")
             
-        elif filename_lower.endswith(('.xlsx', '.xls')):
+        elif filename_lower.endswith(('.xlsx', '.xls', '.csv')):
             print(f"Ã°ÂŸÂ“ÂŠ Processing Excel: {file.filename}")
             
+            # Native import first; it maps columns itself and needs no per-row LLM calls
+            try:
+                result = process_upload_cached(file, 'upload_spreadsheet_native', process_spreadsheet_file)
+                if result['status'] == 'success':
+                    return jsonify(result)
+                print(f"⚠️ Native spreadsheet import failed: {result.get('error')}")
+            except Exception as native_error:
+                print(f"⚠️ Native spreadsheet import error: {native_error}")
+            
             # Try OpenAI Excel processing
             try:
-                result = process_excel_with_openai(file)
+                result = process_upload_cached(file, 'upload_excel_openai', process_excel_with_openai)
                 if result['status'] == 'success':
                     print(f"Ã¢ÂœÂ… OpenAI successfully processed {result['products_found']} products from Excel")
                     return jsonify(result)
@@ -1090,7 +1198,7 @@ def upload_file():
         else:
             return jsonify({
                 'status': 'error',
-                'message': 'Invalid file type. Please upload a PDF or Excel file (.pdf, .xlsx, .xls).'
+                'message': 'Invalid file type. Please upload a PDF, Excel or CSV file (.pdf, .xlsx, .xls, .csv).'
             }), 400
         
         # Fallback to mock processing if OpenAI fails
@@ -1187,11 +1295,12 @@ def upload_pdf_async():
         if not file.filename.lower().endswith('.pdf'):
             return jsonify({'status': 'error', 'message': 'Invalid file type'}), 400
 
-        job_id = async_processor.start_processing(file, file.filename)
+        priority = int(request.form.get('priority', 0))
+        job_id = async_processor.start_processing(file, file.filename, priority=priority)
         
         return jsonify({
             'status': 'success',
-            'message': 'Processing started',
+            'message': 'Processing queued',
             'job_id': job_id,
             'filename': file.filename,
             'status_url': f'/api/pdf/status/{job_id}'
@@ -1248,7 +1357,12 @@ def compare_products():
 
         try:
             from comparison_engine.product_comparator import ProductComparator
-            comparator = ProductComparator(opencart_client)
+            source = opencart_client
+            if data.get('use_snapshot') and catalog_snapshot_available and not catalog_snapshot.is_empty():
+                source = catalog_snapshot
+            comparator = ProductComparator(source)
+            if source is catalog_snapshot:
+                comparator.requests_per_second = None  # Local reads need no throttling
             result = comparator.compare_products(data['products'])
             
             if result['status'] == 'success':
@@ -1289,7 +1403,7 @@ def compare_products_fast():
         
         from comparison_engine.product_comparator import ProductComparator
         comparator = ProductComparator(opencart_client)
-        comparator.search_delay = 0.05  # Fast searches
+        comparator.requests_per_second = 20.0  # Fast searches
         
         result = comparator.compare_products(products)
         
@@ -1357,6 +1471,18 @@ def create_missing_products():
 
 # ========== WORKFLOW ENDPOINTS ==========
 
+def workflow_options_from_form():
+    """Workflow options sent as form fields alongside the upload"""
+    return {
+        'auto_create_missing': request.form.get('auto_create_missing', 'true').lower() == 'true',
+        'auto_update_prices': request.form.get('auto_update_prices', 'false').lower() == 'true',
+        'validation_threshold': float(request.form.get('validation_threshold', 0.7)),
+        'price_tolerance_percent': float(request.form.get('price_tolerance_percent', 5.0)),
+        'batch_size': int(request.form.get('batch_size', 10)),
+        'spreadsheet_batch_size': int(request.form.get('spreadsheet_batch_size', 1000)),
+        'dry_run': request.form.get('dry_run', 'false').lower() == 'true'
+    }
+
 @app.route('/api/workflow/start', methods=['POST'])
 @cross_origin()
 def start_workflow():
@@ -1376,18 +1502,11 @@ def start_workflow():
         if file.filename == '':
             return jsonify({'status': 'error', 'message': 'No file selected'}), 400
 
-        if not file.filename.lower().endswith('.pdf'):
-            return jsonify({'status': 'error', 'message': 'Invalid file type. Please upload a PDF file.'}), 400
+        if not file.filename.lower().endswith(('.pdf', '.xlsx', '.xls', '.csv')):
+            return jsonify({'status': 'error', 'message': 'Invalid file type. Please upload a PDF, Excel or CSV file.'}), 400
 
         # Get workflow options from form data
-        options = {
-            'auto_create_missing': request.form.get('auto_create_missing', 'true').lower() == 'true',
-            'auto_update_prices': request.form.get('auto_update_prices', 'false').lower() == 'true',
-            'validation_threshold': float(request.form.get('validation_threshold', 0.7)),
-            'price_tolerance_percent': float(request.form.get('price_tolerance_percent', 5.0)),
-            'batch_size': int(request.form.get('batch_size', 10)),
-            'dry_run': request.form.get('dry_run', 'false').lower() == 'true'
-        }
+        options = workflow_options_from_form()
 
         # Start workflow
         workflow_id = workflow_manager.start_workflow(file, options)
@@ -1396,12 +1515,52 @@ def start_workflow():
             'status': 'success',
             'message': 'Workflow started successfully',
             'workflow_id': workflow_id,
+            'status_url': f'/api/workflow/{workflow_id}/status',
             'options': options
         })
 
     except Exception as e:
         return jsonify({'status': 'error', 'message': 'Failed to start workflow', 'error': str(e)}), 500
 
+@app.route('/api/workflow/batch', methods=['POST'])
+@cross_origin()
+def start_batch_workflow():
+    """Start one workflow over many pricelists: shared catalog and search cache, one automation pass"""
+    if not workflow_available:
+        return jsonify({'status': 'error', 'message': 'Workflow manager not available'}), 503
+
+    try:
+        files = [f for f in request.files.getlist('files') + request.files.getlist('file') if f.filename]
+        if not files:
+            return jsonify({'status': 'error', 'message': 'No files uploaded'}), 400
+
+        invalid = [f.filename for f in files if not f.filename.lower().endswith(('.pdf', '.xlsx', '.xls', '.csv', '.zip'))]
+        if invalid:
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid file type. Please upload PDF, Excel, CSV or zip files.',
+                'invalid_files': invalid
+            }), 400
+
+        options = workflow_options_from_form()
+        options['max_parallel_files'] = int(request.form.get('max_parallel_files', 4))
+
+        batch_id = workflow_manager.start_batch_workflow(files, options)
+        batch = workflow_manager.get_workflow_status(batch_id)
+
+        return jsonify({
+            'status': 'success',
+            'message': f"Batch workflow started for {len(batch['file_workflow_ids'])} files",
+            'workflow_id': batch_id,
+            'file_workflow_ids': batch['file_workflow_ids'],
+            'warnings': batch['warnings'],
+            'status_url': f'/api/workflow/{batch_id}/status',
+            'options': options
+        })
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': 'Failed to start batch workflow', 'error': str(e)}), 500
+
 @app.route('/api/workflow/<workflow_id>/status')
 @cross_origin()
 def get_workflow_status(workflow_id):
@@ -1456,6 +1615,29 @@ def cancel_workflow(workflow_id):
     except Exception as e:
         return jsonify({'status': 'error', 'message': 'Failed to cancel workflow', 'error': str(e)}), 500
 
+@app.route('/api/workflow/<workflow_id>/resume', methods=['POST'])
+@cross_origin()
+def resume_workflow(workflow_id):
+    """Resume a failed workflow from its last checkpoint"""
+    if not workflow_available:
+        return jsonify({'status': 'error', 'message': 'Workflow manager not available'}), 503
+
+    try:
+        resumed = workflow_manager.resume_workflow(workflow_id)
+
+        if not resumed:
+            return jsonify({'status': 'error', 'message': 'Workflow not found or cannot be resumed'}), 404
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Workflow resumed',
+            'workflow_id': workflow_id,
+            'status_url': f'/api/workflow/{workflow_id}/status'
+        })
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': 'Failed to resume workflow', 'error': str(e)}), 500
+
 @app.route('/api/workflow/list')
 @cross_origin()
 def list_workflows():
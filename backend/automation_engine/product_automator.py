@@ -1,58 +1,65 @@
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from opencart_client.api_client import OpenCartAPIClient, extract_listing_products
+from opencart_client.rate_limiter import TokenBucket
+
 class ProductAutomator:
     """Automate product creation and updates in OpenCart"""
 
     def __init__(self, opencart_client):
         self.opencart_client = opencart_client
-        self.batch_size = 10
-        self.delay_between_requests = 1.0  # seconds
+        self.batch_size = 10  # Maximum writes in flight at once
+        self.requests_per_second = 5.0  # Global write rate (None = unlimited)
+        self.max_retries = 2  # Retries per product after the first attempt
+        self.retry_backoff = 1.0  # seconds, doubled on each retry
+        self.checkpoint = None  # Optional callable run before each product; raising aborts the batch
+        self.verify_existing = False  # Look the product up in the store before the first attempt too
+
+        # Writes need the full REST client; SimpleOpenCartClient only reads
+        if hasattr(opencart_client, 'create_product'):
+            self.api_client = opencart_client
+        else:
+            self.api_client = OpenCartAPIClient()
+
+        self._rate_limiter = TokenBucket(self.requests_per_second)
+        self._created_lock = threading.Lock()
+        self._created_by_key = {}  # idempotency key -> creation result
+        self._key_locks = {}  # idempotency key -> lock serializing writes for that key
 
     def create_products_batch(self, products_to_create: List[Dict]) -> Dict:
         """Create multiple products in OpenCart"""
         try:
-            results = []
-            success_count = 0
-            error_count = 0
-
             total_products = len(products_to_create)
+            started = time.time()
+            self._rate_limiter = TokenBucket(self.requests_per_second)
+            # Idempotency state is per batch: a key created by an earlier batch
+            # must be written (or found in the store) again, not reported as created
+            with self._created_lock:
+                self._created_by_key = {}
+                self._key_locks = {}
+
+            print(f"🛠️ Creating {total_products} products "
+                  f"({self.batch_size} in flight, {self.requests_per_second or 'unlimited'} req/s)")
 
-            for i, product_data in enumerate(products_to_create):
-                try:
-                    # Convert PDF product data to OpenCart format
-                    opencart_product = self._convert_to_opencart_format(product_data)
-
-                    # Create product via API (simulation)
-                    result = self._create_single_product(opencart_product)
-
-                    results.append({
-                        'index': i + 1,
-                        'product_name': product_data.get('name', 'Unknown'),
-                        'success': result['success'],
-                        'result': result,
-                        'timestamp': datetime.now().isoformat()
-                    })
-
-                    if result['success']:
-                        success_count += 1
-                    else:
-                        error_count += 1
-
-                    # Add delay to avoid overwhelming the API
-                    if i < total_products - 1:
-                        time.sleep(self.delay_between_requests)
-
-                except Exception as e:
-                    error_count += 1
-                    results.append({
-                        'index': i + 1,
-                        'product_name': product_data.get('name', 'Unknown'),
-                        'success': False,
-                        'error': str(e),
-                        'timestamp': datetime.now().isoformat()
-                    })
+            # batch_size bounds the number of concurrent writes; map keeps input order
+            with ThreadPoolExecutor(max_workers=max(1, self.batch_size)) as executor:
+                results = list(executor.map(
+                    lambda item: self._create_product_task(item[0], item[1]),
+                    enumerate(products_to_create)
+                ))
+
+            # Duplicates succeed without a write, so they count only as skipped
+            duplicate_count = sum(1 for r in results if r['success'] and r.get('result', {}).get('duplicate'))
+            success_count = sum(1 for r in results if r['success']) - duplicate_count
+            error_count = total_products - success_count - duplicate_count
+            retry_count = sum(r.get('attempts', 1) - 1 for r in results)
+            duration = time.time() - started
+
+            print(f"✅ Created {success_count}/{total_products} products in {duration:.1f}s")
 
             return {
                 'success': True,
@@ -60,7 +67,11 @@ class ProductAutomator:
                     'total_attempted': total_products,
                     'successful_creations': success_count,
                     'failed_creations': error_count,
-                    'success_rate': f"{(success_count/total_products*100):.1f}%" if total_products > 0 else "0%"
+                    'success_rate': f"{(success_count/total_products*100):.1f}%" if total_products > 0 else "0%",
+                    'retries': retry_count,
+                    'skipped_duplicates': duplicate_count,
+                    'duration_seconds': round(duration, 2),
+                    'products_per_second': round(total_products / duration, 2) if duration > 0 else None
                 },
                 'detailed_results': results,
                 'timestamp': datetime.now().isoformat()
@@ -73,6 +84,173 @@ class ProductAutomator:
                 'timestamp': datetime.now().isoformat()
             }
 
+    def update_prices_batch(self, price_differences: List[Dict]) -> Dict:
+        """Set store prices to the pricelist price for matched products whose prices differ"""
+        try:
+            total_products = len(price_differences)
+            started = time.time()
+
+            print(f"💰 Updating {total_products} prices ({self.batch_size} in flight)")
+
+            # Shares the write rate limiter with a concurrently running create batch
+            with ThreadPoolExecutor(max_workers=max(1, self.batch_size)) as executor:
+                results = list(executor.map(
+                    lambda item: self._update_price_task(item[0], item[1]),
+                    enumerate(price_differences)
+                ))
+
+            success_count = sum(1 for r in results if r['success'])
+            duration = time.time() - started
+
+            print(f"✅ Updated {success_count}/{total_products} prices in {duration:.1f}s")
+
+            return {
+                'success': True,
+                'summary': {
+                    'total_attempted': total_products,
+                    'successful_updates': success_count,
+                    'failed_updates': total_products - success_count,
+                    'duration_seconds': round(duration, 2)
+                },
+                'detailed_results': results,
+                'timestamp': datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Batch price update failed: {str(e)}',
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _update_price_task(self, index: int, difference: Dict) -> Dict:
+        """Worker task: write the pricelist price to the best store match"""
+        if self.checkpoint:
+            self.checkpoint()
+        pdf_product = difference.get('pdf_product') or {}
+        try:
+            # ProductComparator stores the matched store products themselves
+            store_product = (difference.get('opencart_matches') or [{}])[0]
+            product_id = store_product.get('product_id') or store_product.get('id')
+            if not product_id:
+                raise ValueError('Matched store product has no id')
+
+            price = pdf_product.get('price')
+            self._rate_limiter.acquire()
+            response = self.api_client.update_product(str(product_id), {'price': str(price)})
+
+            return {
+                'index': index + 1,
+                'product_name': pdf_product.get('name', 'Unknown'),
+                'product_id': product_id,
+                'success': bool(response.get('success')),
+                'error': None if response.get('success') else response.get('error', 'Unknown error'),
+                'timestamp': datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            return {
+                'index': index + 1,
+                'product_name': pdf_product.get('name', 'Unknown'),
+                'success': False,
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _create_product_task(self, index: int, product_data: Dict) -> Dict:
+        """Worker task: convert, create with idempotent retries, and report"""
+        if self.checkpoint:
+            self.checkpoint()
+        try:
+            # Convert PDF product data to OpenCart format
+            opencart_product = self._convert_to_opencart_format(product_data)
+            key = self._idempotency_key(opencart_product)
+
+            attempts = 0
+            result = None
+            while attempts <= self.max_retries:
+                if attempts > 0:
+                    time.sleep(self.retry_backoff * (2 ** (attempts - 1)))
+                attempts += 1
+
+                # Only retries need the store lookup: the failed write may have landed
+                result = self._create_idempotent(key, opencart_product, check_store=attempts > 1 or self.verify_existing)
+                if result['success']:
+                    break
+
+            return {
+                'index': index + 1,
+                'product_name': product_data.get('name', 'Unknown'),
+                'success': result['success'],
+                'result': result,
+                'attempts': attempts,
+                'timestamp': datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            return {
+                'index': index + 1,
+                'product_name': product_data.get('name', 'Unknown'),
+                'success': False,
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+    def _idempotency_key(self, opencart_product: Dict) -> Optional[str]:
+        """Products are identified by model (falling back to SKU)"""
+        key = str(opencart_product.get('model') or opencart_product.get('sku') or '').strip().upper()
+        return key or None
+
+    def _create_idempotent(self, key: Optional[str], opencart_product: Dict, check_store: bool = False) -> Dict:
+        """Create a product unless one with the same key was already created or exists in the store"""
+        if not key:
+            return self._create_single_product(opencart_product)
+
+        # Duplicate rows in one batch must not race each other into two creates
+        with self._created_lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._created_lock:
+                previous = self._created_by_key.get(key)
+            if previous is not None:
+                return {**previous, 'duplicate': True}
+
+            # A previous attempt may have succeeded even though the response was lost
+            existing = self._find_existing_product(key) if check_store else None
+            if existing is not None:
+                result = {
+                    'success': True,
+                    'product_id': existing.get('product_id') or existing.get('id'),
+                    'message': 'Product already exists in store',
+                    'duplicate': True
+                }
+            else:
+                result = self._create_single_product(opencart_product)
+
+            if result['success']:
+                with self._created_lock:
+                    self._created_by_key[key] = result
+
+            return result
+
+    def _find_existing_product(self, key: str) -> Optional[Dict]:
+        """Look up a store product whose model matches the idempotency key"""
+        try:
+            self._rate_limiter.acquire()
+            search_result = self.api_client.search_products(key)
+            if not search_result.get('success'):
+                return None
+
+            products = search_result.get('results') or extract_listing_products(search_result.get('data'))
+            for product in products:
+                if str(product.get('model', '')).strip().upper() == key:
+                    return product
+            return None
+
+        except Exception:
+            return None
+
     def _convert_to_opencart_format(self, pdf_product: Dict) -> Dict:
         """Convert PDF product data to OpenCart API format"""
         return {
@@ -97,13 +275,23 @@ class ProductAutomator:
     def _create_single_product(self, product_data: Dict) -> Dict:
         """Create a single product via OpenCart API"""
         try:
-            # This would use the actual OpenCart API
-            # For now, return a simulation
+            self._rate_limiter.acquire()
+            response = self.api_client.create_product(product_data)
+
+            if not response.get('success'):
+                return {
+                    'success': False,
+                    'error': response.get('error', 'Unknown error'),
+                    'status_code': response.get('status_code')
+                }
+
+            data = response.get('data') or {}
+            inner = data.get('data') if isinstance(data.get('data'), dict) else {}
             return {
                 'success': True,
-                'product_id': f"new_{int(time.time())}",
+                'product_id': data.get('product_id') or inner.get('product_id'),
                 'message': 'Product created successfully',
-                'data': product_data
+                'status_code': response.get('status_code')
             }
         except Exception as e:
             return {
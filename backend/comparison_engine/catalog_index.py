@@ -0,0 +1,176 @@
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Set
+
+import numpy as np
+
+
+class CatalogIndex:
+    """In-memory lookup structures over an OpenCart catalog.
+
+    Built once per comparison run so that each PDF product only has to be
+    scored against a short list of plausible candidates instead of the
+    whole catalog.
+    """
+
+    def __init__(self, opencart_products: List[Dict], name_ngram_size: int = 3,
+                 model_ngram_size: int = 2):
+        self.products = opencart_products
+        self.name_ngram_size = name_ngram_size
+        self.model_ngram_size = model_ngram_size
+
+        # Upper-cased fields, matching what the comparator scores against
+        self.names: List[str] = []
+        self.models: List[str] = []
+
+        # Exact hash maps on normalized identifiers
+        self.by_model: Dict[str, List[int]] = defaultdict(list)
+        self.by_sku: Dict[str, List[int]] = defaultdict(list)
+
+        # Character n-gram inverted indexes
+        self.name_postings: Dict[str, List[int]] = defaultdict(list)
+        self.model_postings: Dict[str, List[int]] = defaultdict(list)
+        self.empty_names: List[int] = []
+
+        # Per-name character counts (one column per character) for the quick_ratio bound
+        self.char_columns: Dict[str, int] = {}
+        self.name_char_counts = np.zeros((0, 0), dtype=np.uint16)
+        self.name_lengths = np.zeros(0, dtype=np.int64)
+
+        self._build()
+
+    @staticmethod
+    def normalize_identifier(value: str) -> str:
+        """Normalize a model/SKU for exact lookups (case and punctuation insensitive)"""
+        return re.sub(r'[^A-Z0-9]', '', str(value or '').upper())
+
+    @staticmethod
+    def ngrams(text: str, size: int) -> Set[str]:
+        """Distinct character n-grams of a string"""
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def _build(self):
+        """Populate hash maps and n-gram postings"""
+        for idx, product in enumerate(self.products):
+            name = product.get('name', '').upper()
+            model = product.get('model', '').upper()
+            self.names.append(name)
+            self.models.append(model)
+
+            if not name:
+                self.empty_names.append(idx)
+
+            model_key = self.normalize_identifier(model)
+            if model_key:
+                self.by_model[model_key].append(idx)
+
+            sku_key = self.normalize_identifier(product.get('sku', ''))
+            if sku_key:
+                self.by_sku[sku_key].append(idx)
+
+            for gram in self.ngrams(name, self.name_ngram_size):
+                self.name_postings[gram].append(idx)
+
+            for gram in self.ngrams(model, self.model_ngram_size):
+                self.model_postings[gram].append(idx)
+
+        for name in self.names:
+            for char in name:
+                self.char_columns.setdefault(char, len(self.char_columns))
+
+        self.name_char_counts = np.zeros((len(self.names), len(self.char_columns)), dtype=np.uint16)
+        for idx, name in enumerate(self.names):
+            for char, count in Counter(name).items():
+                self.name_char_counts[idx, self.char_columns[char]] = min(count, np.iinfo(np.uint16).max)
+        self.name_lengths = np.array([len(name) for name in self.names], dtype=np.int64)
+
+    def candidates(self, pdf_model: str, pdf_name: str, pdf_seo_name: str) -> List[int]:
+        """Return catalog positions worth scoring for a PDF product, in catalog order.
+
+        Arguments are expected upper-cased, as used by the comparator.
+        """
+        candidates: Set[int] = set()
+
+        if pdf_model:
+            candidates.update(self._model_in_name_candidates(pdf_model))
+            candidates.update(self._model_similarity_candidates(pdf_model))
+
+            model_key = self.normalize_identifier(pdf_model)
+            candidates.update(self.by_model.get(model_key, []))
+            candidates.update(self.by_sku.get(model_key, []))
+
+        # Same thresholds as the comparator's SEO-name and name methods
+        for text, threshold in ((pdf_seo_name, 0.7), (pdf_name, 0.6)):
+            if text:
+                candidates.update(self._name_similarity_candidates(text, threshold))
+
+        # An empty PDF name scores 1.0 against an empty catalog name
+        if not pdf_name:
+            candidates.update(self.empty_names)
+
+        return sorted(candidates)
+
+    def _model_in_name_candidates(self, pdf_model: str) -> List[int]:
+        """Products whose name contains the PDF model as a substring"""
+        size = self.name_ngram_size
+        if len(pdf_model) < size:
+            return [i for i, name in enumerate(self.names) if pdf_model in name]
+
+        # Every n-gram of the model must appear in the name; intersect
+        # postings starting from the rarest gram, then verify.
+        postings = sorted(
+            (self.name_postings.get(gram, []) for gram in self.ngrams(pdf_model, size)),
+            key=len
+        )
+        if not postings or not postings[0]:
+            return []
+
+        matched = set(postings[0])
+        for posting in postings[1:]:
+            matched.intersection_update(posting)
+            if not matched:
+                return []
+
+        return [i for i in matched if pdf_model in self.names[i]]
+
+    def _model_similarity_candidates(self, pdf_model: str) -> Set[int]:
+        """Products whose model could exceed the 0.8 model-similarity threshold.
+
+        A SequenceMatcher ratio above 0.8 between strings longer than one
+        character requires a matching block of at least two characters, so
+        candidates must share a model bigram.
+        """
+        if len(pdf_model) < self.model_ngram_size:
+            return {i for i, model in enumerate(self.models) if model == pdf_model}
+
+        candidates: Set[int] = set()
+        for gram in self.ngrams(pdf_model, self.model_ngram_size):
+            candidates.update(self.model_postings.get(gram, []))
+
+        # The ratio can never exceed 2 * min(len) / (len_a + len_b)
+        size = len(pdf_model)
+        models = self.models
+        return {
+            i for i in candidates
+            if 2 * min(size, len(models[i])) > 0.8 * (size + len(models[i]))
+        }
+
+    def _name_similarity_candidates(self, text: str, threshold: float) -> List[int]:
+        """Products whose name could exceed the similarity threshold against the text.
+
+        SequenceMatcher.quick_ratio (shared characters as a multiset) is an
+        upper bound on ratio(), so every name it rules out would also fail a
+        full scan; the bound is evaluated for the whole catalog at once.
+        """
+        if not len(self.names):
+            return []
+
+        query = np.zeros(len(self.char_columns), dtype=np.uint16)
+        for char, count in Counter(text).items():
+            column = self.char_columns.get(char)
+            if column is not None:
+                query[column] = min(count, np.iinfo(np.uint16).max)
+
+        shared = np.minimum(self.name_char_counts, query).sum(axis=1, dtype=np.int64)
+        bound = 2.0 * shared / (len(text) + self.name_lengths)
+        return np.flatnonzero(bound > threshold).tolist()
@@ -1,28 +1,37 @@
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from difflib import SequenceMatcher
 
+from .catalog_index import CatalogIndex
+
 class EnhancedProductComparator:
     """Enhanced product comparison with better matching for OpenCart"""
     
-    def __init__(self, opencart_client):
+    def __init__(self, opencart_client, catalog_snapshot=None):
         self.opencart_client = opencart_client
+        self.catalog_snapshot = catalog_snapshot  # Optional local CatalogSnapshot
         
     def find_matching_products(self, pdf_products: List[Dict]) -> Dict:
         """Find matching products between PDF and OpenCart using enhanced matching"""
         try:
-            # Get all OpenCart products
-            opencart_result = self.opencart_client.get_products(limit=1000)
-            if not opencart_result['success']:
-                return {'success': False, 'error': 'Failed to fetch OpenCart products'}
+            # Get all OpenCart products (full local snapshot when available)
+            if self.catalog_snapshot is not None and not self.catalog_snapshot.is_empty():
+                opencart_products = self.catalog_snapshot.get_all_products()
+            else:
+                opencart_result = self.opencart_client.get_products(limit=1000)
+                if not opencart_result['success']:
+                    return {'success': False, 'error': 'Failed to fetch OpenCart products'}
+                
+                opencart_products = opencart_result['data'].get('data', [])
             
-            opencart_products = opencart_result['data'].get('data', [])
+            # Build the lookup index once for the whole run
+            catalog_index = CatalogIndex(opencart_products)
             
             matches = []
             missing = []
             
             for pdf_product in pdf_products:
-                match_result = self._find_best_match(pdf_product, opencart_products)
+                match_result = self._find_best_match(pdf_product, opencart_products, catalog_index)
                 
                 if match_result['found']:
                     matches.append({
@@ -46,20 +55,27 @@ class EnhancedProductComparator:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    def _find_best_match(self, pdf_product: Dict, opencart_products: List[Dict]) -> Dict:
+    def _find_best_match(self, pdf_product: Dict, opencart_products: List[Dict],
+                         catalog_index: Optional[CatalogIndex] = None) -> Dict:
         """Find the best matching OpenCart product"""
         
         pdf_model = pdf_product.get('model', '').upper()
         pdf_name = pdf_product.get('name', '').upper()
         pdf_seo_name = pdf_product.get('seo_name', '').upper()
         
+        if catalog_index is None:
+            catalog_index = CatalogIndex(opencart_products)
+        
         best_match = None
         best_confidence = 0.0
         best_method = ""
         
-        for oc_product in opencart_products:
-            oc_name = oc_product.get('name', '').upper()
-            oc_model = oc_product.get('model', '').upper()
+        # Only score the short list; candidates come back in catalog order so
+        # ties resolve exactly as a full scan would
+        for idx in catalog_index.candidates(pdf_model, pdf_name, pdf_seo_name):
+            oc_product = catalog_index.products[idx]
+            oc_name = catalog_index.names[idx]
+            oc_model = catalog_index.models[idx]
             
             # Method 1: Exact model match
             if pdf_model and pdf_model in oc_name:
@@ -71,7 +87,7 @@ class EnhancedProductComparator:
             
             # Method 2: Model number similarity
             if pdf_model and oc_model:
-                model_similarity = SequenceMatcher(None, pdf_model, oc_model).ratio()
+                model_similarity = self._similarity_above(pdf_model, oc_model, max(0.8, best_confidence))
                 if model_similarity > 0.8 and model_similarity > best_confidence:
                     best_match = oc_product
                     best_confidence = model_similarity
@@ -79,14 +95,14 @@ class EnhancedProductComparator:
             
             # Method 3: Name similarity with SEO name
             if pdf_seo_name:
-                name_similarity = SequenceMatcher(None, pdf_seo_name, oc_name).ratio()
+                name_similarity = self._similarity_above(pdf_seo_name, oc_name, max(0.7, best_confidence))
                 if name_similarity > 0.7 and name_similarity > best_confidence:
                     best_match = oc_product
                     best_confidence = name_similarity
                     best_method = "seo_name_similarity"
             
             # Method 4: Fallback name similarity
-            name_similarity = SequenceMatcher(None, pdf_name, oc_name).ratio()
+            name_similarity = self._similarity_above(pdf_name, oc_name, max(0.6, best_confidence))
             if name_similarity > 0.6 and name_similarity > best_confidence:
                 best_match = oc_product
                 best_confidence = name_similarity
@@ -98,3 +114,10 @@ class EnhancedProductComparator:
             'confidence': best_confidence,
             'method': best_method
         }
+    
+    def _similarity_above(self, text1: str, text2: str, floor: float) -> float:
+        """SequenceMatcher ratio, or 0.0 when the cheap upper bounds show it cannot beat floor"""
+        matcher = SequenceMatcher(None, text1, text2)
+        if matcher.real_quick_ratio() <= floor or matcher.quick_ratio() <= floor:
+            return 0.0
+        return matcher.ratio()
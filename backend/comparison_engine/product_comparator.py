@@ -2,8 +2,12 @@ import re
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
 import time
 
+from opencart_client.rate_limiter import TokenBucket
+from .search_cache import SearchCache
+
 @dataclass
 class ComparisonResult:
     """Result of product comparison"""
@@ -16,16 +20,22 @@ class ComparisonResult:
 class ProductComparator:
     """Compare PDF products with OpenCart inventory using search-based approach"""
 
-    def __init__(self, opencart_client):
+    def __init__(self, opencart_client, shared_search_cache: Optional[SearchCache] = None):
         self.opencart_client = opencart_client
+        self.shared_search_cache = shared_search_cache  # Optional cross-run TTL/LRU layer
         self.name_similarity_threshold = 0.7
         self.price_tolerance_percent = 5.0
-        self.search_delay = 0.2  # Delay between searches to avoid overwhelming API
+        self.max_workers = 8  # Products searched concurrently
+        self.requests_per_second = 10.0  # Global search rate across all workers (None = unlimited)
+        self._rate_limiter = None
+        self._run_search_cache = None
+        self.checkpoint = None  # Optional callable run before each product; raising aborts the run
 
     def compare_products(self, pdf_products: List[Dict]) -> Dict:
         """Compare PDF products using individual searches"""
         try:
-            print(f"🔍 Starting SEARCH-BASED comparison for {len(pdf_products)} PDF products")
+            print(f"🔍 Starting SEARCH-BASED comparison for {len(pdf_products)} PDF products "
+                  f"({self.max_workers} workers, {self.requests_per_second or 'unlimited'} req/s)")
             
             comparison_results = []
             missing_products = []
@@ -34,45 +44,45 @@ class ProductComparator:
             search_errors = []
 
             total_products = len(pdf_products)
+            started = time.time()
+            
+            # One bucket per run, shared by every worker
+            self._rate_limiter = TokenBucket(self.requests_per_second)
+            # Per-run memo: each distinct search term hits the store once
+            self._run_search_cache = SearchCache()
+            shared_stats_before = self.shared_search_cache.get_stats() if self.shared_search_cache else None
+            
+            # executor.map yields in submission order, so results stay aligned with the input
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                outcomes = list(executor.map(
+                    lambda item: self._compare_single_product(item[0], total_products, item[1]),
+                    enumerate(pdf_products)
+                ))
             
-            for i, pdf_product in enumerate(pdf_products):
-                print(f"🔍 Searching {i+1}/{total_products}: {pdf_product.get('name', 'Unknown')}")
+            for pdf_product, (search_result, error) in zip(pdf_products, outcomes):
+                comparison_results.append(search_result)
                 
-                try:
-                    # Search for this specific product
-                    search_result = self._search_single_product(pdf_product)
-                    comparison_results.append(search_result)
+                if error:
+                    search_errors.append(error)
 
-                    # Categorize results
-                    if search_result.status == 'missing':
-                        missing_products.append(pdf_product)
-                    elif search_result.status == 'price_different':
-                        price_differences.append(search_result)
-                    elif search_result.status == 'match_found':
-                        exact_matches.append(search_result)
-                        
-                    # Add delay to avoid overwhelming API
-                    if i < total_products - 1:
-                        time.sleep(self.search_delay)
-                        
-                except Exception as e:
-                    print(f"❌ Error searching for product {pdf_product.get('name', 'Unknown')}: {e}")
-                    search_errors.append(str(e))
-                    # Add as missing if search fails
+                # Categorize results
+                if search_result.status == 'missing':
                     missing_products.append(pdf_product)
-                    comparison_results.append(ComparisonResult(
-                        pdf_product=pdf_product,
-                        opencart_matches=[],
-                        match_confidence=0.0,
-                        status='missing',
-                        recommendations=[f'Search failed: {str(e)}']
-                    ))
+                elif search_result.status == 'price_different':
+                    price_differences.append(search_result)
+                elif search_result.status == 'match_found':
+                    exact_matches.append(search_result)
 
-            print(f"✅ Search-based comparison complete:")
+            elapsed = time.time() - started
+            cache_stats = self._get_cache_stats(shared_stats_before)
+
+            print(f"✅ Search-based comparison complete in {elapsed:.1f}s:")
             print(f"   📊 {len(exact_matches)} exact matches")
             print(f"   💰 {len(price_differences)} price differences") 
             print(f"   ❌ {len(missing_products)} missing products")
             print(f"   🚨 {len(search_errors)} search errors")
+            print(f"   🗂️ Search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                  f"{cache_stats['store_requests']} store requests")
 
             return {
                 'success': True,
@@ -82,7 +92,9 @@ class ProductComparator:
                     'exact_matches': len(exact_matches),
                     'price_differences': len(price_differences),
                     'missing_products': len(missing_products),
-                    'search_errors': len(search_errors)
+                    'search_errors': len(search_errors),
+                    'duration_seconds': round(elapsed, 2),
+                    'search_cache': cache_stats
                 },
                 'missing_products': missing_products,
                 'price_differences': [self._serialize_comparison_result(r) for r in price_differences],
@@ -98,6 +110,71 @@ class ProductComparator:
                 'error': f'Search-based comparison failed: {str(e)}'
             }
 
+    def _compare_single_product(self, index: int, total_products: int,
+                                pdf_product: Dict) -> Tuple[ComparisonResult, Optional[str]]:
+        """Worker task: search one product, converting failures into a 'missing' result"""
+        if self.checkpoint:
+            self.checkpoint()
+        print(f"🔍 Searching {index+1}/{total_products}: {pdf_product.get('name', 'Unknown')}")
+        
+        try:
+            return self._search_single_product(pdf_product), None
+        except Exception as e:
+            print(f"❌ Error searching for product {pdf_product.get('name', 'Unknown')}: {e}")
+            # Add as missing if search fails
+            return ComparisonResult(
+                pdf_product=pdf_product,
+                opencart_matches=[],
+                match_confidence=0.0,
+                status='missing',
+                recommendations=[f'Search failed: {str(e)}']
+            ), str(e)
+
+    def _search_store(self, search_term: str) -> Dict:
+        """Run a store search through the shared rate limiter"""
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+        return self.opencart_client.search_products(search_term)
+
+    def _cached_search(self, search_term: str) -> Dict:
+        """Search via the per-run memo, then the shared cache, then the store"""
+        def fetch_from_store() -> Dict:
+            search_result = self._search_store(search_term)
+            if search_result.get('success') and search_result.get('results'):
+                # Parse store fields once per term rather than once per product
+                search_result = dict(search_result)
+                search_result['parsed_results'] = [
+                    self._parse_store_product(product) for product in search_result['results']
+                ]
+            return search_result
+
+        fetch = fetch_from_store
+        if self.shared_search_cache is not None:
+            fetch = lambda: self.shared_search_cache.get_or_fetch(search_term, fetch_from_store)
+
+        if self._run_search_cache is None:
+            return fetch()
+        return self._run_search_cache.get_or_fetch(search_term, fetch)
+
+    def _get_cache_stats(self, shared_stats_before: Optional[Dict]) -> Dict:
+        """Combine per-run and shared cache counters for the comparison summary"""
+        run_stats = self._run_search_cache.get_stats()
+        stats = {
+            'hits': run_stats['hits'],
+            'misses': run_stats['misses'],
+            'distinct_terms': run_stats['entries'],
+            'store_requests': run_stats['misses'],
+            'hit_ratio': run_stats['hit_ratio']
+        }
+
+        if self.shared_search_cache is not None:
+            shared_stats = self.shared_search_cache.get_stats()
+            shared_hits = shared_stats['hits'] - shared_stats_before['hits']
+            stats['shared_hits'] = shared_hits
+            stats['store_requests'] = shared_stats['misses'] - shared_stats_before['misses']
+
+        return stats
+
     def _search_single_product(self, pdf_product: Dict) -> ComparisonResult:
         """Search for a single product using multiple search strategies"""
         
@@ -118,15 +195,16 @@ class ProductComparator:
                 
             try:
                 print(f"   🔎 Search term: '{search_term}'")
-                search_result = self.opencart_client.search_products(search_term)
+                search_result = self._cached_search(search_term)
                 
                 if search_result.get('success') and search_result.get('results'):
                     products = search_result['results']
+                    parsed_products = search_result.get('parsed_results') or [None] * len(products)
                     print(f"   📦 Found {len(products)} results for '{search_term}'")
                     
                     # Analyze matches for this search term
-                    for product in products:
-                        match_analysis = self._analyze_match(pdf_product, product)
+                    for product, parsed in zip(products, parsed_products):
+                        match_analysis = self._analyze_match(pdf_product, product, parsed)
                         if match_analysis['overall_similarity'] > 0.3:  # Lower threshold for search results
                             all_matches.append(match_analysis)
                 else:
@@ -234,7 +312,24 @@ class ProductComparator:
                 
         return unique_terms[:5]  # Limit to 5 search terms max
 
-    def _analyze_match(self, pdf_product: Dict, oc_product: Dict) -> Dict:
+    def _parse_store_product(self, oc_product: Dict) -> Optional[Dict]:
+        """Extract the normalized fields used for matching from a store product"""
+        try:
+            oc_price_str = str(oc_product.get('price', '0'))
+            
+            # Clean and convert OpenCart price
+            oc_price_clean = re.sub(r'[^\d.,]', '', oc_price_str)
+            oc_price_clean = oc_price_clean.replace(',', '')
+            
+            return {
+                'name': str(oc_product.get('name', '')).lower(),
+                'model': str(oc_product.get('model', '')).lower(),
+                'price': float(oc_price_clean) if oc_price_clean else 0.0
+            }
+        except Exception:
+            return None
+
+    def _analyze_match(self, pdf_product: Dict, oc_product: Dict, parsed: Optional[Dict] = None) -> Dict:
         """Analyze how well an OpenCart product matches a PDF product"""
         try:
             # Extract data safely
@@ -242,14 +337,14 @@ class ProductComparator:
             pdf_model = str(pdf_product.get('model', '')).lower()
             pdf_price = float(pdf_product.get('price', 0))
             
-            oc_name = str(oc_product.get('name', '')).lower()
-            oc_model = str(oc_product.get('model', '')).lower()
-            oc_price_str = str(oc_product.get('price', '0'))
+            if parsed is None:
+                parsed = self._parse_store_product(oc_product)
+                if parsed is None:
+                    raise ValueError(f"Unparseable store price: {oc_product.get('price')}")
             
-            # Clean and convert OpenCart price
-            oc_price_clean = re.sub(r'[^\d.,]', '', oc_price_str)
-            oc_price_clean = oc_price_clean.replace(',', '')
-            oc_price = float(oc_price_clean) if oc_price_clean else 0.0
+            oc_name = parsed['name']
+            oc_model = parsed['model']
+            oc_price = parsed['price']
             
             # Calculate similarities
             name_similarity = self._calculate_similarity(pdf_name, oc_name) if pdf_name and oc_name else 0.0
@@ -0,0 +1,102 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+class SearchCache:
+    """Thread-safe memo of store search results keyed on the normalized search term.
+
+    With no limits it serves as a per-run memo; with max_entries/ttl_seconds it
+    becomes an LRU/TTL layer that can be shared across comparison runs.
+    Concurrent lookups of the same term wait for a single in-flight fetch.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_term(term: str) -> str:
+        """Normalize a search term the way the store treats it (case and spacing)"""
+        return re.sub(r'\s+', ' ', str(term or '')).strip().lower()
+
+    def get_or_fetch(self, term: str, fetch: Callable[[], Dict],
+                     cacheable: Callable[[Dict], bool] = lambda value: bool(value.get('success'))) -> Dict:
+        """Return the cached value for term, calling fetch() once on a miss"""
+        key = self.normalize_term(term)
+
+        while True:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not None:
+                    self.hits += 1
+                    return value
+
+                event = self._pending.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._pending[key] = event
+                    break
+
+            # Another worker is fetching this term; wait and re-check
+            event.wait()
+
+        try:
+            value = fetch()
+            with self._lock:
+                self.misses += 1
+                if cacheable(value):
+                    self._store(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            event.set()
+
+    def _lookup(self, key: str) -> Optional[Dict]:
+        """Fetch an entry under the lock, honouring TTL and LRU order"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, value = entry
+        if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: Dict):
+        """Insert an entry under the lock, evicting least recently used entries"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters for reporting"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
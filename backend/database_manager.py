@@ -7,7 +7,8 @@ import mysql.connector
 from mysql.connector import pooling
 import logging
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Sequence, Tuple
+from collections import deque
 from contextlib import contextmanager
 import os
 from datetime import datetime
@@ -99,6 +100,228 @@ class DatabaseConnectionManager:
             cursor.close()
             return affected_rows
     
+    @contextmanager
+    def transaction(self):
+        """Context manager for a connection running a single explicit transaction"""
+        with self.get_connection() as conn:
+            conn.autocommit = False
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = True
+    
+    def execute_many(self, query: str, params_list: Sequence[tuple]) -> int:
+        """Execute a statement for many parameter sets in one transaction.
+        
+        mysql-connector rewrites INSERT statements into a single multi-row INSERT.
+        """
+        if not params_list:
+            return 0
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, list(params_list))
+            affected_rows = cursor.rowcount
+            cursor.close()
+            return affected_rows
+    
+    def bulk_apply_product_changes(self, products: Iterable[Any], language_id: int = 1,
+                                   store_id: int = 0, chunk_size: int = 500) -> Dict[str, Any]:
+        """Apply PRICE/ADD/UPDATE results from ProductStatusAnalyzer.compare_products.
+        
+        Products are written in chunks, one transaction per chunk, using
+        multi-row statements instead of one API call per product. Related
+        description, store and category rows are refreshed in the same
+        transaction. Rows are deduplicated by model, SKU or name (the last one
+        wins; rows with none of them are all kept), and an ADD whose key is
+        already repriced or updated in this call is skipped.
+        Reported counts are the rows the statements actually affected.
+        """
+        by_status = {'price': {}, 'add': {}, 'update': {}}
+        duplicates_skipped = 0
+        for product in products:
+            status = getattr(product.status, 'value', product.status)
+            if status in by_status:
+                # Unkeyed rows get a key of their own so none of them are dropped
+                key = self._product_key(product) or id(product)
+                if key in by_status[status]:
+                    duplicates_skipped += 1
+                by_status[status][key] = product
+        
+        for key in list(by_status['add']):
+            if key in by_status['price'] or key in by_status['update']:
+                del by_status['add'][key]
+                duplicates_skipped += 1
+        
+        summary = {'prices_updated': 0, 'products_added': 0, 'products_updated': 0,
+                   'duplicates_skipped': duplicates_skipped, 'chunks': 0, 'errors': []}
+        
+        category_ids = self._lookup_ids('category_description', 'category_id', language_id)
+        manufacturer_ids = self._lookup_ids('manufacturer', 'manufacturer_id')
+        
+        for status, key in (('price', 'prices_updated'), ('update', 'products_updated'),
+                            ('add', 'products_added')):
+            pending = list(by_status[status].values())
+            for start in range(0, len(pending), chunk_size):
+                chunk = pending[start:start + chunk_size]
+                try:
+                    with self.transaction() as conn:
+                        cursor = conn.cursor()
+                        if status == 'add':
+                            affected = self._insert_products(cursor, chunk, language_id, store_id,
+                                                             category_ids, manufacturer_ids)
+                        else:
+                            affected = self._update_products(cursor, chunk, language_id,
+                                                             refresh_details=(status == 'update'))
+                        cursor.close()
+                    summary[key] += affected
+                except Exception as e:
+                    logging.error(f"Bulk {status} chunk starting at {start} failed: {e}")
+                    summary['errors'].append(f"{status} chunk {start}-{start + len(chunk) - 1}: {str(e)}")
+                summary['chunks'] += 1
+        
+        return summary
+    
+    @staticmethod
+    def _product_key(product: Any) -> Optional[Tuple[str, str]]:
+        """Identify a product by model, then SKU, then name; None when all are blank"""
+        for field in ('model', 'sku', 'name'):
+            value = ' '.join(str(getattr(product, field, None) or '').lower().split())
+            if value:
+                return field, value
+        return None
+    
+    def _lookup_ids(self, table: str, id_column: str, language_id: Optional[int] = None) -> Dict[str, int]:
+        """Map lower-cased names to ids for a name lookup table"""
+        query = f"SELECT {id_column}, name FROM {self.get_table_name(table)}"
+        params = None
+        if language_id is not None:
+            query += " WHERE language_id = %s"
+            params = (language_id,)
+        try:
+            return {str(row['name']).strip().lower(): row[id_column]
+                    for row in self.execute_query(query, params)}
+        except Exception as e:
+            logging.warning(f"Could not load {table} ids: {e}")
+            return {}
+    
+    def _update_products(self, cursor, chunk: List[Any], language_id: int, refresh_details: bool) -> int:
+        """Reprice a chunk with one joined UPDATE, optionally refreshing descriptions"""
+        rows = [p for p in chunk if p.opencart_id]
+        if not rows:
+            return 0
+        
+        # Derived table of (product_id, price) pairs -> a single UPDATE per chunk
+        values_sql = " UNION ALL ".join(["SELECT %s AS product_id, %s AS price"] * len(rows))
+        params = []
+        for product in rows:
+            params.extend([product.opencart_id, str(product.price)])
+        
+        cursor.execute(f"""
+            UPDATE {self.get_table_name('product')} p
+            JOIN ({values_sql}) u ON p.product_id = u.product_id
+            SET p.price = u.price, p.date_modified = NOW()
+        """, tuple(params))
+        updated = max(cursor.rowcount, 0)
+        
+        if refresh_details:
+            self._upsert_descriptions(cursor, [(p.opencart_id, p) for p in rows], language_id)
+        
+        return updated
+    
+    def _insert_products(self, cursor, chunk: List[Any], language_id: int, store_id: int,
+                         category_ids: Dict[str, int], manufacturer_ids: Dict[str, int]) -> int:
+        """Insert a chunk of new products plus their description, store and category rows"""
+        product_table = self.get_table_name('product')
+        
+        # Rows above this id are the ones this chunk inserts, not older products
+        # that happen to share a model
+        cursor.execute(f"SELECT COALESCE(MAX(product_id), 0) FROM {product_table}")
+        last_existing_id = cursor.fetchone()[0]
+        
+        cursor.executemany(f"""
+            INSERT INTO {product_table}
+                (model, sku, upc, ean, jan, isbn, mpn, location, quantity, stock_status_id,
+                 image, manufacturer_id, shipping, price, points, tax_class_id, date_available,
+                 weight, weight_class_id, length, width, height, length_class_id,
+                 subtract, minimum, sort_order, status, date_added, date_modified)
+            VALUES (%s, %s, '', '', '', '', '', '', 10, 7,
+                    '', %s, 1, %s, 0, 0, CURDATE(),
+                    1, 1, 0, 0, 0, 1,
+                    1, 1, 0, 1, NOW(), NOW())
+        """, [
+            (product.model or '', product.sku,
+             manufacturer_ids.get(str(product.manufacturer or '').strip().lower(), 0),
+             str(product.price))
+            for product in chunk
+        ])
+        inserted = max(cursor.rowcount, 0)
+        
+        # Resolve new ids by model; multi-row inserts do not guarantee consecutive ids,
+        # but rows sharing a model (e.g. blank ones) get increasing ids in chunk order
+        models = sorted({product.model or '' for product in chunk})
+        placeholders = ", ".join(["%s"] * len(models))
+        cursor.execute(
+            f"SELECT product_id, model FROM {product_table} "
+            f"WHERE product_id > %s AND model IN ({placeholders}) ORDER BY product_id",
+            (last_existing_id, *models)
+        )
+        ids_by_model = {}
+        for product_id, model in cursor.fetchall():
+            ids_by_model.setdefault(model, deque()).append(product_id)
+        
+        created = []
+        for product in chunk:
+            ids = ids_by_model.get(product.model or '')
+            if ids:
+                created.append((ids.popleft(), product))
+        for product_id, product in created:
+            product.opencart_id = product_id
+        
+        self._upsert_descriptions(cursor, created, language_id)
+        
+        cursor.executemany(
+            f"INSERT IGNORE INTO {self.get_table_name('product_to_store')} (product_id, store_id) "
+            f"VALUES (%s, %s)",
+            [(product_id, store_id) for product_id, _ in created]
+        )
+        
+        category_rows = [
+            (product_id, category_ids[str(product.category).strip().lower()])
+            for product_id, product in created
+            if str(product.category or '').strip().lower() in category_ids
+        ]
+        if category_rows:
+            cursor.executemany(
+                f"INSERT IGNORE INTO {self.get_table_name('product_to_category')} (product_id, category_id) "
+                f"VALUES (%s, %s)",
+                category_rows
+            )
+        
+        return inserted
+    
+    def _upsert_descriptions(self, cursor, rows: List[Tuple[int, Any]], language_id: int):
+        """Multi-row upsert of product descriptions"""
+        if not rows:
+            return
+        cursor.executemany(f"""
+            INSERT INTO {self.get_table_name('product_description')}
+                (product_id, language_id, name, description, tag, meta_title, meta_description, meta_keyword)
+            VALUES (%s, %s, %s, %s, '', %s, %s, '')
+            ON DUPLICATE KEY UPDATE
+                name = VALUES(name),
+                description = VALUES(description),
+                meta_title = VALUES(meta_title),
+                meta_description = VALUES(meta_description)
+        """, [
+            (product_id, language_id, product.name, product.description or '',
+             product.name, (product.description or '')[:160])
+            for product_id, product in rows
+        ])
+    
     def get_table_name(self, table: str) -> str:
         """Get full table name with prefix"""
         return f"{self.config.prefix}{table}"
@@ -5,12 +5,35 @@ import os
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from .http_session import OpenCartSession, get_shared_session
+
 load_dotenv()
 
+def extract_listing_products(data) -> List[Dict]:
+    """Pull the product list out of a listing/search payload.
+
+    Handles the raw LetsCMS payload ({'data': {'products': [...]}}) as well as
+    the simplified {'data': [...]} shape returned by SimpleOpenCartClient.
+    """
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return []
+
+    inner = data.get('data')
+    if isinstance(inner, list):
+        return inner
+    if isinstance(inner, dict) and isinstance(inner.get('products'), list):
+        return inner['products']
+    if isinstance(data.get('products'), list):
+        return data['products']
+    return []
+
 class OpenCartAPIClient:
     """Complete OpenCart API Client for Audico Online Store"""
 
-    def __init__(self):
+    def __init__(self, session: Optional[OpenCartSession] = None):
+        self.session = session or get_shared_session()
         self.base_url = os.getenv('OPENCART_BASE_URL', 'https://www.audicoonline.co.za')
         self.basic_token = os.getenv('OPENCART_BASIC_TOKEN', 'b2NyZXN0YXBpX29hdXRoX2NsaWVudDpvY3Jlc3RhcGlfb2F1dGhfc2VjcmV0')
 
@@ -26,13 +49,13 @@ class OpenCartAPIClient:
 
         try:
             if method.upper() == 'GET':
-                response = requests.get(url, headers=self.headers, timeout=30)
+                response = self.session.get(url, headers=self.headers, timeout=30)
             elif method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=30)
+                response = self.session.post(url, headers=self.headers, json=data, timeout=30)
             elif method.upper() == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=30)
+                response = self.session.put(url, headers=self.headers, json=data, timeout=30)
             elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=30)
+                response = self.session.delete(url, headers=self.headers, timeout=30)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
 
@@ -77,9 +100,11 @@ class OpenCartAPIClient:
                 'error': str(e)
             }
 
-    def get_products(self, limit: int = 100) -> Dict:
-        """Get all products from store"""
+    def get_products(self, limit: int = 100, page: Optional[int] = None) -> Dict:
+        """Get products from store (one listing page)"""
         endpoint = f"index.php?route=ocrestapi/product/listing&limit={limit}"
+        if page:
+            endpoint += f"&page={page}"
         return self._make_request(endpoint)
 
     def search_products(self, search_term: str) -> Dict:
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .api_client import extract_listing_products
+
+
+class CatalogSnapshot:
+    """Local SQLite copy of the OpenCart product catalog.
+
+    ``sync()`` pages through the whole store listing in parallel and only
+    rewrites products whose ``date_modified`` or content hash changed. The
+    snapshot exposes ``get_products`` and ``search_products`` with the same
+    result shape as the API clients, so comparators can run against it
+    directly instead of the live store.
+    """
+
+    def __init__(self, opencart_client, db_path: Optional[str] = None,
+                 page_size: int = 100, max_workers: int = 4, max_pages: int = 1000):
+        self.opencart_client = opencart_client
+        self.db_path = db_path or os.getenv(
+            'CATALOG_SNAPSHOT_PATH',
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'catalog_snapshot.db')
+        )
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self._sync_lock = threading.Lock()
+        self._create_schema()
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived SQLite connection (safe to use from any thread)"""
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def _create_schema(self):
+        """Create snapshot tables if they do not exist"""
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS products (
+                    product_key TEXT PRIMARY KEY,
+                    model TEXT,
+                    sku TEXT,
+                    name TEXT,
+                    date_modified TEXT,
+                    content_hash TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    synced_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_products_model ON products (model);
+                CREATE INDEX IF NOT EXISTS idx_products_sku ON products (sku);
+                CREATE TABLE IF NOT EXISTS snapshot_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    # ========== SYNC ==========
+
+    def sync(self) -> Dict:
+        """Page through the store listing and apply the delta to the local snapshot"""
+        if not self._sync_lock.acquire(blocking=False):
+            return {'success': False, 'error': 'Catalog sync already in progress'}
+
+        started = time.time()
+        try:
+            fetch_result = self._fetch_all_pages()
+            if not fetch_result['success']:
+                return fetch_result
+
+            delta = self._apply_delta(fetch_result['products'])
+            duration = time.time() - started
+
+            self._set_meta('last_sync_at', datetime.now().isoformat())
+            self._set_meta('last_sync_duration', f"{duration:.2f}")
+
+            print(f"🗂️ Catalog sync: {delta['added']} added, {delta['updated']} updated, "
+                  f"{delta['removed']} removed, {delta['unchanged']} unchanged "
+                  f"({fetch_result['pages_fetched']} pages in {duration:.1f}s)")
+
+            return {
+                'success': True,
+                'total_products': fetch_result['total_products'],
+                'pages_fetched': fetch_result['pages_fetched'],
+                'duration_seconds': round(duration, 2),
+                **delta
+            }
+
+        except Exception as e:
+            return {'success': False, 'error': f'Catalog sync failed: {str(e)}'}
+
+        finally:
+            self._sync_lock.release()
+
+    def _fetch_all_pages(self) -> Dict:
+        """Fetch listing pages in parallel waves until an empty or repeated page is seen"""
+        products_by_key = {}
+        pages_fetched = 0
+        page = 1
+        done = False
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            while not done and page <= self.max_pages:
+                wave = range(page, min(page + self.max_workers, self.max_pages + 1))
+
+                # map preserves page order, so the stop condition is deterministic
+                for page_number, page_result in zip(wave, executor.map(self._fetch_page, wave)):
+                    if not page_result['success']:
+                        return {
+                            'success': False,
+                            'error': f"Failed to fetch catalog page {page_number}: {page_result.get('error')}"
+                        }
+
+                    pages_fetched += 1
+                    page_products = page_result['products']
+                    new_keys = 0
+                    for product in page_products:
+                        key = self._product_key(product)
+                        if key not in products_by_key:
+                            new_keys += 1
+                        products_by_key[key] = product
+
+                    # Only an empty page ends the listing: the store may cap the page size
+                    # below page_size, so a short page proves nothing. A page with nothing
+                    # new means the endpoint ignored the page parameter.
+                    if not page_products or new_keys == 0:
+                        done = True
+                        break
+
+                page += self.max_workers
+
+        if not done:
+            # Applying a partial listing would drop every product past the last page
+            return {
+                'success': False,
+                'error': f"Catalog listing did not end within {self.max_pages} pages"
+            }
+
+        return {
+            'success': True,
+            'products': products_by_key,
+            'total_products': len(products_by_key),
+            'pages_fetched': pages_fetched
+        }
+
+    def _fetch_page(self, page: int) -> Dict:
+        """Fetch a single listing page and normalize the product list"""
+        try:
+            result = self.opencart_client.get_products(limit=self.page_size, page=page)
+            if not result.get('success'):
+                return {'success': False, 'error': result.get('error', 'Unknown error')}
+            return {'success': True, 'products': extract_listing_products(result.get('data'))}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    @staticmethod
+    def _content_hash(product: Dict) -> str:
+        """Stable hash of a product payload"""
+        payload = json.dumps(product, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _product_key(self, product: Dict) -> str:
+        """Identify a product by store id, falling back to model or content hash"""
+        for field in ('product_id', 'id'):
+            if product.get(field) not in (None, ''):
+                return f"id:{product[field]}"
+        if product.get('model'):
+            return f"model:{product['model']}"
+        return f"hash:{self._content_hash(product)}"
+
+    def _apply_delta(self, products_by_key: Dict[str, Dict]) -> Dict:
+        """Write only new or changed products and drop ones no longer listed"""
+        with self._connect() as conn:
+            existing = {
+                row['product_key']: (row['date_modified'], row['content_hash'])
+                for row in conn.execute("SELECT product_key, date_modified, content_hash FROM products")
+            }
+
+            now = datetime.now().isoformat()
+            upserts = []
+            added = updated = unchanged = 0
+
+            for key, product in products_by_key.items():
+                content_hash = self._content_hash(product)
+                date_modified = str(product.get('date_modified') or '')
+                previous = existing.get(key)
+
+                if previous is None:
+                    added += 1
+                elif previous == (date_modified, content_hash):
+                    unchanged += 1
+                    continue
+                else:
+                    updated += 1
+
+                upserts.append((
+                    key,
+                    str(product.get('model') or ''),
+                    str(product.get('sku') or ''),
+                    str(product.get('name') or ''),
+                    date_modified,
+                    content_hash,
+                    json.dumps(product, default=str),
+                    now
+                ))
+
+            conn.executemany("""
+                INSERT INTO products (product_key, model, sku, name, date_modified, content_hash, data, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(product_key) DO UPDATE SET
+                    model = excluded.model,
+                    sku = excluded.sku,
+                    name = excluded.name,
+                    date_modified = excluded.date_modified,
+                    content_hash = excluded.content_hash,
+                    data = excluded.data,
+                    synced_at = excluded.synced_at
+            """, upserts)
+
+            removed_keys = [(key,) for key in existing if key not in products_by_key]
+            conn.executemany("DELETE FROM products WHERE product_key = ?", removed_keys)
+
+        return {
+            'added': added,
+            'updated': updated,
+            'removed': len(removed_keys),
+            'unchanged': unchanged
+        }
+
+    # ========== META ==========
+
+    def _set_meta(self, key: str, value: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO snapshot_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM snapshot_meta WHERE key = ?", (key,)).fetchone()
+            return row['value'] if row else None
+
+    def get_status(self) -> Dict:
+        """Snapshot size and freshness"""
+        with self._connect() as conn:
+            count = conn.execute("SELECT COUNT(*) AS total FROM products").fetchone()['total']
+
+        return {
+            'db_path': self.db_path,
+            'total_products': count,
+            'last_sync_at': self._get_meta('last_sync_at'),
+            'last_sync_duration': self._get_meta('last_sync_duration'),
+            'sync_in_progress': self._sync_lock.locked()
+        }
+
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM products LIMIT 1").fetchone() is None
+
+    # ========== CLIENT-COMPATIBLE READS ==========
+
+    def get_all_products(self) -> List[Dict]:
+        """Every product in the snapshot, in the order first synced"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM products ORDER BY rowid").fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def get_products(self, limit: Optional[int] = None, page: int = 1) -> Dict:
+        """Same result shape as SimpleOpenCartClient.get_products, served locally"""
+        products = self.get_all_products()
+        if limit:
+            start = (max(page, 1) - 1) * limit
+            products = products[start:start + limit]
+
+        return {
+            'success': True,
+            'status_code': 200,
+            'data': {'data': products},
+            'source': 'catalog_snapshot'
+        }
+
+    def search_products(self, search_term: str, limit: int = 50) -> Dict:
+        """Local equivalent of the store search: every word must appear in the name or model"""
+        words = [w for w in re.split(r'\s+', str(search_term or '').strip()) if w]
+        if not words:
+            return {'success': True, 'results': [], 'result_count': 0, 'search_term': search_term}
+
+        clauses = []
+        params = []
+        for word in words:
+            escaped = word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append("(name LIKE ? ESCAPE '\\' OR model LIKE ? ESCAPE '\\')")
+            params.extend([f'%{escaped}%', f'%{escaped}%'])
+
+        query = f"SELECT data FROM products WHERE {' AND '.join(clauses)} ORDER BY rowid LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        products = [json.loads(row['data']) for row in rows]
+        return {
+            'success': True,
+            'status_code': 200,
+            'results': products,
+            'result_count': len(products),
+            'search_term': search_term,
+            'source': 'catalog_snapshot'
+        }
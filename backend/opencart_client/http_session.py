@@ -0,0 +1,160 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class OpenCartSession:
+    """Connection-pooled, keep-alive HTTP session with retry/backoff for OpenCart API calls"""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+
+    def __init__(self, pool_size: int = 20, max_retries: int = 3, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, timeout: float = 30.0):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        # Retries are handled below so Retry-After and counters stay under our control
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying 429/5xx and connection errors with exponential backoff.
+
+        Non-idempotent methods (POST) are only retried on 429, where the
+        store has rejected the write outright.
+        """
+        method = method.upper()
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+
+        while True:
+            with self._lock:
+                self._requests += 1
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                # A timed-out POST may have been applied, so only retry safe methods
+                if attempt < self.max_retries and method in self.IDEMPOTENT_METHODS:
+                    self._sleep_before_retry(attempt)
+                    attempt += 1
+                    continue
+                with self._lock:
+                    self._failures += 1
+                raise
+
+            retryable = response.status_code in self.RETRY_STATUSES and (
+                response.status_code == 429 or method in self.IDEMPOTENT_METHODS
+            )
+            if retryable and attempt < self.max_retries:
+                self._sleep_before_retry(attempt, self._retry_after(response))
+                response.close()
+                attempt += 1
+                continue
+
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+    def _sleep_before_retry(self, attempt: int, retry_after: Optional[float] = None):
+        """Sleep for Retry-After if given, else exponential backoff with jitter"""
+        if retry_after is None:
+            delay = self.backoff_factor * (2 ** attempt)
+            delay += random.uniform(0, delay * 0.1)
+        else:
+            delay = retry_after
+        delay = min(delay, self.max_backoff)
+
+        with self._lock:
+            self._retries += 1
+        time.sleep(delay)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header given as seconds or an HTTP date"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def get_stats(self) -> Dict:
+        """Request, retry and connection-reuse counters"""
+        connections_opened = 0
+        pooled_requests = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections_opened += getattr(pool, 'num_connections', 0)
+                pooled_requests += getattr(pool, 'num_requests', 0)
+
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'retries': self._retries,
+                'failures': self._failures,
+                'connections_opened': connections_opened,
+                'connections_reused': max(0, pooled_requests - connections_opened),
+                'pool_size': self.pool_size
+            }
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> OpenCartSession:
+    """Process-wide session shared by all OpenCart clients"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = OpenCartSession(
+                pool_size=int(os.getenv('OPENCART_POOL_SIZE', 20)),
+                max_retries=int(os.getenv('OPENCART_MAX_RETRIES', 3)),
+                backoff_factor=float(os.getenv('OPENCART_BACKOFF_FACTOR', 0.5))
+            )
+        return _shared_session
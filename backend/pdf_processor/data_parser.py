@@ -1,14 +1,61 @@
 import re
 import os
-from typing import Dict, List
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .extraction_cache import ExtractionCache, get_shared_extraction_cache
+from .supplier_profiles import SupplierProfile, SupplierProfileRegistry, default_registry
+
+PRICE_INDICATOR = re.compile(r'R\s*\d{4,6}')
+PRICE_HINT = re.compile(r'\d{3}')
+PRICE_STRIP = re.compile(r'R\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?')
+WHITESPACE = re.compile(r'\s+')
+CHANNEL_PATTERN = re.compile(r'(\d+\.?\d*)\s*Ch\.')
+POWER_PATTERN = re.compile(r'(\d+)W\b')
+ALT_SPECS_HINT = re.compile(r'\d+\.?\d*\s*Ch\.|W\s|\d+W')
+# Feature keywords found in one pass, reported in this order
+FEATURE_KEYWORDS = {
+    '8K': '8K',
+    '4K': '4K',
+    'HEOS': 'HEOS',
+    'Bluetooth': 'Bluetooth',
+    'WiFi': 'WiFi',
+    'Wi-Fi': 'WiFi',
+    'Receiver': 'AV Receiver',
+    'Built-in': 'Built-in',
+}
+FEATURE_ORDER = ['8K', '4K', 'HEOS', 'Bluetooth', 'WiFi', 'AV Receiver', 'Built-in']
+FEATURE_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in FEATURE_KEYWORDS))
+# Per-line parser tracing; off by default because it costs more than the parsing itself
+DEBUG_PARSING = os.getenv('PARSER_DEBUG', 'False').lower() == 'true'
+
+@dataclass
+class LineTokens:
+    """Tokens the fallback parser needs from one line; prices/features are filled on first use"""
+    line_class: str  # 'category', 'skip' or ''
+    model: str
+    is_product: bool
+    prices: Optional[Tuple[float, ...]] = None
+    features: Optional[Tuple[str, ...]] = None
+    channel: Optional[str] = None
+    power: Optional[str] = None
 
 class DataParser:
     """Enhanced data parser with OpenAI support and improved fallback"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ExtractionCache] = None, use_cache: bool = True,
+                 registry: Optional[SupplierProfileRegistry] = None, profile_name: Optional[str] = None):
+        self.cache = cache or (get_shared_extraction_cache() if use_cache else None)
         self.use_openai = bool(os.getenv('OPENAI_API_KEY'))
         self.openai_extractor = None
         
+        # Supplier profiles are compiled once; the one matching the first page is used per document
+        self.registry = registry or default_registry
+        self.forced_profile = self.registry.get(profile_name) if profile_name else None
+        
+        # Tabular pricelists are parsed locally before any LLM call
+        self.min_table_products = 3
+        
         if self.use_openai:
             try:
                 from .openai_extractor import OpenAIExtractor
@@ -20,32 +67,155 @@ class DataParser:
         else:
             print("❌ No OpenAI API key found, using fallback parser")
         
-        # Enhanced patterns for Denon products
-        self.price_patterns = [
-            r'R\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',  # R9,990.00 or R9990
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*ZAR',  # 9990.00 ZAR
-            r'(\d{4,6})\.00',  # Simple format like 8990.00
-            r'(\d{4,6})\.\d{2}',  # Format like 8990.50
-        ]
-        
-        self.model_patterns = [
-            r'(AVR[A-Z]?-?[A-Z0-9]+[A-Z]?)',  # AVRX-580BT, AVR-X1800H
-            r'(AVC-[A-Z0-9]+[A-Z]?)',  # AVC-X3800H
-            r'(AVRS-[A-Z0-9]+)',  # AVRS-670H
-            r'(DENON[- ][A-Z0-9]+)',  # DENON HOME variants
-        ]
+        self._line_tokens: Dict[str, LineTokens] = {}
+        self._use_profile(self.forced_profile or self.registry.get('denon') or self.registry.fallback)
+    
+    def _use_profile(self, profile: SupplierProfile):
+        """Switch to a supplier profile's precompiled patterns; lines are then tokenized in a single pass each"""
+        self.profile = profile
+        self.price_patterns = profile.price_patterns
+        self.model_patterns = profile.model_patterns
+        self._model_regexes = profile.model_regexes
+        self._price_regexes = profile.price_regexes
+        self._product_hint = profile.product_hint
+        self._line_class = profile.line_class
+        self._line_tokens.clear()
+    
+    def detect_profile(self, text: str) -> SupplierProfile:
+        """Supplier profile for a document, fingerprinted from its first page"""
+        return self.forced_profile or self.registry.detect(text)
+    
+    def _tokens(self, line: str) -> LineTokens:
+        """Classify a line and extract its model/price/feature tokens, cached per line"""
+        tokens = self._line_tokens.get(line)
+        if tokens is not None:
+            return tokens
+        
+        model = ""
+        if self._product_hint.search(line):
+            for regex in self._model_regexes:
+                match = regex.search(line)
+                if match:
+                    model = match.group(1)
+                    break
+        
+        line_class = ''
+        if self._line_class is not None:
+            for match in self._line_class.finditer(line.upper()):
+                line_class = match.lastgroup
+                if line_class == 'category':
+                    break
+        
+        tokens = LineTokens(
+            line_class=line_class,
+            model=model,
+            is_product=self._classify_product_line(line, model)
+        )
+        self._line_tokens[line] = tokens
+        return tokens
+    
+    def _classify_product_line(self, line: str, model: str) -> bool:
+        """Check if line contains a product"""
+        # Primary indicators: Model patterns
+        if model:
+            return True
+        
+        # Secondary indicators: Product description patterns
+        upper = line.upper()
+        return (
+            # Common Denon product patterns
+            ('Ch.' in line and 'W ' in line)  # "5.2 Ch. 130W"
+            or ('Receiver' in line and any(char.isdigit() for char in line))
+            or ('HEOS' in line and ('AVR' in upper or 'AVC' in upper))
+            or ('8K' in line and 'AV' in upper)
+            # Price indicators (if line has prices, likely a product)
+            or bool(PRICE_INDICATOR.search(line))
+        )
+    
+    def _scan_prices(self, line: str) -> List[float]:
+        """Extract all prices from a single line"""
+        # Every price pattern needs at least three consecutive digits
+        if not PRICE_HINT.search(line):
+            return []
+        
+        prices = set()
+        for regex in self._price_regexes:
+            for match in regex.findall(line):
+                # Clean the price string
+                price_str = match.replace(',', '').replace(' ', '')
+                if price_str and price_str.replace('.', '').isdigit():
+                    try:
+                        price = float(price_str)
+                    except ValueError:
+                        continue
+                    # Reasonable price range for audio equipment
+                    if 500 <= price <= 500000:
+                        prices.add(price)
+        
+        return sorted(prices)
+    
+    def _scan_features(self, line: str, tokens: LineTokens) -> List[str]:
+        """Extract features from product description"""
+        # Technical features
+        found = {FEATURE_KEYWORDS[match] for match in FEATURE_PATTERN.findall(line)}
+        features = [feature for feature in FEATURE_ORDER if feature in found]
+        
+        # Channel configuration
+        channel_match = CHANNEL_PATTERN.search(line)
+        if channel_match:
+            tokens.channel = channel_match.group(1)
+            features.append(f"{tokens.channel} Channel")
+        
+        # Power rating
+        power_match = POWER_PATTERN.search(line)
+        if power_match:
+            tokens.power = power_match.group(1)
+            features.append(f"{tokens.power}W")
+        
+        return features
     
     def parse_text(self, text: str) -> Dict:
+        """Parse product data from text, served from the content-hash cache for repeat uploads"""
+        profile = self.detect_profile(text)
+        if profile is not self.profile:
+            self._use_profile(profile)
+        print(f"🏷️ Supplier profile: {profile.name}")
+
+        if self.cache is None:
+            return self._parse_text_uncached(text)
+
+        # OpenAI and fallback results differ, as do results per supplier profile
+        content_hash = self.cache.hash_text(text)
+        mode = 'openai' if self.use_openai and self.openai_extractor else 'fallback'
+        kind = f'parsed_{mode}_{profile.name}'
+
+        cached = self.cache.get(content_hash, kind)
+        if cached is not None:
+            print(f"⚡ Parse cache hit: {cached.get('products_found', 0)} products")
+            return {**cached, 'cache_hit': True}
+
+        result = self._parse_text_uncached(text)
+        if result.get('success') and result.get('products'):
+            self.cache.put(content_hash, kind, result)
+        return {**result, 'cache_hit': False}
+
+    def _parse_text_uncached(self, text: str) -> Dict:
         """Parse product data from text using OpenAI or enhanced fallback"""
         
         print(f"🔍 Parsing text of length: {len(text)}")
         print(f"📄 Text preview: {text[:200]}...")
         
-        # Try OpenAI first if available
+        # Clean tables need no network call at all
+        table_result = self.profile.table_parser.parse(text)
+        if table_result['success'] and table_result['products_found'] >= self.min_table_products:
+            print(f"📊 Table parser extracted {table_result['products_found']} products")
+            return table_result
+        
+        # Try OpenAI next if available
         if self.use_openai and self.openai_extractor:
             try:
                 print("🤖 Attempting OpenAI extraction...")
-                result = self.openai_extractor.extract_and_parse_products(text)
+                result = self.openai_extractor.extract_and_parse_products(text, brand=self.profile.brand)
                 if result['success'] and result.get('products_found', 0) > 0:
                     print(f"✅ OpenAI extracted {result['products_found']} products")
                     return result
@@ -54,56 +224,130 @@ class DataParser:
             except Exception as e:
                 print(f"❌ OpenAI error: {e}, falling back to enhanced parser")
         
-        # Enhanced fallback parsing specifically for Denon format
+        # Enhanced fallback parsing with the supplier profile's patterns
         print("🔧 Using enhanced fallback parser...")
-        return self._parse_denon_format(text)
-    
-    def _parse_denon_format(self, text: str) -> Dict:
-        """Parse Denon pricelist format specifically"""
         try:
-            products = []
-            
+            return self._parse_profile_format(text)
+        finally:
+            # Token cache only lives for one document
+            self._line_tokens.clear()
+
+    def iter_parse_pages(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Dict]:
+        """Parse (page_number, text) pairs one page at a time, yielding each page's products in page order.
+
+        The supplier profile is picked from the first page; table columns and
+        the current category carry over between pages. Pages the table parser
+        can't read are buffered and sent to OpenAI together, a few prompt
+        chunks at a time, so at most that much text is held at once.
+        """
+        table_state = None
+        category = None
+        llm_pages: List[Tuple[int, str]] = []
+        llm_chars = 0
+        llm_budget = 0
+        if self.use_openai and self.openai_extractor:
+            llm_budget = self.openai_extractor.max_chunk_chars * self.openai_extractor.max_in_flight
+
+        for page_number, page_text in pages:
+            if table_state is None:
+                self._use_profile(self.detect_profile(page_text))
+                print(f"🏷️ Supplier profile: {self.profile.name}")
+                table_state = self.profile.table_parser.new_state()
+                category = self.profile.default_category
+
+            products = self.profile.table_parser.parse_page(page_text, table_state)
+            if not products and llm_budget and page_text.strip():
+                llm_pages.append((page_number, page_text))
+                llm_chars += len(page_text)
+                if llm_chars >= llm_budget:
+                    results, category = self._parse_llm_pages(llm_pages, category)
+                    yield from results
+                    llm_pages, llm_chars = [], 0
+                continue
+
+            # Earlier buffered pages go first to keep page order
+            if llm_pages:
+                results, category = self._parse_llm_pages(llm_pages, category)
+                yield from results
+                llm_pages, llm_chars = [], 0
+
+            method = 'table_parsing'
+            if not products:
+                products, category = self._parse_page_lines(page_text, category)
+                method = f'{self.profile.name}_enhanced_parsing'
+            yield self._page_result(page_number, products, method)
+
+        if llm_pages:
+            results, category = self._parse_llm_pages(llm_pages, category)
+            yield from results
+
+    def _parse_llm_pages(self, llm_pages: List[Tuple[int, str]],
+                         category: Optional[str]) -> Tuple[List[Dict], Optional[str]]:
+        """One chunked OpenAI extraction over consecutive pages; products go back to the page naming their model"""
+        text = "".join(f"--- Page {page_number} ---\n{page_text}\n" for page_number, page_text in llm_pages)
+        result = self.openai_extractor.extract_and_parse_products(text, brand=self.profile.brand)
+
+        if not result['success']:
+            print(f"⚠️ OpenAI failed: {result.get('error', 'Unknown error')}, falling back to enhanced parser")
+            results = []
+            for page_number, page_text in llm_pages:
+                products, category = self._parse_page_lines(page_text, category)
+                results.append(self._page_result(page_number, products, f'{self.profile.name}_enhanced_parsing'))
+            return results, category
+
+        upper_texts = [(page_number, page_text.upper()) for page_number, page_text in llm_pages]
+        products_by_page = {page_number: [] for page_number, _ in llm_pages}
+        for product in result['products']:
+            model = str(product.get('model') or '').strip().upper()
+            page_number = next(
+                (number for number, page_text in upper_texts if model and model in page_text),
+                llm_pages[-1][0]
+            )
+            products_by_page[page_number].append(product)
+
+        results = []
+        for page_number, page_text in llm_pages:
+            products = products_by_page[page_number]
+            method = 'openai_extraction'
+            if not products:
+                # A page OpenAI found nothing on still gets the line parser, as before batching
+                products, category = self._parse_page_lines(page_text, category)
+                method = f'{self.profile.name}_enhanced_parsing'
+            results.append(self._page_result(page_number, products, method))
+        return results, category
+
+    def _parse_page_lines(self, page_text: str, category: Optional[str]) -> Tuple[List[Dict], Optional[str]]:
+        """Fallback line parser for one page"""
+        try:
+            lines = [line.strip() for line in page_text.split('\n') if line.strip()]
+            return self._parse_profile_lines(lines, category)
+        finally:
+            self._line_tokens.clear()
+
+    def _page_result(self, page_number: int, products: List[Dict], method: str) -> Dict:
+        return {
+            'success': True,
+            'page': page_number,
+            'products_found': len(products),
+            'products': products,
+            'method': method,
+            'supplier_profile': self.profile.name
+        }
+
+    def _parse_profile_format(self, text: str) -> Dict:
+        """Parse a pricelist line by line using the active supplier profile"""
+        try:
             # Split into lines and clean
             lines = [line.strip() for line in text.split('\n') if line.strip()]
             
             print(f"Processing {len(lines)} lines...")
             
-            # Debug: Print all lines to understand structure
-            for i, line in enumerate(lines[:20]):  # First 20 lines for debugging
-                print(f"Line {i}: '{line}'")
+            if DEBUG_PARSING:
+                for i, line in enumerate(lines[:20]):  # First 20 lines for debugging
+                    print(f"Line {i}: '{line}'")
             
             # Look for the price table pattern
-            current_category = "AV Receivers"
-            i = 0
-            
-            while i < len(lines):
-                line = lines[i]
-                
-                # Detect category changes
-                if any(cat in line.upper() for cat in ['AV RECEIVERS', 'DENON HOME', 'SPEAKERS', 'AMPLIFIERS']):
-                    current_category = line
-                    print(f"📂 Found category: {current_category}")
-                    i += 1
-                    continue
-                
-                # Skip obvious header lines
-                if any(skip in line.upper() for skip in [
-                    'APRIL 2025', 'BLACK', 'OLD RRP', 'NEW RRP', 'WHITE', 'MONTH', 'YEAR'
-                ]):
-                    i += 1
-                    continue
-                
-                # Look for product lines
-                if self._is_product_line(line):
-                    print(f"🔍 Processing potential product line: '{line}'")
-                    product = self._extract_denon_product(line, lines, i, current_category)
-                    if product:
-                        products.append(product)
-                        print(f"✅ Found product: {product['name']} - R{product.get('price', 'No price')}")
-                    else:
-                        print(f"❌ Could not extract product from: '{line}'")
-                
-                i += 1
+            products, _ = self._parse_profile_lines(lines, self.profile.default_category)
             
             print(f"🎯 Enhanced parser extracted {len(products)} products")
             
@@ -119,7 +363,8 @@ class DataParser:
                 'success': True,
                 'products_found': len(products),
                 'products': products,
-                'method': 'denon_enhanced_parsing',
+                'method': f'{self.profile.name}_enhanced_parsing',
+                'supplier_profile': self.profile.name,
                 'raw_text_preview': text[:500] + "..." if len(text) > 500 else text
             }
             
@@ -132,34 +377,57 @@ class DataParser:
                 'raw_text_preview': text[:200] if text else ""
             }
     
-    def _is_product_line(self, line: str) -> bool:
-        """Check if line contains a product"""
-        # Primary indicators: Model patterns
-        for pattern in self.model_patterns:
-            if re.search(pattern, line, re.IGNORECASE):
-                return True
+    def _parse_profile_lines(self, lines: List[str], current_category: str) -> Tuple[List[Dict], str]:
+        """Extract products from stripped lines; returns them with the category in effect at the end"""
+        products = []
+        i = 0
         
-        # Secondary indicators: Product description patterns
-        product_indicators = [
-            # Common Denon product patterns
-            ('Ch.' in line and 'W ' in line),  # "5.2 Ch. 130W"
-            ('Receiver' in line and any(char.isdigit() for char in line)),
-            ('HEOS' in line and ('AVR' in line.upper() or 'AVC' in line.upper())),
-            ('8K' in line and 'AV' in line.upper()),
-            # Price indicators (if line has prices, likely a product)
-            bool(re.search(r'R\s*\d{4,6}', line))
-        ]
+        while i < len(lines):
+            line = lines[i]
+            
+            line_class = self._tokens(line).line_class
+            
+            # Detect category changes
+            if line_class == 'category':
+                current_category = line
+                if DEBUG_PARSING:
+                    print(f"📂 Found category: {current_category}")
+                i += 1
+                continue
+            
+            # Skip obvious header lines
+            if line_class == 'skip':
+                i += 1
+                continue
+            
+            # Look for product lines
+            if self._is_product_line(line):
+                if DEBUG_PARSING:
+                    print(f"🔍 Processing potential product line: '{line}'")
+                product = self._extract_profile_product(line, lines, i, current_category)
+                if product:
+                    products.append(product)
+                    if DEBUG_PARSING:
+                        print(f"✅ Found product: {product['name']} - R{product.get('price', 'No price')}")
+                elif DEBUG_PARSING:
+                    print(f"❌ Could not extract product from: '{line}'")
+            
+            i += 1
         
-        return any(product_indicators)
+        return products, current_category
+    
+    def _is_product_line(self, line: str) -> bool:
+        """Check if line contains a product"""
+        return self._tokens(line).is_product
     
-    def _extract_denon_product(self, line: str, all_lines: List[str], line_index: int, category: str = "AV Receivers") -> Dict:
-        """Extract product from Denon format line"""
+    def _extract_profile_product(self, line: str, all_lines: List[str], line_index: int, category: Optional[str] = None) -> Dict:
+        """Extract product from a pricelist line"""
         try:
             # Basic product structure
             product = {
-                'brand': 'Denon',
-                'currency': 'ZAR',
-                'category': category,
+                'brand': self.profile.brand,
+                'currency': self.profile.currency,
+                'category': category or self.profile.default_category,
                 'availability': 'In Stock',
                 'features': []
             }
@@ -168,24 +436,28 @@ class DataParser:
             model = self._extract_model(line)
             if model:
                 product['model'] = model
-                print(f"🏷️ Found model: {model}")
+                if DEBUG_PARSING:
+                    print(f"🏷️ Found model: {model}")
             
             # Extract product name (clean version without prices)
             clean_name = self._clean_product_name(line)
             product['name'] = clean_name
             product['specifications'] = line
             
-            print(f"📝 Product name: {clean_name}")
+            if DEBUG_PARSING:
+                print(f"📝 Product name: {clean_name}")
             
             # Extract prices from current line
             prices = self._extract_all_prices_from_line(line)
-            print(f"💰 Prices found in line: {prices}")
+            if DEBUG_PARSING:
+                print(f"💰 Prices found in line: {prices}")
             
             # If no prices in current line, check surrounding lines
             if not prices:
                 context_prices = self._find_prices_in_context(all_lines, line_index, model or clean_name)
                 prices.extend(context_prices)
-                print(f"💰 Prices found in context: {context_prices}")
+                if DEBUG_PARSING:
+                    print(f"💰 Prices found in context: {context_prices}")
             
             # Assign prices
             if prices:
@@ -201,7 +473,8 @@ class DataParser:
                 else:
                     product['price'] = prices[0]
                 
-                print(f"💰 Final pricing: Price={product.get('price')}, Old Price={product.get('old_price')}")
+                if DEBUG_PARSING:
+                    print(f"💰 Final pricing: Price={product.get('price')}, Old Price={product.get('old_price')}")
             
             # Extract features from the product description
             features = self._extract_features(line)
@@ -215,7 +488,8 @@ class DataParser:
             if product.get('name') and (product.get('price') or product.get('model')):
                 return product
             else:
-                print(f"❌ Product missing required fields: name='{product.get('name')}', price={product.get('price')}, model='{product.get('model')}'")
+                if DEBUG_PARSING:
+                    print(f"❌ Product missing required fields: name='{product.get('name')}', price={product.get('price')}, model='{product.get('model')}'")
                 return None
             
         except Exception as e:
@@ -224,19 +498,15 @@ class DataParser:
     
     def _extract_model(self, line: str) -> str:
         """Extract model number from line"""
-        for pattern in self.model_patterns:
-            match = re.search(pattern, line, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        return ""
+        return self._tokens(line).model
     
     def _clean_product_name(self, line: str) -> str:
         """Clean product name by removing prices and extra formatting"""
         # Remove prices
-        clean_line = re.sub(r'R\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?', '', line)
+        clean_line = PRICE_STRIP.sub('', line)
         
         # Remove excessive whitespace
-        clean_line = re.sub(r'\s+', ' ', clean_line.strip())
+        clean_line = WHITESPACE.sub(' ', clean_line.strip())
         
         # Remove trailing dashes or separators
         clean_line = clean_line.rstrip(' -–—')
@@ -245,23 +515,10 @@ class DataParser:
     
     def _extract_all_prices_from_line(self, line: str) -> List[float]:
         """Extract all prices from a single line"""
-        prices = []
-        
-        for pattern in self.price_patterns:
-            matches = re.findall(pattern, line)
-            for match in matches:
-                try:
-                    # Clean the price string
-                    price_str = match.replace(',', '').replace(' ', '')
-                    if price_str and price_str.replace('.', '').isdigit():
-                        price = float(price_str)
-                        # Reasonable price range for audio equipment
-                        if 500 <= price <= 500000:
-                            prices.append(price)
-                except (ValueError, AttributeError):
-                    continue
-        
-        return sorted(set(prices))  # Remove duplicates and sort
+        tokens = self._tokens(line)
+        if tokens.prices is None:
+            tokens.prices = tuple(self._scan_prices(line))
+        return list(tokens.prices)
     
     def _find_prices_in_context(self, lines: List[str], line_index: int, product_identifier: str) -> List[float]:
         """Find prices in surrounding lines that might belong to this product"""
@@ -288,39 +545,14 @@ class DataParser:
     
     def _extract_features(self, line: str) -> List[str]:
         """Extract features from product description"""
-        features = []
-        
-        # Technical features
-        if '8K' in line:
-            features.append('8K')
-        if '4K' in line:
-            features.append('4K')
-        if 'HEOS' in line:
-            features.append('HEOS')
-        if 'Bluetooth' in line:
-            features.append('Bluetooth')
-        if 'WiFi' in line or 'Wi-Fi' in line:
-            features.append('WiFi')
-        if 'Receiver' in line:
-            features.append('AV Receiver')
-        if 'Built-in' in line:
-            features.append('Built-in')
-        
-        # Channel configuration
-        channel_match = re.search(r'(\d+\.?\d*)\s*Ch\.', line)
-        if channel_match:
-            features.append(f"{channel_match.group(1)} Channel")
-        
-        # Power rating
-        power_match = re.search(r'(\d+)W\b', line)
-        if power_match:
-            features.append(f"{power_match.group(1)}W")
-        
-        return features
+        tokens = self._tokens(line)
+        if tokens.features is None:
+            tokens.features = tuple(self._scan_features(line, tokens))
+        return list(tokens.features)
     
     def _create_seo_name(self, product: Dict) -> str:
         """Create SEO-friendly name"""
-        parts = ['Denon']
+        parts = [self.profile.brand] if self.profile.brand else []
         
         if product.get('model'):
             parts.append(product['model'])
@@ -328,15 +560,17 @@ class DataParser:
         # Add key specs
         specs = product.get('specifications', '')
         if specs:
+            # Channel and power come from the line's cached tokens
+            self._extract_features(specs)
+            tokens = self._tokens(specs)
+            
             # Extract channel info
-            channel_match = re.search(r'(\d+\.?\d*)\s*Ch\.', specs)
-            if channel_match:
-                parts.append(f"{channel_match.group(1)}Ch")
+            if tokens.channel:
+                parts.append(f"{tokens.channel}Ch")
             
             # Extract power info
-            power_match = re.search(r'(\d+)W\b', specs)
-            if power_match:
-                parts.append(f"{power_match.group(1)}W")
+            if tokens.power:
+                parts.append(f"{tokens.power}W")
         
         # Add category
         if 'Receiver' in product.get('name', ''):
@@ -366,18 +600,18 @@ class DataParser:
                     continue
                 
                 # More aggressive product detection
-                has_model = bool(re.search(r'AVR|AVC|DENON', line, re.IGNORECASE))
-                has_price = bool(re.search(r'R\s*\d{4,6}', line))
-                has_specs = bool(re.search(r'\d+\.?\d*\s*Ch\.|W\s|\d+W', line))
+                has_model = bool(self.profile.model_hint.search(line))
+                has_price = bool(PRICE_INDICATOR.search(line))
+                has_specs = bool(ALT_SPECS_HINT.search(line))
                 
                 if (has_model and has_price) or (has_specs and has_price):
                     product = {
                         'name': self._clean_product_name(line),
                         'model': self._extract_model(line),
                         'specifications': line,
-                        'brand': 'Denon',
-                        'currency': 'ZAR',
-                        'category': 'AV Receivers',
+                        'brand': self.profile.brand,
+                        'currency': self.profile.currency,
+                        'category': self.profile.default_category,
                         'features': self._extract_features(line)
                     }
                     
@@ -392,7 +626,8 @@ class DataParser:
                     
                     if product.get('name') and product.get('price'):
                         products.append(product)
-                        print(f"🎯 Alternative parser found: {product['name']} - R{product['price']}")
+                        if DEBUG_PARSING:
+                            print(f"🎯 Alternative parser found: {product['name']} - R{product['price']}")
         
         except Exception as e:
             print(f"❌ Alternative parsing failed: {e}")
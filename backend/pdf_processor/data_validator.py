@@ -1,7 +1,43 @@
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
+import numpy as np
+import pandas as pd
+
+# Per-row bits returned by DataValidator.column_flags, one per validate_product check
+FLAG_MISSING_NAME = 1 << 0
+FLAG_SHORT_NAME = 1 << 1
+FLAG_MISSING_PRICE = 1 << 2
+FLAG_LOW_PRICE = 1 << 3
+FLAG_LONG_NAME = 1 << 4
+FLAG_HIGH_PRICE = 1 << 5
+FLAG_UNKNOWN_BRAND = 1 << 6
+FLAG_UNKNOWN_CATEGORY = 1 << 7
+
+# Flags that make a row invalid; the rest are warnings
+ERROR_FLAGS = FLAG_MISSING_NAME | FLAG_SHORT_NAME | FLAG_MISSING_PRICE
+
+# The messages validate_product reports, in its order (it adds the offending value to warnings)
+FLAG_MESSAGES = {
+    FLAG_MISSING_NAME: "Product name is required",
+    FLAG_SHORT_NAME: "Product name too short (minimum {min_name_length} characters)",
+    FLAG_LONG_NAME: "Product name too long (maximum {max_name_length} characters)",
+    FLAG_MISSING_PRICE: "Valid price is required",
+    FLAG_LOW_PRICE: "Price seems very low",
+    FLAG_HIGH_PRICE: "Price seems very high",
+    FLAG_UNKNOWN_BRAND: "Unknown brand",
+    FLAG_UNKNOWN_CATEGORY: "Unknown category",
+}
+
+# Same deductions as validate_product, so both modes score a row identically
+FLAG_PENALTIES = {
+    FLAG_MISSING_NAME: 0.3,
+    FLAG_SHORT_NAME: 0.2,
+    FLAG_MISSING_PRICE: 0.4,
+    FLAG_LOW_PRICE: 0.1,
+}
+
 @dataclass
 class ValidationResult:
     """Validation result structure"""
@@ -35,12 +71,16 @@ class DataValidator:
             'Audio-Technica', 'Sony', 'Bose', 'Harman Kardon',
             'Electro-Voice', 'Martin Audio', 'd&b audiotechnik'
         }
+        self._known_brands_lower = {brand.lower() for brand in self.known_brands}
+        self._valid_categories_lower = {category.lower() for category in self.valid_categories}
 
     def validate_product_batch(self, products: List[Dict]) -> Dict:
         """Validate a batch of products"""
         results = []
         total_confidence = 0.0
         valid_count = 0
+        confidence_by_index = {}
+        errors_by_index = {}
 
         for i, product in enumerate(products):
             validation = self.validate_product(product)
@@ -51,8 +91,11 @@ class DataValidator:
             })
 
             total_confidence += validation.confidence_score
+            confidence_by_index[i] = validation.confidence_score
             if validation.is_valid:
                 valid_count += 1
+            else:
+                errors_by_index[i] = validation.errors
 
         avg_confidence = total_confidence / len(products) if products else 0.0
 
@@ -62,9 +105,118 @@ class DataValidator:
             'invalid_products': len(products) - valid_count,
             'average_confidence': round(avg_confidence, 2),
             'overall_quality': self._get_quality_rating(avg_confidence),
+            'confidence_by_index': confidence_by_index,
+            'errors_by_index': errors_by_index,
             'results': results
         }
 
+    def merge_batch_results(self, batch_results: List[Dict]) -> Dict:
+        """Combine validate_product_batch results of consecutive batches (e.g. pages)"""
+        results = []
+        total_confidence = 0.0
+        valid_count = 0
+
+        confidence_by_index = {}
+        errors_by_index = {}
+
+        for batch in batch_results:
+            offset = len(results)
+            for result in batch['results']:
+                index = offset + result['index']
+                validation = result['validation']
+                results.append({**result, 'index': index})
+                total_confidence += validation.confidence_score
+                confidence_by_index[index] = validation.confidence_score
+                if not validation.is_valid:
+                    errors_by_index[index] = validation.errors
+            valid_count += batch['valid_products']
+
+        avg_confidence = total_confidence / len(results) if results else 0.0
+
+        return {
+            'total_products': len(results),
+            'valid_products': valid_count,
+            'invalid_products': len(results) - valid_count,
+            'average_confidence': round(avg_confidence, 2),
+            'overall_quality': self._get_quality_rating(avg_confidence),
+            'confidence_by_index': confidence_by_index,
+            'errors_by_index': errors_by_index,
+            'results': results
+        }
+
+    def validate_columns(self, products: Union[List[Dict], pd.DataFrame]) -> Dict:
+        """Columnar batch validation with the same summary keys as validate_product_batch.
+
+        Checks run as array operations over whole columns instead of building a
+        ValidationResult per product; rows get the scores and error messages
+        validate_product would give them. Only plain Python values are returned.
+        """
+        flags, confidence = self.column_flags(products)
+        total = len(flags)
+        valid = (flags & ERROR_FLAGS) == 0
+        valid_count = int(valid.sum())
+        avg_confidence = float(confidence.mean()) if total else 0.0
+
+        return {
+            'total_products': total,
+            'valid_products': valid_count,
+            'invalid_products': total - valid_count,
+            'average_confidence': round(avg_confidence, 2),
+            'overall_quality': self._get_quality_rating(avg_confidence),
+            'flag_counts': {
+                self.describe_flags(flag)[0]: int(((flags & flag) != 0).sum()) for flag in FLAG_MESSAGES
+            },
+            'confidence_by_index': dict(enumerate(confidence.tolist())),
+            'errors_by_index': {
+                int(index): self.describe_flags(int(flags[index]) & ERROR_FLAGS)
+                for index in np.flatnonzero(~valid)
+            }
+        }
+
+    def column_flags(self, products: Union[List[Dict], pd.DataFrame]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-row FLAG_* bitmasks and confidence scores as numpy arrays"""
+        if isinstance(products, pd.DataFrame):
+            frame = products
+            column = lambda field: frame[field] if field in frame.columns else pd.Series([None] * len(frame), dtype=object)
+        else:
+            column = lambda field: pd.Series([product.get(field) for product in products], dtype=object)
+
+        total = len(products)
+        names = column('name').fillna('').astype(str)
+        name_lengths = names.str.len().to_numpy()
+        prices = pd.to_numeric(column('price'), errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        manufacturers = column('manufacturer').fillna('').astype(str).str.strip()
+        brands = manufacturers.where(manufacturers != '', column('brand').fillna('').astype(str).str.strip())
+        categories = column('category').fillna('').astype(str).str.strip()
+
+        flags = np.zeros(total, dtype=np.uint8)
+        missing_name = name_lengths == 0
+        missing_price = prices <= 0
+        checks = (
+            (FLAG_MISSING_NAME, missing_name),
+            (FLAG_SHORT_NAME, ~missing_name & (name_lengths < self.min_name_length)),
+            (FLAG_MISSING_PRICE, missing_price),
+            (FLAG_LOW_PRICE, ~missing_price & (prices < self.min_price)),
+            (FLAG_LONG_NAME, name_lengths > self.max_name_length),
+            (FLAG_HIGH_PRICE, prices > self.max_price),
+            (FLAG_UNKNOWN_BRAND, ((brands != '') & ~brands.str.lower().isin(self._known_brands_lower)).to_numpy()),
+            (FLAG_UNKNOWN_CATEGORY, ((categories != '') & ~categories.str.lower().isin(self._valid_categories_lower)).to_numpy()),
+        )
+        for flag, mask in checks:
+            flags[mask] |= flag
+
+        confidence = np.ones(total)
+        for flag, penalty in FLAG_PENALTIES.items():
+            confidence -= penalty * ((flags & flag) != 0)
+        confidence = np.clip(confidence, 0.0, 1.0)
+
+        return flags, confidence
+
+    def describe_flags(self, flags: int) -> List[str]:
+        """Human-readable messages for a row's flag bitmask"""
+        return [message.format(min_name_length=self.min_name_length, max_name_length=self.max_name_length)
+                for flag, message in FLAG_MESSAGES.items() if flags & flag]
+
     def validate_product(self, product: Dict) -> ValidationResult:
         """Validate a single product"""
         errors = []
@@ -79,6 +231,8 @@ class DataValidator:
         elif len(product['name']) < self.min_name_length:
             errors.append(f"Product name too short (minimum {self.min_name_length} characters)")
             confidence_score -= 0.2
+        elif len(product['name']) > self.max_name_length:
+            warnings.append(f"Product name too long (maximum {self.max_name_length} characters)")
 
         # Validate price
         price = product.get('price', 0)
@@ -88,6 +242,16 @@ class DataValidator:
         elif price < self.min_price:
             warnings.append(f"Price seems very low (R{price})")
             confidence_score -= 0.1
+        elif price > self.max_price:
+            warnings.append(f"Price seems very high (R{price})")
+
+        # Brand and category are informational; they do not lower the score
+        brand = str(product.get('manufacturer') or '').strip() or str(product.get('brand') or '').strip()
+        if brand and brand.lower() not in self._known_brands_lower:
+            warnings.append(f"Unknown brand ({brand})")
+        category = str(product.get('category') or '').strip()
+        if category and category.lower() not in self._valid_categories_lower:
+            warnings.append(f"Unknown category ({category})")
 
         # Ensure confidence score is within bounds
         confidence_score = max(0.0, min(1.0, confidence_score))
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class ExtractionCache:
+    """Content-addressed on-disk cache for extraction and parsing results.
+
+    Entries are keyed on the SHA-256 of the source bytes (PDF/Excel file or
+    extracted text) plus a ``kind`` naming the stage that produced them, so a
+    repeat upload of the same file skips OCR and LLM calls entirely. Total
+    size is bounded; least recently used entries are evicted first.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024):
+        self.db_path = db_path or os.getenv(
+            'EXTRACTION_CACHE_PATH',
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'extraction_cache.db')
+        )
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._create_schema()
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of a file, read in chunks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def _create_schema(self):
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    content_hash TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (content_hash, kind)
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+            """)
+
+    def get(self, content_hash: str, kind: str) -> Optional[Dict]:
+        """Return a cached result and mark it as recently used"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value FROM entries WHERE content_hash = ? AND kind = ?",
+                    (content_hash, kind)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE entries SET last_access = ? WHERE content_hash = ? AND kind = ?",
+                        (time.time(), content_hash, kind)
+                    )
+        except sqlite3.Error as e:
+            print(f"⚠️ Extraction cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, content_hash: str, kind: str, value: Dict):
+        """Store a result, then evict least recently used entries over the size bound"""
+        payload = json.dumps(value, default=str)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO entries (content_hash, kind, value, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(content_hash, kind) DO UPDATE SET "
+                    "value = excluded.value, size = excluded.size, last_access = excluded.last_access",
+                    (content_hash, kind, payload, size, now, now)
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"⚠️ Extraction cache write failed: {e}")
+
+    def _evict(self, conn):
+        """Drop least recently used entries until the total size fits"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT content_hash, kind, size FROM entries ORDER BY last_access"
+        ).fetchall()
+        evicted = []
+        for content_hash, kind, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((content_hash, kind))
+            total -= size
+
+        conn.executemany("DELETE FROM entries WHERE content_hash = ? AND kind = ?", evicted)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict:
+        """Entry count, stored bytes and hit ratio"""
+        with self._connect() as conn:
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'size_bytes': total,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+class LLMResponseCache(ExtractionCache):
+    """Persistent cache of raw LLM responses per prompt chunk.
+
+    The key covers everything that changes the response: chunk text, model,
+    prompt template version and temperature. Unchanged pages of a re-issued
+    pricelist are answered from disk instead of the API.
+    """
+
+    KIND = 'llm_response'
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: int = 128 * 1024 * 1024):
+        super().__init__(
+            db_path=db_path or os.getenv(
+                'LLM_CACHE_PATH',
+                os.path.join(os.path.dirname(os.path.dirname(__file__)), 'llm_cache.db')
+            ),
+            max_bytes=max_bytes
+        )
+
+    @staticmethod
+    def prompt_version(*template_parts: str) -> str:
+        """Short fingerprint of a prompt template; changes whenever the wording does"""
+        return hashlib.sha256("\x00".join(template_parts).encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(chunk_text: str, model: str, prompt_version: str, temperature: float) -> str:
+        payload = json.dumps([chunk_text, model, prompt_version, temperature])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_response(self, key: str) -> Optional[str]:
+        entry = self.get(key, self.KIND)
+        return entry['response'] if entry else None
+
+    def put_response(self, key: str, response_text: str):
+        self.put(key, self.KIND, {'response': response_text})
+
+
+_shared_cache = None
+_shared_llm_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_extraction_cache() -> ExtractionCache:
+    """Process-wide extraction cache shared by extractors, parsers and upload routes"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ExtractionCache(
+                max_bytes=int(float(os.getenv('EXTRACTION_CACHE_MAX_MB', 256)) * 1024 * 1024)
+            )
+        return _shared_cache
+
+
+def get_shared_llm_cache() -> LLMResponseCache:
+    """Process-wide LLM response cache"""
+    global _shared_llm_cache
+    with _shared_cache_lock:
+        if _shared_llm_cache is None:
+            _shared_llm_cache = LLMResponseCache(
+                max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', 128)) * 1024 * 1024)
+            )
+        return _shared_llm_cache
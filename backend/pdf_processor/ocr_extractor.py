@@ -1,79 +1,203 @@
 import PyPDF2
-import pytesseract
-from pdf2image import convert_from_path
-from typing import Dict, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 import os
+import re
 import tempfile
 
+from .extraction_cache import ExtractionCache, get_shared_extraction_cache
+
+# OCR is optional (pytesseract/pdf2image plus the tesseract and poppler binaries);
+# without it, pages that would need OCR keep their text layer
+try:
+    import pytesseract
+    from pdf2image import convert_from_path
+except ImportError:
+    pytesseract = None
+    convert_from_path = None
+
+PAGE_MARKER = re.compile(r'^--- Page (\d+) ---$', re.MULTILINE)
+
+def _init_ocr_worker():
+    """Keep each Tesseract process single-threaded so the pool doesn't oversubscribe cores"""
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+def _ocr_page_range(pdf_path: str, first_page: int, last_page: int,
+                    dpi: int) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """Rasterize and OCR a page range; runs in a worker process.
+
+    Returns (page, text, error) per page; a page that fails has text None and the error.
+    """
+    results = []
+    for page_number in range(first_page, last_page + 1):
+        try:
+            if pytesseract is None:
+                raise RuntimeError("OCR not installed (pytesseract, pdf2image)")
+            # One page at a time keeps at most a single bitmap alive per worker
+            images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+            texts = []
+            for image in images:
+                texts.append(pytesseract.image_to_string(image))
+                image.close()
+            results.append((page_number, "".join(texts), None))
+        except Exception as e:
+            results.append((page_number, None, str(e)))
+    return results
+
+def _ocr_warning(page_number: int, error: str) -> str:
+    return f"Page {page_number}: OCR failed ({error}); kept the text layer"
+
 class OCRExtractor:
     """Extract text from PDF files using OCR"""
 
-    def __init__(self):
+    def __init__(self, parallel_ocr: bool = True, max_workers: Optional[int] = None,
+                 dpi: int = 200, min_page_chars: int = 20,
+                 min_readable_ratio: float = 0.7, cache: Optional[ExtractionCache] = None,
+                 use_cache: bool = True):
         # Configure Tesseract path if needed (Windows)
         # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        pass
+        self.parallel_ocr = parallel_ocr
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.dpi = dpi
+        # Pages below these thresholds are treated as scans and sent to OCR
+        self.min_page_chars = min_page_chars
+        self.min_readable_ratio = min_readable_ratio
+        self.cache = cache or (get_shared_extraction_cache() if use_cache else None)
 
-    def extract_text_from_pdf(self, pdf_path: str) -> Dict:
-        """Extract text from PDF using multiple methods"""
-        try:
-            # Method 1: Try direct text extraction first (faster)
-            text_content = self._extract_direct_text(pdf_path)
-
-            if text_content and len(text_content.strip()) > 100:
-                return {
-                    'success': True,
-                    'method': 'direct_extraction',
-                    'text': text_content,
-                    'page_count': self._get_page_count(pdf_path)
-                }
-
-            # Method 2: Use OCR if direct extraction fails
-            ocr_text = self._extract_ocr_text(pdf_path)
-
-            return {
-                'success': True,
-                'method': 'ocr_extraction',
-                'text': ocr_text,
-                'page_count': self._get_page_count(pdf_path)
-            }
-
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f'Text extraction failed: {str(e)}'
-            }
+    def iter_pages(self, pdf_path: str) -> Iterator[Dict]:
+        """Yield {'page', 'page_count', 'text', 'method', 'warning'} per page, in page order.
 
-    def _extract_direct_text(self, pdf_path: str) -> str:
-        """Extract text directly from PDF"""
-        text = ""
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
-
-    def _extract_ocr_text(self, pdf_path: str) -> str:
-        """Extract text using OCR"""
-        try:
-            # Convert PDF to images
-            images = convert_from_path(pdf_path)
+        Only a window of pages is in flight at once: OCR for up to max_workers
+        upcoming pages runs in the process pool while earlier pages are
+        consumed, so memory stays bounded by page size rather than document size.
+        A cached full-document extraction is replayed page by page, and a
+        complete iteration is stored in the cache for the next upload.
+        """
+        content_hash = None
+        if self.cache is not None:
+            content_hash = self.cache.hash_file(pdf_path)
+            cached = self.cache.get(content_hash, 'pdf_text')
+            if cached is not None:
+                print("⚡ Extraction cache hit, replaying pages")
+                yield from self._cached_pages(cached)
+                return
 
-            text = ""
-            for i, image in enumerate(images):
-                # Use Tesseract to extract text from image
-                page_text = pytesseract.image_to_string(image)
-                text += f"--- Page {i+1} ---\n{page_text}\n\n"
+        # Only page text is kept for the cache; a consumer that stops early caches nothing
+        pages = []
+        for page in self._iter_pages_uncached(pdf_path):
+            pages.append(page)
+            yield page
 
-            return text
+        if content_hash is not None and not any(page['warning'] for page in pages):
+            self.cache.put(content_hash, 'pdf_text', self._assemble_pages(pages))
 
-        except Exception as e:
-            return f"OCR extraction failed: {str(e)}"
+    def _iter_pages_uncached(self, pdf_path: str) -> Iterator[Dict]:
+        """Extract pages from the file, OCR running ahead in the process pool"""
+        executor = None
+        if self.parallel_ocr and self.max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_ocr_worker)
 
-    def _get_page_count(self, pdf_path: str) -> int:
-        """Get number of pages in PDF"""
         try:
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                return len(pdf_reader.pages)
-        except:
-            return 0
+                page_count = len(pdf_reader.pages)
+                pending = deque()
+
+                for page_number, page in enumerate(pdf_reader.pages, start=1):
+                    try:
+                        page_text = page.extract_text() or ""
+                    except Exception:
+                        page_text = ""
+
+                    ocr = None
+                    if self._needs_ocr(page_text):
+                        ocr = True  # OCR inline when the page is finished
+                        if executor:
+                            try:
+                                ocr = executor.submit(_ocr_page_range, pdf_path, page_number, page_number, self.dpi)
+                            except Exception as e:
+                                print(f"⚠️ Parallel OCR failed, running serially: {e}")
+                                executor.shutdown(wait=False)
+                                executor = None
+                    pending.append((page_number, page_text, ocr))
+
+                    while len(pending) > (self.max_workers if executor else 0):
+                        yield self._finish_page(pdf_path, page_count, *pending.popleft())
+
+                while pending:
+                    yield self._finish_page(pdf_path, page_count, *pending.popleft())
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish_page(self, pdf_path: str, page_count: int, page_number: int, page_text: str, ocr) -> Dict:
+        """Resolve a page's pending OCR, if any; a failed OCR falls back to the text layer"""
+        page = {'page': page_number, 'page_count': page_count, 'text': page_text,
+                'method': 'direct_extraction', 'warning': None}
+        if ocr is None:
+            return page
+
+        try:
+            results = ocr.result() if ocr is not True else _ocr_page_range(pdf_path, page_number, page_number, self.dpi)
+        except Exception as e:
+            # e.g. a broken process pool
+            results = [(page_number, None, str(e))]
+
+        _, text, error = results[0]
+        if error is not None:
+            page['warning'] = _ocr_warning(page_number, error)
+            print(f"⚠️ {page['warning']}")
+            return page
+
+        return {**page, 'text': text, 'method': 'ocr_extraction'}
+
+    @staticmethod
+    def _assemble_pages(pages: List[Dict]) -> Dict:
+        """Full-document extraction result from streamed pages, page-marked so it replays page by page"""
+        page_count = len(pages)
+        ocr_pages = [page['page'] for page in pages if page['method'] == 'ocr_extraction']
+        if not ocr_pages:
+            method = 'direct_extraction'
+        else:
+            method = 'ocr_extraction' if len(ocr_pages) == page_count else 'hybrid_extraction'
+
+        return {
+            'success': True,
+            'method': method,
+            'text': "".join(f"--- Page {page['page']} ---\n{page['text']}\n\n" for page in pages),
+            'page_count': page_count,
+            'ocr_pages': ocr_pages
+        }
+
+    @staticmethod
+    def _cached_pages(cached: Dict) -> Iterator[Dict]:
+        """Split a cached extraction back into pages; text without page markers is one page"""
+        text = cached.get('text', '')
+        page_count = cached.get('page_count') or 1
+        ocr_pages = set(cached.get('ocr_pages') or [])
+        markers = list(PAGE_MARKER.finditer(text))
+        if not markers:
+            yield {'page': 1, 'page_count': 1, 'text': text, 'method': cached.get('method', 'direct_extraction'),
+                   'warning': None}
+            return
+
+        for index, marker in enumerate(markers):
+            end = markers[index + 1].start() if index + 1 < len(markers) else len(text)
+            page_number = int(marker.group(1))
+            yield {
+                'page': page_number,
+                'page_count': page_count,
+                'text': text[marker.end():end].strip('\n'),
+                'method': 'ocr_extraction' if page_number in ocr_pages else 'direct_extraction',
+                'warning': None
+            }
+
+    def _needs_ocr(self, page_text: str) -> bool:
+        """True when a page has no usable text layer (empty, or mostly non-printable garbage)"""
+        stripped = page_text.strip()
+        if len(stripped) < self.min_page_chars:
+            return True
+
+        readable = sum(1 for char in stripped if char.isalnum() or char.isspace() or char in '.,:;-/()%')
+        return readable / len(stripped) < self.min_readable_ratio
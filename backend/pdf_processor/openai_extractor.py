@@ -1,9 +1,13 @@
 import os
 import json
 import re
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from .extraction_cache import LLMResponseCache, get_shared_llm_cache
+from .text_chunker import split_into_chunks, merge_products
+
 # Import the newer OpenAI client
 try:
     from openai import OpenAI
@@ -17,7 +21,8 @@ load_dotenv()
 class OpenAIExtractor:
     """OpenAI-powered PDF text extraction and product parsing"""
     
-    def __init__(self):
+    def __init__(self, max_chunk_chars: int = 6000, max_in_flight: Optional[int] = None,
+                 llm_cache: Optional[LLMResponseCache] = None, use_cache: bool = True):
         self.api_key = os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
@@ -29,81 +34,85 @@ class OpenAIExtractor:
             # Fallback to legacy client
             openai_legacy.api_key = self.api_key
             self.client = None
+
+        # Long pricelists are split into chunks that are extracted concurrently
+        self.max_chunk_chars = max_chunk_chars
+        self.max_in_flight = max_in_flight or int(os.getenv('OPENAI_MAX_IN_FLIGHT', 4))
+
+        self.model = "gpt-4o-mini"
+        self.temperature = 0.1
+        if self.client:
+            self.system_prompt = "You are an expert at extracting product information from audio equipment pricelists. You must return valid JSON only, with no additional text or formatting."
+        else:
+            self.system_prompt = "You are an expert at extracting product information from audio equipment pricelists. Return only valid JSON."
+
+        # Responses are cached per chunk; the key changes with the prompt wording
+        self.llm_cache = llm_cache or (get_shared_llm_cache() if use_cache else None)
+        self._prompt_versions: Dict[str, str] = {}
+        self.prompt_version = self._prompt_version('Denon')
+    
+    def _prompt_version(self, brand: str) -> str:
+        """Prompt template fingerprint for a brand, computed once per brand"""
+        version = self._prompt_versions.get(brand)
+        if version is None:
+            version = LLMResponseCache.prompt_version(
+                self.system_prompt, self._create_extraction_prompt('', brand)
+            )
+            self._prompt_versions[brand] = version
+        return version
     
-    def extract_and_parse_products(self, pdf_text: str) -> Dict:
-        """Extract and parse products using OpenAI GPT-4"""
+    def extract_and_parse_products(self, pdf_text: str, brand: str = 'Denon') -> Dict:
+        """Extract and parse products using OpenAI GPT-4, one request per text chunk"""
         try:
             print(f"Starting OpenAI extraction for text length: {len(pdf_text)}")
             
-            # Create extraction prompt
-            extraction_prompt = self._create_extraction_prompt(pdf_text)
+            chunks = split_into_chunks(pdf_text, max_chars=self.max_chunk_chars)
+            if not chunks:
+                return {
+                    'success': False,
+                    'error': 'No text to extract products from'
+                }
             
-            # Make API call using appropriate client
-            if self.client:
-                # New client
-                response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": "You are an expert at extracting product information from audio equipment pricelists. You must return valid JSON only, with no additional text or formatting."
-                        },
-                        {
-                            "role": "user", 
-                            "content": extraction_prompt
-                        }
-                    ],
-                    temperature=0.1,
-                    max_tokens=8000  # Increased token limit
-                )
-                products_text = response.choices[0].message.content
-            else:
-                # Legacy client
-                response = openai_legacy.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": "You are an expert at extracting product information from audio equipment pricelists. Return only valid JSON."
-                        },
-                        {
-                            "role": "user", 
-                            "content": extraction_prompt
-                        }
-                    ],
-                    temperature=0.1,
-                    max_tokens=8000
-                )
-                products_text = response.choices[0].message.content
+            print(f"Split text into {len(chunks)} chunks")
             
-            print(f"OpenAI response length: {len(products_text)}")
-            print(f"Response preview: {products_text[:200]}...")
+            # executor.map keeps chunk order, so merged products follow the document
+            workers = max(1, min(self.max_in_flight, len(chunks)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunk_results = list(executor.map(lambda chunk: self._extract_chunk(chunk, brand), chunks))
             
-            # Parse the response with multiple fallback strategies
-            products_data = self._robust_parse_response(products_text)
+            failed_chunks = [i + 1 for i, result in enumerate(chunk_results) if not result['success']]
+            if failed_chunks:
+                print(f"⚠️ OpenAI extraction failed for chunks {failed_chunks} of {len(chunks)}")
             
-            if not products_data:
-                print("❌ Failed to parse any products from OpenAI response")
-                # Try direct text parsing as last resort
-                products_data = self._extract_from_text_response(products_text)
+            products_data = merge_products([
+                result['products'] for result in chunk_results if result['success']
+            ])
+            
+            products_text = "\n".join(
+                result.get('raw_response', '') for result in chunk_results
+            )
             
             if not products_data:
+                first_error = next((result['error'] for result in chunk_results if not result['success']), None)
                 return {
                     'success': False,
-                    'error': 'Failed to parse OpenAI response after multiple attempts',
+                    'error': first_error or 'Failed to parse OpenAI response after multiple attempts',
                     'raw_response': products_text[:500]
                 }
             
             print(f"Successfully parsed {len(products_data)} products from OpenAI")
             
             # Clean and validate products
-            cleaned_products = self._clean_and_validate_products(products_data)
+            cleaned_products = self._clean_and_validate_products(products_data, brand)
             
             return {
                 'success': True,
                 'method': 'openai_extraction',
                 'products_found': len(cleaned_products),
                 'products': cleaned_products,
+                'chunks': len(chunks),
+                'cached_chunks': sum(1 for result in chunk_results if result.get('cached')),
+                'failed_chunks': failed_chunks,
                 'raw_response': products_text[:500] + "..." if len(products_text) > 500 else products_text
             }
             
@@ -114,15 +123,87 @@ class OpenAIExtractor:
                 'error': f'OpenAI extraction failed: {str(e)}'
             }
     
-    def _create_extraction_prompt(self, pdf_text: str) -> str:
-        """Create detailed prompt for product extraction"""
-        # Truncate text if too long
-        max_length = 8000
-        if len(pdf_text) > max_length:
-            pdf_text = pdf_text[:max_length] + "\n... [content truncated]"
+    def _extract_chunk(self, chunk_text: str, brand: str = 'Denon') -> Dict:
+        """Send one chunk to OpenAI and parse the products out of the response"""
+        try:
+            cache_key = None
+            products_text = None
+            if self.llm_cache is not None:
+                cache_key = self.llm_cache.make_key(chunk_text, self.model, self._prompt_version(brand), self.temperature)
+                products_text = self.llm_cache.get_response(cache_key)
+            
+            cached = products_text is not None
+            if not cached:
+                products_text = self._request_completion(self._create_extraction_prompt(chunk_text, brand))
+            
+            print(f"OpenAI response length: {len(products_text)}")
+            
+            # Parse the response with multiple fallback strategies
+            products_data = self._parse_json_response(products_text)
+            if products_data is not None:
+                # Only replies that parse as JSON are cached; a truncated one is requested again next time
+                if cache_key and not cached:
+                    self.llm_cache.put_response(cache_key, products_text)
+            else:
+                products_data = self._salvage_response_objects(products_text)
+            
+            if not products_data:
+                print("❌ Failed to parse any products from OpenAI response")
+                # Try direct text parsing as last resort
+                products_data = self._extract_from_text_response(products_text)
+            
+            # A chunk without products (cover page, terms) is not a failure
+            return {
+                'success': True,
+                'products': products_data or [],
+                'raw_response': products_text,
+                'cached': cached
+            }
+            
+        except Exception as e:
+            print(f"OpenAI chunk extraction error: {str(e)}")
+            return {
+                'success': False,
+                'error': f'OpenAI extraction failed: {str(e)}'
+            }
+    
+    def _request_completion(self, extraction_prompt: str) -> str:
+        """Make the chat completion call using the appropriate client"""
+        messages = [
+            {
+                "role": "system", 
+                "content": self.system_prompt
+            },
+            {
+                "role": "user", 
+                "content": extraction_prompt
+            }
+        ]
         
+        if self.client:
+            # New client
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=8000  # Increased token limit
+            )
+        else:
+            # Legacy client
+            response = openai_legacy.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=8000
+            )
+        return response.choices[0].message.content
+    
+    def _create_extraction_prompt(self, pdf_text: str, brand: str = 'Denon') -> str:
+        """Create detailed prompt for product extraction"""
+        source = f"{brand} pricelist" if brand else "supplier pricelist"
+        example_brand = brand or "Brand"
         return f"""
-Extract ALL audio equipment products from this Denon pricelist document.
+Extract ALL audio equipment products from this {source} document.
 
 CRITICAL INSTRUCTIONS:
 1. Return ONLY a valid JSON array, no other text
@@ -133,8 +214,8 @@ CRITICAL INSTRUCTIONS:
 
 JSON structure (return this exact format):
 [
-{{"name":"Product Name","model":"MODEL","price":8990.0,"old_price":9990.0,"currency":"ZAR","category":"AV Receivers","brand":"Denon","specifications":"Full specs","features":["8K","HEOS"]}},
-{{"name":"Product Name 2","model":"MODEL2","price":11990.0,"old_price":null,"currency":"ZAR","category":"AV Receivers","brand":"Denon","specifications":"Full specs","features":["8K","WiFi"]}}
+{{"name":"Product Name","model":"MODEL","price":8990.0,"old_price":9990.0,"currency":"ZAR","category":"AV Receivers","brand":"{example_brand}","specifications":"Full specs","features":["8K","HEOS"]}},
+{{"name":"Product Name 2","model":"MODEL2","price":11990.0,"old_price":null,"currency":"ZAR","category":"AV Receivers","brand":"{example_brand}","specifications":"Full specs","features":["8K","WiFi"]}}
 ]
 
 Document content:
@@ -144,6 +225,13 @@ Return only the JSON array, no markdown formatting, no explanation text:"""
     
     def _robust_parse_response(self, response_text: str) -> List[Dict]:
         """Parse OpenAI response with multiple fallback strategies"""
+        products = self._parse_json_response(response_text)
+        if products is not None:
+            return products
+        return self._salvage_response_objects(response_text)
+
+    def _parse_json_response(self, response_text: str) -> Optional[List[Dict]]:
+        """Strategies 1-3: parse the response as a whole JSON array; None when it isn't valid JSON"""
         
         # Strategy 1: Clean and parse as JSON
         try:
@@ -167,7 +255,10 @@ Return only the JSON array, no markdown formatting, no explanation text:"""
         except Exception as e:
             print(f"Strategy 3 failed: {e}")
         
-        # Strategy 4: Line-by-line object extraction
+        return None
+
+    def _salvage_response_objects(self, response_text: str) -> List[Dict]:
+        """Strategy 4: recover whole objects line by line from a broken (e.g. truncated) response"""
         try:
             return self._extract_objects_from_lines(response_text)
         except Exception as e:
@@ -389,7 +480,7 @@ Return only the JSON array, no markdown formatting, no explanation text:"""
             print(f"Error extracting from text line: {e}")
             return None
     
-    def _clean_and_validate_products(self, products: List[Dict]) -> List[Dict]:
+    def _clean_and_validate_products(self, products: List[Dict], brand: str = 'Denon') -> List[Dict]:
         """Clean and validate extracted products"""
         cleaned_products = []
         
@@ -432,14 +523,14 @@ Return only the JSON array, no markdown formatting, no explanation text:"""
                     'old_price': float(old_price) if old_price and old_price != price else None,
                     'currency': product.get('currency', 'ZAR'),
                     'category': product.get('category', 'AV Receivers'),
-                    'brand': product.get('brand', 'Denon'),
+                    'brand': product.get('brand') or brand,
                     'specifications': str(product.get('specifications', '')).strip(),
                     'features': product.get('features', [])
                 }
                 
                 # Create SEO-friendly name
                 if clean_product['model']:
-                    clean_product['seo_name'] = f"Denon {clean_product['model']} - {clean_product['specifications'][:50]}"
+                    clean_product['seo_name'] = f"{clean_product['brand']} {clean_product['model']} - {clean_product['specifications'][:50]}".strip()
                 else:
                     clean_product['seo_name'] = clean_product['name'][:70]
                 
@@ -0,0 +1,105 @@
+import os
+from dataclasses import asdict
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .data_parser import DataParser
+from .data_validator import DataValidator
+from .ocr_extractor import OCRExtractor
+
+
+def iter_processed_pages(pdf_path: str, extractor: Optional[OCRExtractor] = None,
+                         parser: Optional[DataParser] = None,
+                         validator: Optional[DataValidator] = None) -> Iterator[Dict]:
+    """Extract -> parse -> clean -> validate a PDF one page at a time.
+
+    Each stage is a generator feeding the next, so a page's products are
+    yielded as soon as that page is done and only a window of pages is ever
+    held in memory. Yields {'page', 'page_count', 'extraction_method',
+    'extraction_warning', 'parsing_method', 'products', 'validation'} per page.
+    """
+    extractor = extractor or OCRExtractor()
+    parser = parser or DataParser()
+    validator = validator or DataValidator()
+
+    pages = extractor.iter_pages(pdf_path)
+    page_info: Dict[int, Dict] = {}
+
+    def page_texts():
+        for page in pages:
+            page_info[page['page']] = page
+            yield page['page'], page['text']
+
+    for parsed in parser.iter_parse_pages(page_texts()):
+        page = page_info.pop(parsed['page'])
+        cleaned_products = [validator.clean_product_data(product) for product in parsed['products']]
+
+        yield {
+            'page': parsed['page'],
+            'page_count': page['page_count'],
+            'extraction_method': page['method'],
+            'extraction_warning': page.get('warning'),
+            'parsing_method': parsed['method'],
+            'supplier_profile': parsed.get('supplier_profile'),
+            'products': cleaned_products,
+            'validation': validator.validate_product_batch(cleaned_products)
+        }
+
+
+def summarize_extraction(page_methods: List[str], page_count: int) -> str:
+    """Document-level extraction method from the per-page ones"""
+    ocr_pages = sum(1 for method in page_methods if method == 'ocr_extraction')
+    if not ocr_pages:
+        return 'direct_extraction'
+    return 'ocr_extraction' if ocr_pages == page_count else 'hybrid_extraction'
+
+
+def run_pdf_job(payload: Dict, report: Callable[[Dict], None]) -> Dict:
+    """Job queue handler for async PDF uploads: process the spooled file, reporting progress per page"""
+    path = payload['path']
+    validator = DataValidator()
+    page_validations = []
+    page_methods = []
+    products = []
+    warnings = []
+    page_count = 0
+
+    # Queue workers are daemonic processes, which may not start an OCR process pool of their own;
+    # the worker pool already spreads jobs across cores
+    extractor = OCRExtractor(parallel_ocr=False)
+
+    try:
+        report({'status': 'processing_pages', 'progress': 30, 'pages_processed': 0, 'page_count': None})
+        for page in iter_processed_pages(path, extractor=extractor, validator=validator):
+            page_count = page['page_count']
+            page_methods.append(page['extraction_method'])
+            page_validations.append(page['validation'])
+            products.extend(page['products'])
+            if page['extraction_warning']:
+                warnings.append(page['extraction_warning'])
+            # Each report is written to the queue, so it carries this page's products only
+            report({
+                'pages_processed': page['page'],
+                'page_count': page_count,
+                'page_products': page['products'],
+                'products_found': len(products),
+                'progress': 30 + int(60 * page['page'] / max(page_count, 1))
+            })
+
+        report({'status': 'validating_data'})
+        validation_result = validator.merge_batch_results(page_validations)
+        validation_result['results'] = [
+            {**result, 'validation': asdict(result['validation'])} for result in validation_result['results']
+        ]
+
+        return {
+            'products_found': len(products),
+            'products': products,
+            'validation': validation_result,
+            'extraction_method': summarize_extraction(page_methods, page_count),
+            'pages_processed': page_count,
+            'warnings': warnings
+        }
+    finally:
+        # A crashed worker never gets here, so the file stays for the retry
+        if os.path.exists(path):
+            os.unlink(path)
@@ -0,0 +1,395 @@
+import csv
+import os
+import re
+from itertools import chain, islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from .supplier_profiles import default_registry
+
+# Header labels per field; the longest label contained in a header wins, so 'OLD RRP' beats 'RRP'
+COLUMN_ALIASES = {
+    'sku': ['SKU', 'STOCK CODE', 'ITEM CODE', 'PRODUCT CODE', 'PART NO', 'PART NUMBER', 'CODE'],
+    'model': ['MODEL', 'MODEL NO', 'MODEL NUMBER', 'MODEL CODE'],
+    'name': ['PRODUCT NAME', 'NAME', 'PRODUCT', 'ITEM', 'TITLE'],
+    'description': ['DESCRIPTION', 'DESC', 'DETAILS', 'SPECIFICATIONS', 'SPECS'],
+    'price': ['NEW RRP', 'RRP', 'RRP INCL VAT', 'RETAIL', 'RETAIL PRICE', 'PRICE', 'PRICE INCL VAT',
+              'SELLING PRICE', 'NEW PRICE', 'UNIT PRICE', 'SRP'],
+    'old_price': ['OLD RRP', 'OLD PRICE', 'PREVIOUS RRP', 'PREV RRP', 'WAS', 'WAS PRICE', 'CURRENT RRP'],
+    'category': ['CATEGORY', 'RANGE', 'GROUP', 'PRODUCT GROUP', 'TYPE'],
+    'manufacturer': ['BRAND', 'MANUFACTURER', 'MAKE'],
+    'quantity': ['QTY', 'QUANTITY', 'STOCK', 'SOH', 'AVAILABLE'],
+    # Recognised so that trade prices are never mistaken for the retail price
+    'cost_price': ['COST', 'COST PRICE', 'DEALER', 'DEALER PRICE', 'TRADE', 'TRADE PRICE', 'NETT', 'NET PRICE'],
+}
+
+PRODUCT_FIELDS = ['sku', 'model', 'name', 'description', 'price', 'old_price', 'category', 'manufacturer', 'quantity']
+PRICE_COLUMNS = ('price', 'old_price')
+IDENTITY_COLUMNS = ('sku', 'model', 'name', 'description')
+
+_ALIASES = sorted(
+    ((label, field) for field, labels in COLUMN_ALIASES.items() for label in labels),
+    key=lambda item: len(item[0]),
+    reverse=True
+)
+NON_ALNUM = re.compile(r'[^A-Z0-9]+')
+
+
+def normalize_header(value) -> str:
+    """Upper-case a header cell and collapse punctuation to single spaces"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    return NON_ALNUM.sub(' ', str(value).upper()).strip()
+
+
+def match_column(header: str) -> Optional[str]:
+    """Field for a normalized header: exact label first, then the longest label it contains"""
+    if not header:
+        return None
+    padded = f' {header} '
+    for label, field in _ALIASES:
+        if header == label:
+            return field
+    for label, field in _ALIASES:
+        if f' {label} ' in padded:
+            return field
+    return None
+
+
+class SpreadsheetParser:
+    """Native Excel/CSV pricelist ingestion.
+
+    The header row is found among the first rows of the sheet and columns are
+    mapped to product fields from their labels; prices are cleaned with
+    vectorized pandas string operations and products are emitted directly.
+    When the labels can't be mapped, ``header_mapper`` (e.g. an LLM call) is
+    given the header cells only.
+    """
+
+    def __init__(self, brand: Optional[str] = None, currency: str = 'ZAR',
+                 default_category: str = 'Audio Equipment', min_price: float = 1.0,
+                 header_scan_rows: int = 25, batch_size: int = 5000,
+                 header_mapper: Optional[Callable[[List[str]], Dict[str, str]]] = None):
+        self.brand = brand
+        self.currency = currency
+        self.default_category = default_category
+        self.min_price = min_price
+        self.header_scan_rows = header_scan_rows
+        self.batch_size = max(1, batch_size)
+        self.header_mapper = header_mapper
+
+    def parse_file(self, path: str) -> Dict:
+        """Read the first sheet of an .xlsx/.xls/.csv file and parse it, batch by batch"""
+        try:
+            products = []
+            layout = None
+            for batch in self.iter_product_batches(path):
+                products.extend(batch['products'])
+                layout = batch
+
+            return {
+                'success': True,
+                'products_found': len(products),
+                'products': products,
+                'method': 'spreadsheet_parsing',
+                'header_row': layout['header_row'],
+                'column_map': layout['column_map'],
+                'column_mapping': layout['column_mapping'],
+                'rows_processed': layout['rows_processed'],
+                'batches': layout['batch']
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Spreadsheet parsing failed: {str(e)}',
+                'method': 'spreadsheet_parsing'
+            }
+
+    def iter_product_batches(self, path: str, batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """Stream the first sheet and yield products for every ``batch_size`` data rows.
+
+        Rows come from a read-only worksheet (or a csv reader), so only the
+        header scan window and one batch are in memory at a time. Section
+        categories carry over between batches. Raises ValueError when no
+        header row can be mapped.
+        """
+        batch_size = batch_size or self.batch_size
+        rows = self.iter_rows(path)
+
+        head = pd.DataFrame(list(islice(rows, self.header_scan_rows)), dtype=object)
+        if head.empty:
+            raise ValueError('Spreadsheet is empty')
+
+        header_row, columns = self.detect_header_row(head)
+        mapping_method = 'heuristic'
+        if header_row is None and self.header_mapper:
+            header_row, columns = self._map_with_header_mapper(head)
+            mapping_method = 'llm_headers'
+        if header_row is None:
+            raise ValueError('Could not identify price and product columns')
+
+        headers = ['' if pd.isna(value) else str(value) for value in head.iloc[header_row].tolist()]
+        layout = {
+            'header_row': header_row + 1,
+            'column_map': {field: headers[column] for field, column in columns.items()},
+            'column_mapping': mapping_method
+        }
+        width = max(len(headers), max(columns.values()) + 1)
+
+        # Rows buffered for the header scan are the start of the data
+        rows = chain(head.iloc[header_row + 1:].values.tolist(), rows)
+        brand = self.brand
+        category = None
+        rows_processed = 0
+        batch_number = 0
+
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch and batch_number:
+                break
+
+            frame = pd.DataFrame([row[:width] for row in batch], dtype=object).reindex(columns=range(width))
+            frame = frame.dropna(how='all')
+            if brand is None:
+                brand = self._detect_brand(frame, columns)
+            products, category = self._build_products(frame, columns, brand, category)
+
+            rows_processed += len(batch)
+            batch_number += 1
+            yield {
+                **layout,
+                'batch': batch_number,
+                'rows_processed': rows_processed,
+                'products': products
+            }
+
+            if len(batch) < batch_size:
+                break
+
+    @staticmethod
+    def iter_rows(path: str) -> Iterator[List]:
+        """Cell values of the first sheet, one row at a time"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            with open(path, newline='', encoding='utf-8', errors='replace') as file:
+                try:
+                    dialect = csv.Sniffer().sniff(file.read(64 * 1024), delimiters=',;\t|')
+                except csv.Error:
+                    dialect = csv.excel
+                file.seek(0)
+                for row in csv.reader(file, dialect):
+                    yield [cell if cell.strip() else None for cell in row]
+        elif extension == '.xls':
+            # xlrd has no streaming mode; legacy .xls files are small enough to load
+            for row in SpreadsheetParser.read_sheet(path).itertuples(index=False):
+                yield list(row)
+        else:
+            import openpyxl
+            workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+            try:
+                for row in workbook.worksheets[0].iter_rows(values_only=True):
+                    yield list(row)
+            finally:
+                workbook.close()
+
+    @staticmethod
+    def read_sheet(path: str) -> pd.DataFrame:
+        """Load cells as strings without assuming where the header is"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            return pd.read_csv(path, header=None, dtype=str, sep=None, engine='python',
+                               skip_blank_lines=False, encoding_errors='replace')
+        if extension == '.xls':
+            return pd.read_excel(path, header=None, dtype=str, engine='xlrd')
+        return pd.read_excel(path, header=None, dtype=str, engine='openpyxl')
+
+    def parse_frame(self, raw: pd.DataFrame) -> Dict:
+        """Detect the header row, map columns and build product dicts"""
+        try:
+            raw = raw.dropna(how='all').dropna(axis=1, how='all')
+            if raw.empty:
+                return {'success': False, 'error': 'Spreadsheet is empty', 'method': 'spreadsheet_parsing'}
+            # Row numbers as the supplier sees them in the sheet
+            sheet_rows = [int(index) + 1 for index in raw.index]
+            raw = raw.reset_index(drop=True)
+            raw.columns = range(raw.shape[1])
+
+            header_row, columns = self.detect_header_row(raw)
+            mapping_method = 'heuristic'
+            if header_row is None and self.header_mapper:
+                header_row, columns = self._map_with_header_mapper(raw)
+                mapping_method = 'llm_headers'
+            if header_row is None:
+                return {
+                    'success': False,
+                    'error': 'Could not identify price and product columns',
+                    'method': 'spreadsheet_parsing'
+                }
+
+            body = raw.iloc[header_row + 1:]
+            brand = self.brand if self.brand is not None else self._detect_brand(body, columns)
+            products, _ = self._build_products(body, columns, brand)
+            headers = [str(value) for value in raw.iloc[header_row].tolist()]
+
+            return {
+                'success': True,
+                'products_found': len(products),
+                'products': products,
+                'method': 'spreadsheet_parsing',
+                'header_row': sheet_rows[header_row],
+                'column_map': {field: headers[column] for field, column in columns.items()},
+                'column_mapping': mapping_method,
+                'rows_processed': int(len(raw) - header_row - 1)
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Spreadsheet parsing failed: {str(e)}',
+                'method': 'spreadsheet_parsing'
+            }
+
+    def detect_header_row(self, raw: pd.DataFrame):
+        """Return (row index, {field: column}) of the best-labelled row among the first rows"""
+        best_row, best_columns = None, None
+        for row_index in range(min(self.header_scan_rows, len(raw))):
+            columns = self.map_columns(raw.iloc[row_index].tolist())
+            if not self._is_usable(columns):
+                continue
+            if best_columns is None or len(columns) > len(best_columns):
+                best_row, best_columns = row_index, columns
+        return best_row, best_columns
+
+    @staticmethod
+    def map_columns(header_cells: List) -> Dict[str, int]:
+        """Map header cells to fields; the first column labelled with a field keeps it"""
+        columns: Dict[str, int] = {}
+        for column, cell in enumerate(header_cells):
+            field = match_column(normalize_header(cell))
+            if field and field not in columns:
+                columns[field] = column
+        columns.pop('cost_price', None)
+        return columns
+
+    @staticmethod
+    def _is_usable(columns: Dict[str, int]) -> bool:
+        return (
+            any(field in columns for field in PRICE_COLUMNS)
+            and any(field in columns for field in IDENTITY_COLUMNS)
+        )
+
+    def _map_with_header_mapper(self, raw: pd.DataFrame):
+        """Ask the header mapper about the first row with several text cells"""
+        non_empty = raw.notna().sum(axis=1)
+        candidates = non_empty[non_empty >= 2].index[:self.header_scan_rows]
+        if not len(candidates):
+            return None, None
+
+        header_row = int(candidates[0])
+        headers = ['' if pd.isna(value) else str(value).strip() for value in raw.iloc[header_row].tolist()]
+        try:
+            mapping = self.header_mapper(headers) or {}
+        except Exception as e:
+            print(f"⚠️ Header mapping failed: {e}")
+            return None, None
+
+        columns = {
+            field: headers.index(header)
+            for field, header in mapping.items()
+            if field in PRODUCT_FIELDS and header in headers
+        }
+        if not self._is_usable(columns):
+            return None, None
+        print(f"🧭 Column mapping from headers: {columns}")
+        return header_row, columns
+
+    @staticmethod
+    def _detect_brand(body: pd.DataFrame, columns: Dict[str, int]) -> str:
+        """Brand of the supplier profile whose fingerprints match the first rows"""
+        sample = body.head(50)
+        cells = [sample[columns[field]] for field in ('model', 'sku', 'name', 'description') if field in columns]
+        text = '\n'.join(str(value) for column in cells for value in column.dropna().tolist())
+        return default_registry.detect(text).brand
+
+    def _build_products(self, body: pd.DataFrame, columns: Dict[str, int], brand: str,
+                        carry_category: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Vectorized row -> product conversion; also returns the section category in effect at the end"""
+        if body.empty:
+            return [], carry_category
+
+        text = body.apply(lambda column: column.astype('string').str.strip()).fillna('')
+        empty = pd.Series('', index=body.index, dtype='string')
+
+        def field(name):
+            return text[columns[name]] if name in columns else empty
+
+        price = self.clean_prices(field('price')) if 'price' in columns else None
+        old_price = self.clean_prices(field('old_price')) if 'old_price' in columns else None
+        if price is None:
+            # Lists with a single current-RRP column
+            price, old_price = old_price, None
+
+        sku, model, description = field('sku'), field('model'), field('description')
+        name = field('name')
+        name = name.where(name != '', description).where(lambda s: s != '', model).where(lambda s: s != '', sku)
+        model = model.where(model != '', sku)
+
+        # Section title rows (a single filled cell, no price) set the category of the rows below
+        filled = text.ne('').sum(axis=1)
+        section = (filled == 1) & price.isna()
+        first_cell = text.where(text.ne('')).bfill(axis=1).iloc[:, 0]
+        section_category = first_cell.where(section).ffill()
+        if carry_category is not None:
+            section_category = section_category.fillna(carry_category)
+        last_category = section_category.iloc[-1]
+        last_category = None if pd.isna(last_category) else last_category
+        category = field('category')
+        category = category.where(category != '', section_category).fillna(self.default_category)
+        category = category.where(category != '', self.default_category)
+
+        manufacturer = field('manufacturer')
+        manufacturer = manufacturer.where(manufacturer != '', brand)
+
+        if 'quantity' in columns:
+            quantity = pd.to_numeric(field('quantity').str.replace(r'[^\d.]', '', regex=True), errors='coerce')
+            quantity = quantity.fillna(1).astype(int)
+        else:
+            quantity = pd.Series(1, index=body.index)
+
+        keep = price.notna() & (price >= self.min_price) & (name != '')
+
+        products = pd.DataFrame({
+            'sku': sku,
+            'name': name,
+            'model': model,
+            'price': price.astype(float).round(2),
+            'old_price': old_price.astype(float).round(2) if old_price is not None else pd.Series(float('nan'), index=body.index),
+            'description': description.where(description != '', name),
+            'category': category,
+            'manufacturer': manufacturer,
+            'currency': self.currency,
+            'quantity': quantity
+        })[keep]
+
+        # Old price only when it differs from the current one
+        old = products['old_price']
+        products['old_price'] = old.astype(object).where(old.notna() & (old != products['price']), None)
+
+        products = products.astype({'sku': object, 'name': object, 'model': object, 'description': object,
+                                    'category': object, 'manufacturer': object}).to_dict('records')
+        return products, last_category
+
+    @staticmethod
+    def clean_prices(values: pd.Series) -> pd.Series:
+        """'R 8 990.00', '8,990', '8.990,00' and 8990.0 -> 8990.0; anything else -> NaN"""
+        digits = values.astype('string').str.replace(r'[^\d.,]', '', regex=True)
+        # European style: dots group thousands, comma marks the decimals
+        decimal_comma = digits.str.fullmatch(r'\d{1,3}(?:\.\d{3})*,\d{1,2}|\d+,\d{1,2}').fillna(False)
+        digits = digits.where(
+            ~decimal_comma,
+            digits.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        )
+        digits = digits.where(decimal_comma, digits.str.replace(',', '', regex=False))
+        return pd.to_numeric(digits, errors='coerce')
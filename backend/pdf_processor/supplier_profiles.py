@@ -0,0 +1,176 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .table_parser import TableParser
+
+MONTH_YEAR = r'(?:JANUARY|FEBRUARY|MARCH|APRIL|MAY|JUNE|JULY|AUGUST|SEPTEMBER|OCTOBER|NOVEMBER|DECEMBER)\s+\d{4}'
+
+DEFAULT_PRICE_PATTERNS = [
+    r'R\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',  # R9,990.00 or R9990
+    r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*ZAR',  # 9990.00 ZAR
+    r'(\d{4,6})\.00',  # Simple format like 8990.00
+    r'(\d{4,6})\.\d{2}',  # Format like 8990.50
+]
+
+DEFAULT_HEADER_SKIP = [MONTH_YEAR, 'OLD RRP', 'NEW RRP', 'MONTH', 'YEAR']
+
+
+@dataclass
+class SupplierProfile:
+    """Declarative description of one supplier's pricelist layout.
+
+    Patterns are compiled once when the profile is created, so parsers only
+    ever use the compiled forms.
+    """
+    name: str
+    brand: str
+    fingerprints: List[str]
+    model_patterns: List[str]
+    category_markers: List[str] = field(default_factory=list)
+    header_skip: List[str] = field(default_factory=lambda: list(DEFAULT_HEADER_SKIP))
+    price_patterns: List[str] = field(default_factory=lambda: list(DEFAULT_PRICE_PATTERNS))
+    column_map: Dict[str, List[str]] = field(default_factory=dict)
+    default_category: str = 'Audio Equipment'
+    currency: str = 'ZAR'
+
+    def __post_init__(self):
+        self.fingerprint_regexes = [re.compile(pattern, re.IGNORECASE) for pattern in self.fingerprints]
+        self.model_regexes = [re.compile(pattern, re.IGNORECASE) for pattern in self.model_patterns]
+        self.price_regexes = [re.compile(pattern) for pattern in self.price_patterns]
+        # One alternation answers "does any model pattern (or price marker) occur"
+        self.model_hint = re.compile('|'.join(self.model_patterns), re.IGNORECASE)
+        self.product_hint = re.compile('(?i:' + '|'.join(self.model_patterns) + r')|R\s*\d{4,6}')
+        # Category markers win over header words when a line has both
+        line_class = []
+        if self.category_markers:
+            line_class.append('(?P<category>' + '|'.join(self.category_markers) + ')')
+        if self.header_skip:
+            line_class.append('(?P<skip>' + '|'.join(self.header_skip) + ')')
+        self.line_class = re.compile('|'.join(line_class)) if line_class else None
+        self.table_parser = TableParser(
+            brand=self.brand,
+            currency=self.currency,
+            default_category=self.default_category,
+            header_aliases=self.column_map or None
+        )
+
+    def score(self, text: str) -> int:
+        """Number of fingerprints found in the text"""
+        return sum(1 for regex in self.fingerprint_regexes if regex.search(text))
+
+
+class SupplierProfileRegistry:
+    """Supplier profiles with fingerprint-based auto-detection"""
+
+    def __init__(self, fallback: SupplierProfile):
+        self.fallback = fallback
+        self.profiles: Dict[str, SupplierProfile] = {}
+
+    def register(self, profile: SupplierProfile):
+        self.profiles[profile.name] = profile
+
+    def get(self, name: str) -> Optional[SupplierProfile]:
+        if name == self.fallback.name:
+            return self.fallback
+        return self.profiles.get(name)
+
+    def detect(self, text: str, sample_chars: int = 4000) -> SupplierProfile:
+        """Pick the profile whose fingerprints best match the first page"""
+        sample = self.first_page(text)[:sample_chars]
+
+        best, best_score = self.fallback, 0
+        for profile in self.profiles.values():
+            profile_score = profile.score(sample)
+            if profile_score > best_score:
+                best, best_score = profile, profile_score
+        return best
+
+    @staticmethod
+    def first_page(text: str) -> str:
+        """Text up to the second page marker or form feed"""
+        match = re.search(r'\f|\n--- Page [2-9]\d* ---', text)
+        return text[:match.start()] if match else text
+
+
+GENERIC_PROFILE = SupplierProfile(
+    name='generic',
+    brand='',
+    fingerprints=[],
+    model_patterns=[
+        r'\b([A-Z]{2,5}-?[A-Z]*\d+[A-Z0-9-]*)\b',  # RX-V6A, HS8, SRS-XB13
+    ],
+    category_markers=[],
+)
+
+DENON_PROFILE = SupplierProfile(
+    name='denon',
+    brand='Denon',
+    fingerprints=[r'\bDENON\b', r'\bHEOS\b', r'\bAV[RC]-?X\d'],
+    model_patterns=[
+        r'(AVR[A-Z]?-?[A-Z0-9]+[A-Z]?)',  # AVRX-580BT, AVR-X1800H
+        r'(AVC-[A-Z0-9]+[A-Z]?)',  # AVC-X3800H
+        r'(AVRS-[A-Z0-9]+)',  # AVRS-670H
+        r'(DENON[- ][A-Z0-9]+)',  # DENON HOME variants
+    ],
+    category_markers=['AV RECEIVERS', 'DENON HOME', 'SPEAKERS', 'AMPLIFIERS'],
+    header_skip=[MONTH_YEAR, 'BLACK', 'OLD RRP', 'NEW RRP', 'WHITE', 'MONTH', 'YEAR'],
+    default_category='AV Receivers',
+)
+
+MARANTZ_PROFILE = SupplierProfile(
+    name='marantz',
+    brand='Marantz',
+    fingerprints=[r'\bMARANTZ\b', r'\bCINEMA\s+\d{2}\b', r'\bSR\d{4}\b'],
+    model_patterns=[
+        r'(CINEMA\s+\d{2})',  # CINEMA 50
+        r'(SR\d{4})',  # SR6015
+        r'(NR\d{4})',  # NR1711
+        r'(PM\d{4}[A-Z]*)',  # PM6007
+        r'(MODEL\s+\d{2}[A-Z]?)',  # MODEL 40n
+    ],
+    category_markers=['AV RECEIVERS', 'AMPLIFIERS', 'STREAMERS', 'CD PLAYERS', 'TURNTABLES'],
+    header_skip=[MONTH_YEAR, 'BLACK', 'SILVER GOLD', 'OLD RRP', 'NEW RRP', 'MONTH', 'YEAR'],
+    default_category='AV Receivers',
+)
+
+YAMAHA_PROFILE = SupplierProfile(
+    name='yamaha',
+    brand='Yamaha',
+    fingerprints=[r'\bYAMAHA\b', r'\bRX-[AV]\d', r'\bMUSICCAST\b'],
+    model_patterns=[
+        r'(RX-[AV]\d+[A-Z]*)',  # RX-V6A, RX-A4A
+        r'(CX-A\d+)',  # CX-A5200
+        r'(YAS-\d+[A-Z]*)',  # YAS-209
+        r'(SR-[BC]\d+[A-Z]*)',  # SR-B20A
+        r'(NS-[A-Z]*\d+[A-Z]*)',  # NS-F210
+        r'(HS\d+[A-Z]*)',  # HS8
+        r'(A-S\d+[A-Z]*)',  # A-S801
+        r'(WXA?-\d+)',  # WXA-50
+    ],
+    category_markers=['AV RECEIVERS', 'SOUND BARS', 'SOUNDBARS', 'HI-FI', 'SPEAKERS', 'STUDIO MONITORS', 'MUSICCAST'],
+    default_category='Audio Equipment',
+)
+
+SONOS_PROFILE = SupplierProfile(
+    name='sonos',
+    brand='Sonos',
+    fingerprints=[r'\bSONOS\b', r'\b(?:ARC|BEAM|ERA\s+\d{3})\b', r'\bSUB\s+MINI\b'],
+    model_patterns=[
+        r'\b([A-Z0-9]{4,}G\d[A-Z]{2}\d[A-Z]{3})\b',  # ARCG1EU1BLK style SKUs
+        r'\b(ERA\s+\d{3})\b',  # Era 100, Era 300
+    ],
+    category_markers=['SOUNDBARS', 'SPEAKERS', 'SUBWOOFERS', 'PORTABLE', 'COMPONENTS', 'ACCESSORIES'],
+    default_category='Speakers',
+)
+
+
+def build_default_registry() -> SupplierProfileRegistry:
+    registry = SupplierProfileRegistry(fallback=GENERIC_PROFILE)
+    for profile in (DENON_PROFILE, MARANTZ_PROFILE, YAMAHA_PROFILE, SONOS_PROFILE):
+        registry.register(profile)
+    return registry
+
+
+# Built once at import; every DataParser shares the compiled profiles
+default_registry = build_default_registry()
@@ -0,0 +1,285 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Header labels per field, longest first so 'OLD RRP' wins over 'RRP'
+HEADER_ALIASES = {
+    'old_price': ['OLD RRP', 'OLD PRICE', 'PREVIOUS RRP', 'PREV RRP', 'WAS PRICE', 'CURRENT RRP'],
+    'price': ['NEW RRP', 'NEW PRICE', 'RRP INCL VAT', 'RRP', 'RETAIL PRICE', 'RETAIL', 'PRICE', 'SRP', 'NOW'],
+    'model': ['MODEL NUMBER', 'MODEL NO', 'MODEL', 'PRODUCT CODE', 'ITEM CODE', 'STOCK CODE', 'PART NO', 'SKU', 'CODE'],
+    'name': ['DESCRIPTION', 'PRODUCT NAME', 'PRODUCT', 'NAME', 'ITEM'],
+    'category': ['CATEGORY', 'RANGE'],
+}
+
+PRICE_FIELDS = ('old_price', 'price')
+EMPTY_CELLS = {'-', '--', '—', '–', 'N/A', 'NA', 'POA', 'TBA', 'TBC'}
+
+def compile_header_aliases(aliases: Dict[str, List[str]]) -> Tuple[re.Pattern, Dict[str, str]]:
+    """Build the header-label regex (longest label first) and the label -> field map"""
+    labels = sorted(
+        ((label.upper(), field) for field, field_labels in aliases.items() for label in field_labels),
+        key=lambda item: len(item[0]),
+        reverse=True
+    )
+    pattern = re.compile(r'(?<![A-Z0-9])(' + '|'.join(re.escape(label) for label, _ in labels) + r')(?![A-Z0-9])')
+    return pattern, dict(labels)
+
+HEADER_PATTERN, _LABEL_FIELD = compile_header_aliases(HEADER_ALIASES)
+PRICE_TOKEN = re.compile(r'^R?\d[\d,]*(?:\.\d{1,2})?$')
+THOUSANDS_HEAD = re.compile(r'^R?\d{1,3}$')
+CELL_SPLIT = re.compile(r'\s{2,}|\t')
+CELL_RUN = re.compile(r'\S+(?: \S+)*')
+PAGE_MARKER = re.compile(r'^--- Page \d+ ---$')
+
+
+class TableParser:
+    """Deterministic parser for pricelists laid out as tables.
+
+    A header row (Model / Description / Old RRP / New RRP ...) defines the
+    columns. Rows are split on the column whitespace when the text keeps it,
+    and cells are placed under the header label they line up with when a cell
+    is blank; otherwise price cells are read from the right-hand end of the row and the
+    remaining text is split between model and description in header order.
+    No network calls are made.
+    """
+
+    def __init__(self, brand: Optional[str] = None, currency: str = 'ZAR',
+                 default_category: str = 'General', min_price: float = 1.0,
+                 header_aliases: Optional[Dict[str, List[str]]] = None):
+        self.brand = brand
+        self.currency = currency
+        self.default_category = default_category
+        self.min_price = min_price
+
+        if header_aliases:
+            # Supplier-specific labels extend the common ones
+            merged = {field: list(labels) for field, labels in HEADER_ALIASES.items()}
+            for field, labels in header_aliases.items():
+                merged.setdefault(field, [])
+                merged[field] = list(labels) + merged[field]
+            self.header_pattern, self.label_field = compile_header_aliases(merged)
+        else:
+            self.header_pattern, self.label_field = HEADER_PATTERN, _LABEL_FIELD
+
+    def parse(self, text: str) -> Dict:
+        """Parse every table in the text; success is False when no table header is found"""
+        try:
+            state = self.new_state()
+            products = self.parse_page(text, state)
+
+            if not state['tables']:
+                return {
+                    'success': False,
+                    'error': 'No table header found',
+                    'method': 'table_parsing'
+                }
+
+            return {
+                'success': True,
+                'products_found': len(products),
+                'products': products,
+                'method': 'table_parsing',
+                'tables': state['tables'],
+                'raw_text_preview': text[:500] + "..." if len(text) > 500 else text
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Table parsing failed: {str(e)}',
+                'method': 'table_parsing'
+            }
+
+    def new_state(self) -> Dict:
+        """Column layout and category carried from one page to the next"""
+        return {'columns': None, 'category': self.default_category, 'tables': 0}
+
+    def parse_page(self, text: str, state: Dict) -> List[Dict]:
+        """Parse the rows of one page, continuing the tables found on earlier pages"""
+        products = []
+        for raw_line in text.split('\n'):
+            line = raw_line.rstrip()
+            stripped = line.strip()
+            if not stripped or PAGE_MARKER.match(stripped):
+                continue
+
+            header = self.detect_header(line)
+            if header:
+                # Tables repeat their header on each page; the latest one wins
+                columns = state['columns']
+                if columns is None or [c[0] for c in header] != [c[0] for c in columns]:
+                    state['tables'] += 1
+                state['columns'] = header
+                continue
+
+            if state['columns'] is None:
+                continue
+
+            product = self._parse_row(line, state['columns'], state['category'])
+            if product:
+                products.append(product)
+            elif self._is_category_line(stripped):
+                state['category'] = stripped
+
+        return products
+
+    def detect_header(self, line: str) -> Optional[List[Tuple[str, int, int]]]:
+        """Return [(field, start_offset, end_offset), ...] when the line is a table header row"""
+        upper = line.upper()
+        matches = list(self.header_pattern.finditer(upper))
+        if len(matches) < 2:
+            return None
+
+        fields = [self.label_field[match.group(1)] for match in matches]
+        if len(set(fields)) != len(fields):
+            return None
+        if not any(field in PRICE_FIELDS for field in fields):
+            return None
+        if 'model' not in fields and 'name' not in fields:
+            return None
+
+        # A header row is (almost) nothing but labels
+        label_chars = sum(len(match.group(1).replace(' ', '')) for match in matches)
+        content_chars = len(re.sub(r'[\s|:/()]', '', upper))
+        if label_chars < 0.6 * content_chars:
+            return None
+
+        return [(field, match.start(), match.end()) for field, match in zip(fields, matches)]
+
+    def _parse_row(self, line: str, columns: List[Tuple[str, int, int]], category: str) -> Optional[Dict]:
+        """Map a data row onto the header columns"""
+        fields = [column[0] for column in columns]
+
+        cells = [cell.strip() for cell in CELL_SPLIT.split(line.strip()) if cell.strip()]
+        if len(cells) == len(fields):
+            values = dict(zip(fields, cells))
+        else:
+            values = None
+            if len(cells) > 1:
+                # Column whitespace survived but a cell is blank or holds a gap
+                values = self._slice_by_offsets(line, columns)
+                if not any(self._parse_price(values.get(field)) for field in PRICE_FIELDS):
+                    values = None
+            if values is None:
+                values = self._align_tokens(line, fields)
+            if values is None:
+                return None
+
+        prices = {field: self._parse_price(values.get(field)) for field in PRICE_FIELDS if field in fields}
+        price = prices.get('price')
+        old_price = prices.get('old_price')
+        if price is None:
+            # Lists with only a current-RRP column
+            price, old_price = old_price, None
+        if price is None or price < self.min_price:
+            return None
+
+        model = (values.get('model') or '').strip()
+        name = re.sub(r'\s+', ' ', (values.get('name') or '')).strip()
+        if not model and not name:
+            return None
+
+        product = {
+            'name': name or model,
+            'model': model,
+            'price': price,
+            'old_price': old_price if old_price and old_price != price else None,
+            'currency': self.currency,
+            'category': (values.get('category') or category).strip(),
+            'specifications': name,
+            'features': [],
+            'availability': 'In Stock'
+        }
+        if self.brand:
+            product['brand'] = self.brand
+        product['seo_name'] = ' '.join(part for part in (self.brand, model, name) if part)[:70]
+        return product
+
+    @staticmethod
+    def _slice_by_offsets(line: str, columns: List[Tuple[str, int, int]]) -> Dict:
+        """Place each cell under the header label it overlaps most, or the nearest one"""
+        values = {}
+        for cell in CELL_RUN.finditer(line):
+            start, end = cell.span()
+            field = max(
+                columns,
+                key=lambda column: min(end, column[2]) - max(start, column[1])
+            )[0]
+            values[field] = f"{values[field]} {cell.group()}" if field in values else cell.group()
+        return values
+
+    def _align_tokens(self, line: str, fields: List[str]) -> Optional[Dict]:
+        """Single-space rows: take price cells from the right, split the rest by header order"""
+        tokens = line.split()
+        trailing_prices = []
+        for field in reversed(fields):
+            if field not in PRICE_FIELDS:
+                break
+            trailing_prices.append(field)
+
+        if not trailing_prices:
+            return None
+
+        values = {}
+        for field in trailing_prices:
+            if not tokens:
+                return None
+            token = tokens.pop()
+            if token.upper() in EMPTY_CELLS:
+                values[field] = None
+                continue
+            if not PRICE_TOKEN.match(token):
+                return None
+            # Re-join "9 990.00" style thousands groups
+            while tokens and THOUSANDS_HEAD.match(tokens[-1]) and re.match(r'^\d{3}(?:[.,]\d|$)', token):
+                token = tokens.pop() + token
+            # A currency symbol set apart from the amount
+            if tokens and tokens[-1].upper() == 'R':
+                tokens.pop()
+            values[field] = token
+
+        text_fields = [field for field in fields if field not in trailing_prices]
+        if not tokens:
+            return None
+
+        if text_fields and text_fields[0] == 'model':
+            model_length = self._leading_model_length(tokens)
+            values['model'] = ' '.join(tokens[:model_length])
+            values['name'] = ' '.join(tokens[model_length:])
+        elif text_fields and text_fields[-1] == 'model':
+            values['model'] = tokens[-1]
+            values['name'] = ' '.join(tokens[:-1])
+        else:
+            values['name'] = ' '.join(tokens)
+
+        return values
+
+    @staticmethod
+    def _leading_model_length(tokens: List[str]) -> int:
+        """Model codes are one token with a digit, or a few upper-case words ending in one (DENON HOME 150)"""
+        for length, token in enumerate(tokens[:3], start=1):
+            if any(char.isdigit() for char in token):
+                return length
+            if not token.isupper():
+                break
+        return 1
+
+    @staticmethod
+    def _parse_price(cell: Optional[str]) -> Optional[float]:
+        if not cell or cell.strip().upper() in EMPTY_CELLS:
+            return None
+        digits = re.sub(r'[R\s,]', '', cell.upper())
+        try:
+            return float(digits)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _is_category_line(line: str) -> bool:
+        """Short all-caps lines between rows are section titles"""
+        letters = [char for char in line if char.isalpha()]
+        return (
+            3 <= len(line) <= 40
+            and len(letters) >= 3
+            and all(char.isupper() for char in letters)
+            and not any(char.isdigit() for char in line)
+        )
@@ -0,0 +1,100 @@
+import re
+from typing import Dict, List, Optional
+
+PAGE_MARKER = re.compile(r'^--- Page \d+ ---$')
+
+
+def split_into_chunks(text: str, max_chars: int = 6000, overlap_lines: int = 2,
+                      header_lines: Optional[List[str]] = None) -> List[str]:
+    """Split extracted text into prompt-sized chunks on page/row boundaries.
+
+    Whole pages (``--- Page N ---`` markers or form feeds) are packed together
+    until ``max_chars`` is reached; a page that is too large on its own is split
+    between lines. The last ``overlap_lines`` lines of each chunk are repeated
+    at the start of the next one so a product straddling a boundary is seen
+    whole at least once. ``header_lines`` (e.g. spreadsheet column headers) are
+    prepended to every chunk.
+    """
+    header = "\n".join(header_lines or [])
+    budget = max(1, max_chars - len(header))
+
+    # Units are whole pages, or single lines when a page exceeds the budget
+    units: List[List[str]] = []
+    for page in _split_pages(text):
+        if len("\n".join(page)) <= budget:
+            units.append(page)
+        else:
+            units.extend([line] for line in page)
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_size = 0
+    for unit in units:
+        unit_size = sum(len(line) + 1 for line in unit)
+        if current and current_size + unit_size > budget:
+            chunks.append(current)
+            current = current[-overlap_lines:] if overlap_lines > 0 else []
+            current_size = sum(len(line) + 1 for line in current)
+        current.extend(unit)
+        current_size += unit_size
+
+    if current:
+        chunks.append(current)
+
+    texts = []
+    for lines in chunks:
+        body = "\n".join(lines)
+        if body.strip():
+            texts.append(f"{header}\n{body}" if header else body)
+    return texts
+
+
+def _split_pages(text: str) -> List[List[str]]:
+    """Group lines into pages using OCR page markers and form feeds"""
+    pages: List[List[str]] = [[]]
+    for line in text.replace('\f', '\n\f\n').split('\n'):
+        if line == '\f' or PAGE_MARKER.match(line.strip()):
+            if pages[-1]:
+                pages.append([])
+            if line == '\f':
+                continue
+        pages[-1].append(line)
+    return [page for page in pages if page]
+
+
+def merge_products(product_lists: List[List[Dict]]) -> List[Dict]:
+    """Merge per-chunk product lists in chunk order, de-duplicating by model.
+
+    Products without a model fall back to name + price. Fields missing on the
+    first occurrence are filled from later duplicates.
+    """
+    merged: Dict[str, Dict] = {}
+    for products in product_lists:
+        for product in products or []:
+            if not isinstance(product, dict):
+                continue
+
+            key = _product_key(product)
+            if key is None:
+                continue
+
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = dict(product)
+            else:
+                for field, value in product.items():
+                    if existing.get(field) in (None, '', []) and value not in (None, '', []):
+                        existing[field] = value
+
+    return list(merged.values())
+
+
+def _product_key(product: Dict) -> Optional[str]:
+    model = re.sub(r'[^A-Z0-9]', '', str(product.get('model') or '').upper())
+    if model:
+        return f"model:{model}"
+
+    name = re.sub(r'\s+', ' ', str(product.get('name') or '')).strip().upper()
+    if not name:
+        return None
+    return f"name:{name}|{product.get('price')}"
@@ -183,6 +183,19 @@ class ProductStatusAnalyzer:
             total_products=len(compared_products)
         )
     
+    def apply_comparison(self, comparison_result: ComparisonResult, chunk_size: int = 500) -> Dict[str, Any]:
+        """Write PRICE/ADD/UPDATE results straight to the OpenCart database in bulk"""
+        result = self.db_manager.bulk_apply_product_changes(
+            comparison_result.products,
+            chunk_size=chunk_size
+        )
+        logging.info(
+            f"Applied comparison: {result['prices_updated']} repriced, "
+            f"{result['products_updated']} updated, {result['products_added']} added, "
+            f"{result['duplicates_skipped']} duplicates skipped"
+        )
+        return result
+    
     def get_status_summary(self, products: List[ProductData]) -> Dict[str, int]:
         """Get summary of product statuses"""
         summary = {status.value: 0 for status in ProductStatus}
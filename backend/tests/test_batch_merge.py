@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from comparison_engine.product_comparator import ProductComparator
+from workflow_engine.checkpoint_store import WorkflowCheckpointStore
+from workflow_engine.workflow_manager import WorkflowManager, WorkflowResult, WorkflowStatus, WorkflowStep
+
+
+class FakeStoreClient:
+    """Store whose search returns the same product for every term"""
+
+    def __init__(self, product):
+        self.product = product
+
+    def search_products(self, term):
+        return {'success': True, 'results': [self.product]}
+
+
+def _workflow(name):
+    return WorkflowResult(workflow_id=name, status=WorkflowStatus.PROCESSING,
+                          current_step=WorkflowStep.COMPARE, started_at=datetime.now().isoformat())
+
+
+def test_merge_dedupes_price_differences_by_store_product(tmp_path):
+    client = FakeStoreClient(
+        {'product_id': '42', 'model': 'AVR-X1800H', 'name': 'Denon AVR-X1800H 7.2 Ch. Receiver', 'price': 'R10,999.00'}
+    )
+    comparator = ProductComparator(client)
+    comparator.requests_per_second = None
+    # Two suppliers list the same receiver under slightly different model codes
+    comparisons = [
+        comparator.compare_products([{'model': 'AVR-X1800H', 'name': 'Denon AVR-X1800H 7.2 Ch. Receiver', 'price': 12999.0}]),
+        comparator.compare_products([{'model': 'AVRX1800H', 'name': 'Denon AVR-X1800H 7.2 Ch. Receiver', 'price': 12499.0}]),
+    ]
+    assert [c['summary']['price_differences'] for c in comparisons] == [1, 1]
+
+    manager = WorkflowManager(client, checkpoint_store=WorkflowCheckpointStore(str(tmp_path / 'checkpoints.db')))
+    batch = _workflow('batch')
+    merged = manager._step_merge_comparisons(batch, [_workflow('a'), _workflow('b')], comparisons)
+
+    assert len(merged['price_differences']) == 1
+    assert merged['price_differences'][0]['pdf_product']['price'] == 12999.0
+    assert merged['summary']['conflicting_prices'] == 1
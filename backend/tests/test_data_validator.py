@@ -0,0 +1,22 @@
+from pdf_processor.data_validator import DataValidator
+
+
+def test_columnar_and_per_product_validation_agree():
+    validator = DataValidator()
+    products = [
+        {'name': 'Denon AVR-X1800H', 'price': 12999.0, 'brand': 'Denon', 'category': 'AV Receivers'},
+        {'name': 'ab', 'price': 0.5, 'manufacturer': 'Acme', 'category': 'Gadgets'},
+        {'name': '', 'price': 0},
+        {'name': 'x' * 300, 'price': 2000000.0, 'manufacturer': 'yamaha'},
+    ]
+
+    per_product = validator.validate_product_batch(products)
+    columnar = validator.validate_columns(products)
+
+    for key in ('valid_products', 'average_confidence', 'confidence_by_index', 'errors_by_index'):
+        assert columnar[key] == per_product[key]
+    assert columnar['flag_counts']['Unknown brand'] == 1
+    assert columnar['flag_counts']['Price seems very high'] == 1
+    assert per_product['results'][3]['validation'].warnings == [
+        'Product name too long (maximum 200 characters)', 'Price seems very high (R2000000.0)'
+    ]
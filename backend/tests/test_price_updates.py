@@ -0,0 +1,40 @@
+from automation_engine.product_automator import ProductAutomator
+from comparison_engine.product_comparator import ProductComparator
+
+
+class FakeStoreClient:
+    """Store with one product; records the price writes it receives"""
+
+    def __init__(self, products):
+        self.products = products
+        self.updates = []
+
+    def search_products(self, term):
+        results = [p for p in self.products if term.lower() in (p['model'] + ' ' + p['name']).lower()]
+        return {'success': True, 'results': results}
+
+    def create_product(self, product_data):
+        return {'success': True, 'data': {'product_id': 999}}
+
+    def update_product(self, product_id, product_data):
+        self.updates.append((product_id, product_data))
+        return {'success': True}
+
+
+def test_update_prices_batch_uses_comparator_output():
+    client = FakeStoreClient([
+        {'product_id': '42', 'model': 'AVR-X1800H', 'name': 'Denon AVR-X1800H 7.2 Ch. Receiver', 'price': 'R10,999.00'}
+    ])
+    comparator = ProductComparator(client)
+    comparator.requests_per_second = None
+    comparison = comparator.compare_products([
+        {'model': 'AVR-X1800H', 'name': 'Denon AVR-X1800H 7.2 Ch. Receiver', 'price': 12999.0, 'brand': 'Denon'}
+    ])
+    assert comparison['summary']['price_differences'] == 1
+
+    automator = ProductAutomator(client)
+    automator.requests_per_second = None
+    result = automator.update_prices_batch(comparison['price_differences'])
+
+    assert result['summary']['successful_updates'] == 1
+    assert client.updates == [('42', {'price': '12999.0'})]
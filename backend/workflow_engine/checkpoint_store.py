@@ -0,0 +1,104 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, is_dataclass
+from enum import Enum
+from typing import Dict, List, Optional
+
+
+def _json_default(value):
+    """Serialize the dataclasses, enums and arrays that step results carry"""
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class WorkflowCheckpointStore:
+    """Per-step workflow outputs persisted in SQLite, keyed by workflow id and step.
+
+    A failed workflow keeps its checkpoints so it can be resumed from the
+    last completed step instead of redoing extraction and parsing; they are
+    dropped once the workflow completes or is cancelled.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv(
+            'WORKFLOW_CHECKPOINT_PATH',
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'workflow_checkpoints.db')
+        )
+        self._create_schema()
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def _create_schema(self):
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    workflow_id TEXT NOT NULL,
+                    step TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (workflow_id, step)
+                );
+            """)
+
+    def save(self, workflow_id: str, step: str, value: Dict):
+        """Store (or replace) the output of one step"""
+        payload = json.dumps(value, default=_json_default)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO checkpoints (workflow_id, step, value, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(workflow_id, step) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    (workflow_id, step, payload, time.time())
+                )
+        except sqlite3.Error as e:
+            # A missed checkpoint only costs redone work on resume
+            print(f"⚠️ Workflow checkpoint write failed: {e}")
+
+    def load(self, workflow_id: str) -> Dict[str, Dict]:
+        """All checkpoints of a workflow, by step"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT step, value FROM checkpoints WHERE workflow_id = ?", (workflow_id,)
+            ).fetchall()
+        return {step: json.loads(value) for step, value in rows}
+
+    def delete(self, workflow_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE workflow_id = ?", (workflow_id,))
+
+    def list_workflow_ids(self) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT DISTINCT workflow_id FROM checkpoints").fetchall()
+        return [row[0] for row in rows]
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_shared_checkpoint_store() -> WorkflowCheckpointStore:
+    """Process-wide checkpoint store used by the workflow manager"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = WorkflowCheckpointStore()
+        return _shared_store
@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class DagStep:
+    """A unit of work and the names of the results it consumes"""
+    name: str
+    func: Callable[..., Any]  # Called with one keyword argument per input
+    inputs: List[str] = field(default_factory=list)
+    optional: bool = False  # A failure yields None for dependents instead of failing the run
+
+
+class DagExecutor:
+    """Run steps as soon as their inputs are available, independent steps concurrently.
+
+    Inputs name either another step or a value passed to ``run``. The first
+    failing required step stops new steps from starting; steps already
+    running are allowed to finish. Every step's timing is recorded.
+    """
+
+    def __init__(self, max_workers: int = 4, cancel_check: Optional[Callable[[], None]] = None):
+        self.max_workers = max_workers
+        self.cancel_check = cancel_check  # Raises to stop scheduling further steps
+        self.steps: Dict[str, DagStep] = {}
+
+    def add(self, name: str, func: Callable[..., Any], inputs: Optional[List[str]] = None,
+            optional: bool = False) -> 'DagExecutor':
+        """Register a step; returns the executor so calls can be chained"""
+        if name in self.steps:
+            raise ValueError(f"Duplicate step: {name}")
+        self.steps[name] = DagStep(name, func, list(inputs or []), optional)
+        return self
+
+    def _validate(self, available: List[str]):
+        """Reject unknown inputs and cycles before anything runs"""
+        known = set(available) | set(self.steps)
+        for step in self.steps.values():
+            missing = [name for name in step.inputs if name not in known]
+            if missing:
+                raise ValueError(f"Step '{step.name}' has unknown inputs: {missing}")
+
+        resolved = set(available)
+        pending = dict(self.steps)
+        while pending:
+            ready = [name for name, step in pending.items() if all(i in resolved for i in step.inputs)]
+            if not ready:
+                raise ValueError(f"Dependency cycle between steps: {sorted(pending)}")
+            for name in ready:
+                resolved.add(name)
+                del pending[name]
+
+    def run(self, initial: Optional[Dict[str, Any]] = None) -> Dict:
+        """Execute the graph; returns {'success', 'results', 'timings'} plus 'failed_step'/'error' on failure"""
+        results = dict(initial or {})
+        self._validate(list(results))
+
+        timings: Dict[str, Dict] = {}
+        pending = {name: step for name, step in self.steps.items() if name not in results}
+        running = {}
+        failure = None
+
+        def execute(step: DagStep):
+            started = time.time()
+            timings[step.name] = {'started_at': datetime.now().isoformat(), 'status': 'running'}
+            try:
+                return step.func(**{name: results[name] for name in step.inputs})
+            finally:
+                timings[step.name]['duration_seconds'] = round(time.time() - started, 3)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='dag') as executor:
+            while (pending or running) and not (failure and not running):
+                if failure is None:
+                    try:
+                        if self.cancel_check:
+                            self.cancel_check()
+                    except Exception as e:
+                        failure = (None, e)
+
+                if failure is None:
+                    ready = [name for name, step in pending.items() if all(i in results for i in step.inputs)]
+                    for name in ready:
+                        running[executor.submit(execute, pending.pop(name))] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        timings[name]['status'] = 'completed'
+                    except Exception as e:
+                        timings[name]['status'] = 'failed'
+                        timings[name]['error'] = str(e)
+                        if self.steps[name].optional:
+                            print(f"⚠️ Optional step '{name}' failed: {e}")
+                            results[name] = None
+                        elif failure is None:
+                            failure = (name, e)
+
+        for name in pending:
+            timings[name] = {'status': 'skipped'}
+
+        if failure is not None:
+            return {
+                'success': False,
+                'failed_step': failure[0],
+                'error': str(failure[1]),
+                'exception': failure[1],
+                'results': results,
+                'timings': timings
+            }
+
+        return {'success': True, 'results': results, 'timings': timings}
@@ -0,0 +1,317 @@
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Job kind -> "module:function" run by the workers; the function takes (payload, report)
+DEFAULT_HANDLERS = {
+    'pdf_processing': 'pdf_processor.page_pipeline:run_pdf_job',
+}
+
+
+class SQLiteJobQueue:
+    """Durable job queue in a local SQLite file, shared by the Flask workers and the worker processes.
+
+    A job is claimed under a lease that the worker renews with heartbeats;
+    if the worker dies the lease runs out and the job becomes claimable
+    again, up to ``max_attempts`` times. Higher ``priority`` runs first.
+    The queue is handed to worker processes, so it must stay picklable.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_attempts: int = 3):
+        self.db_path = db_path or os.getenv(
+            'JOB_QUEUE_PATH',
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'job_queue.db')
+        )
+        self.max_attempts = max_attempts
+        self._create_schema()
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived SQLite connection (safe to use from any thread or process)"""
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+    def _create_schema(self):
+        with self._connect() as conn:
+            # WAL lets status polls read while a worker writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    state TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    lease_expires_at REAL,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    completed_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority DESC, created_at);
+            """)
+
+    def enqueue(self, kind: str, payload: Dict, priority: int = 0, state: Optional[Dict] = None) -> str:
+        """Add a job and return its id"""
+        job_id = str(uuid.uuid4())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, priority, status, state, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload), priority, json.dumps(state or {}), datetime.now().isoformat())
+            )
+        return job_id
+
+    def claim(self, worker_id: str, kinds: List[str], lease_seconds: float) -> Optional[Dict]:
+        """Lease the highest-priority queued job, or one whose lease has expired"""
+        now = time.time()
+        placeholders = ','.join('?' * len(kinds))
+        with self._connect() as conn:
+            # Take the write lock up front so two workers can't claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE status = 'queued' AND kind IN ({placeholders}) "
+                "ORDER BY priority DESC, created_at LIMIT 1",
+                list(kinds)
+            ).fetchone()
+            if row is None:
+                return None
+
+            started_at = row['started_at'] or datetime.now().isoformat()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker_id = ?, lease_expires_at = ?, "
+                "attempts = attempts + 1, started_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, started_at, row['id'])
+            )
+
+        job = self._row_to_job(row)
+        job.update(status='running', worker_id=worker_id, attempts=row['attempts'] + 1, started_at=started_at)
+        return job
+
+    def _expire_leases(self, conn, now: float):
+        """Requeue running jobs whose worker stopped heartbeating; give up after max_attempts"""
+        expired = conn.execute(
+            "SELECT id, attempts, payload FROM jobs WHERE status = 'running' AND lease_expires_at < ?", (now,)
+        ).fetchall()
+        for row in expired:
+            if row['attempts'] >= self.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, worker_id = NULL, completed_at = ? WHERE id = ?",
+                    (f"Worker lost {row['attempts']} times", datetime.now().isoformat(), row['id'])
+                )
+                # No handler will run again to clean up the spooled upload
+                path = json.loads(row['payload']).get('path')
+                if path and os.path.exists(path):
+                    os.unlink(path)
+            else:
+                print(f"♻️ Requeueing job {row['id']} after lease expiry")
+                conn.execute("UPDATE jobs SET status = 'queued', worker_id = NULL WHERE id = ?", (row['id'],))
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float, state: Optional[Dict] = None) -> bool:
+        """Extend a lease and optionally store progress; False once the lease has been lost"""
+        with self._connect() as conn:
+            if state is None:
+                cursor = conn.execute(
+                    "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                    (time.time() + lease_seconds, job_id, worker_id)
+                )
+            else:
+                cursor = conn.execute(
+                    "UPDATE jobs SET lease_expires_at = ?, state = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                    (time.time() + lease_seconds, json.dumps(state, default=str), job_id, worker_id)
+                )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        return self._finish(job_id, worker_id, 'completed', result=json.dumps(result, default=str))
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._finish(job_id, worker_id, 'failed', error=error)
+
+    def _finish(self, job_id: str, worker_id: str, status: str, result: Optional[str] = None,
+                error: Optional[str] = None) -> bool:
+        """Record the outcome, only if this worker still holds the lease"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, worker_id = NULL, lease_expires_at = NULL, "
+                "completed_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (status, result, error, datetime.now().isoformat(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_stats(self) -> Dict:
+        """Job counts per status"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _row_to_job(row) -> Dict:
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'payload': json.loads(row['payload']),
+            'priority': row['priority'],
+            'status': row['status'],
+            'state': json.loads(row['state']) if row['state'] else {},
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'attempts': row['attempts'],
+            'worker_id': row['worker_id'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'completed_at': row['completed_at']
+        }
+
+
+def _resolve_handler(path: str) -> Callable:
+    module_name, function_name = path.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _worker_main(queue: SQLiteJobQueue, handlers: Dict[str, str], lease_seconds: float, poll_interval: float):
+    """Worker process loop: claim a job, run its handler while heartbeating, record the outcome"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    resolved = {kind: _resolve_handler(path) for kind, path in handlers.items()}
+
+    while True:
+        job = queue.claim(worker_id, list(resolved), lease_seconds)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        state = dict(job['state'])
+        stop = threading.Event()
+
+        def beat():
+            # Keeps the lease alive through long stages that don't report progress
+            while not stop.wait(lease_seconds / 3):
+                queue.heartbeat(job['id'], worker_id, lease_seconds)
+
+        def report(updates: Dict):
+            state.update(updates)
+            queue.heartbeat(job['id'], worker_id, lease_seconds, state)
+
+        heartbeat_thread = threading.Thread(target=beat, daemon=True)
+        heartbeat_thread.start()
+        try:
+            result = resolved[job['kind']](job['payload'], report)
+            if not queue.complete(job['id'], worker_id, result):
+                print(f"⚠️ Job {job['id']} lease was lost; result discarded")
+        except Exception as e:
+            queue.fail(job['id'], worker_id, str(e))
+        finally:
+            stop.set()
+            heartbeat_thread.join()
+
+
+class WorkerPool:
+    """Bounded pool of worker processes draining a SQLiteJobQueue.
+
+    CPU-bound jobs (OCR, parsing) run in separate processes, so throughput
+    scales with cores instead of contending for the web server's GIL.
+    Dead workers are replaced; their jobs are recovered through lease expiry.
+    """
+
+    def __init__(self, queue: SQLiteJobQueue, workers: Optional[int] = None, handlers: Optional[Dict[str, str]] = None,
+                 lease_seconds: float = 60.0, poll_interval: float = 0.5):
+        self.queue = queue
+        self.workers = workers or int(os.getenv('JOB_WORKERS', os.cpu_count() or 1))
+        self.handlers = handlers or DEFAULT_HANDLERS
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._processes: List[multiprocessing.Process] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start the worker processes and a supervisor thread that replaces dead ones"""
+        with self._lock:
+            if self._processes:
+                return
+            self._stopped.clear()
+            self._processes = [self._spawn() for _ in range(self.workers)]
+        threading.Thread(target=self._supervise, daemon=True).start()
+        print(f"👷 Started {self.workers} job worker processes")
+
+    def _spawn(self) -> multiprocessing.Process:
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(self.queue, self.handlers, self.lease_seconds, self.poll_interval),
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def _supervise(self):
+        while not self._stopped.wait(5):
+            with self._lock:
+                for index, process in enumerate(self._processes):
+                    if not process.is_alive():
+                        print(f"⚠️ Job worker {process.pid} exited ({process.exitcode}); restarting")
+                        self._processes[index] = self._spawn()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped.set()
+        with self._lock:
+            for process in self._processes:
+                process.terminate()
+            for process in self._processes:
+                process.join(timeout)
+            self._processes = []
+
+    def is_running(self) -> bool:
+        with self._lock:
+            return bool(self._processes)
+
+
+_shared_queue = None
+_shared_queue_lock = threading.Lock()
+
+
+def get_shared_job_queue() -> SQLiteJobQueue:
+    """Process-wide job queue used by the upload routes"""
+    global _shared_queue
+    with _shared_queue_lock:
+        if _shared_queue is None:
+            _shared_queue = SQLiteJobQueue(max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', 3)))
+        return _shared_queue
+
+
+if __name__ == '__main__':
+    # Standalone workers: python -m workflow_engine.job_queue (set JOB_EMBEDDED_WORKERS=0 for the web app)
+    pool = WorkerPool(get_shared_job_queue())
+    pool.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pool.stop()
@@ -1,11 +1,30 @@
 import os
+import shutil
 import uuid
 import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from .checkpoint_store import WorkflowCheckpointStore, get_shared_checkpoint_store
+from .dag import DagExecutor
+
+SPREADSHEET_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+WORKFLOW_FILE_EXTENSIONS = ('.pdf',) + SPREADSHEET_EXTENSIONS
+MAX_BATCH_FILES = int(os.getenv('WORKFLOW_MAX_BATCH_FILES', 100))
+# Uncompressed bytes extracted from zip uploads per batch
+MAX_BATCH_BYTES = int(os.getenv('WORKFLOW_MAX_BATCH_BYTES', 500 * 1024 * 1024))
+# Product lists merged across checkpointed comparison chunks
+COMPARISON_LISTS = ('missing_products', 'price_differences', 'exact_matches', 'detailed_results', 'search_errors')
+
+class WorkflowCancelled(Exception):
+    """Raised at a cancellation checkpoint once cancel_workflow has been called"""
+
 class WorkflowStatus(Enum):
     """Workflow execution status"""
     PENDING = "pending"
@@ -48,25 +67,53 @@ class WorkflowResult:
     products_missing: int = 0
     products_created: int = 0
     products_updated: int = 0
+    pages_processed: int = 0
+    page_count: int = 0
+    products_quarantined: int = 0
+    resume_count: int = 0
+    resumed_from: Optional[str] = None  # Last checkpointed step of the most recent resume
+    # Per DAG step: started_at, duration_seconds and status
+    step_timings: Dict[str, Dict] = None
+    batch_id: Optional[str] = None  # Set on the per-file workflows of a batch
+    file_workflow_ids: List[str] = None  # Set on a batch: its per-file workflows, in upload order
 
     errors: List[str] = None
     warnings: List[str] = None
+    # Products rejected by validation before comparison, with the reasons
+    quarantined_products: List[Dict] = None
 
     def __post_init__(self):
         if self.errors is None:
             self.errors = []
         if self.warnings is None:
             self.warnings = []
+        if self.quarantined_products is None:
+            self.quarantined_products = []
+        if self.step_timings is None:
+            self.step_timings = {}
+        if self.file_workflow_ids is None:
+            self.file_workflow_ids = []
 
 class WorkflowManager:
     """Orchestrate the complete product management workflow"""
 
-    def __init__(self, opencart_client):
+    def __init__(self, opencart_client, max_concurrent: Optional[int] = None,
+                 checkpoint_store: Optional[WorkflowCheckpointStore] = None, catalog_snapshot=None):
         self.opencart_client = opencart_client
+        self.catalog_snapshot = catalog_snapshot  # Optional local CatalogSnapshot, refreshed during extraction
         self.workflows = {}  # In-memory storage (would use database in production)
+        # Step outputs survive failures and restarts so resume_workflow can skip finished work
+        self.checkpoints = checkpoint_store or get_shared_checkpoint_store()
+        # Bounded: extra workflows wait in the executor queue instead of all running at once
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent or int(os.getenv('WORKFLOW_MAX_CONCURRENT', 2)),
+            thread_name_prefix='workflow'
+        )
+        self._futures = {}
+        self._cancel_events = {}
 
     def start_workflow(self, pdf_file, options: Dict = None) -> str:
-        """Start a new workflow execution"""
+        """Save the upload and queue the workflow; returns the id without waiting for it to run"""
         workflow_id = str(uuid.uuid4())
 
         # Initialize workflow result
@@ -81,28 +128,238 @@ class WorkflowManager:
         # Store workflow
         self.workflows[workflow_id] = workflow_result
 
-        # Default options
-        if options is None:
-            options = {}
+        default_options = self._workflow_options(options)
+
+        # Step 1 runs inline: the uploaded file is only readable while the request is open
+        upload_result = self._step_upload_pdf(pdf_file)
+        workflow_result.upload_result = upload_result
 
+        if not upload_result['success']:
+            workflow_result.status = WorkflowStatus.FAILED
+            workflow_result.errors.append(f"Upload failed: {upload_result['error']}")
+            workflow_result.completed_at = datetime.now().isoformat()
+            return workflow_id
+
+        self.checkpoints.save(workflow_id, 'workflow', {
+            'options': default_options,
+            'upload_result': upload_result,
+            'pdf_filename': workflow_result.pdf_filename,
+            'started_at': workflow_result.started_at
+        })
+
+        # Steps 2-6 run in the background
+        self._submit(workflow_result, upload_result, default_options, {})
+
+        return workflow_id
+
+    @staticmethod
+    def _workflow_options(options: Optional[Dict]) -> Dict:
+        """Caller options over the defaults"""
         default_options = {
             'auto_create_missing': True,
             'auto_update_prices': False,
             'validation_threshold': 0.7,
             'price_tolerance_percent': 5.0,
             'batch_size': 10,
+            'spreadsheet_batch_size': 1000,
+            'compare_checkpoint_size': 50,
+            'prefetch_catalog': True,
+            'max_parallel_files': 4,
             'dry_run': False
         }
-        default_options.update(options)
+        default_options.update(options or {})
+        return default_options
+
+    def start_batch_workflow(self, files: List, options: Dict = None) -> str:
+        """Queue one workflow over many pricelists (zip archives are expanded); returns the batch id.
+
+        Every file is extracted and compared concurrently against one catalog
+        snapshot and one search cache, then a single automation pass runs over
+        the merged, de-duplicated results. Each file also gets its own workflow
+        id for per-file status; a file that fails does not stop the others and
+        can be resumed on its own.
+        """
+        batch_id = str(uuid.uuid4())
+        batch = WorkflowResult(
+            workflow_id=batch_id,
+            status=WorkflowStatus.PENDING,
+            current_step=WorkflowStep.UPLOAD,
+            started_at=datetime.now().isoformat(),
+            pdf_filename=f"{len(files)} uploaded files"
+        )
+        self.workflows[batch_id] = batch
+        options = self._workflow_options(options)
+
+        # Step 1 runs inline, as for single workflows
+        uploads = []
+        for upload_file in files:
+            filename = getattr(upload_file, 'filename', '') or ''
+            if filename.lower().endswith('.zip'):
+                upload_results = self._step_upload_zip(
+                    upload_file,
+                    max_files=max(0, MAX_BATCH_FILES - len(uploads)),
+                    max_bytes=max(0, MAX_BATCH_BYTES - sum(u['size'] for u in uploads))
+                )
+            else:
+                upload_results = [self._step_upload_pdf(upload_file)]
+
+            for upload_result in upload_results:
+                if upload_result['success']:
+                    uploads.append(upload_result)
+                else:
+                    batch.warnings.append(f"Skipped {upload_result.get('filename', filename)}: {upload_result['error']}")
 
-        # Execute workflow asynchronously (in a real app, this would be queued)
+        if len(uploads) > MAX_BATCH_FILES:
+            batch.warnings.append(f"Only the first {MAX_BATCH_FILES} of {len(uploads)} files are processed")
+            for upload_result in uploads[MAX_BATCH_FILES:]:
+                os.unlink(upload_result['filepath'])
+            uploads = uploads[:MAX_BATCH_FILES]
+
+        if not uploads:
+            batch.status = WorkflowStatus.FAILED
+            batch.errors.append("Upload failed: no PDF, Excel or CSV files in the batch")
+            batch.completed_at = datetime.now().isoformat()
+            return batch_id
+
+        batch.pdf_filename = f"{len(uploads)} files"
+        for upload_result in uploads:
+            workflow = WorkflowResult(
+                workflow_id=str(uuid.uuid4()),
+                status=WorkflowStatus.PENDING,
+                current_step=WorkflowStep.UPLOAD,
+                started_at=batch.started_at,
+                pdf_filename=upload_result['filename'],
+                upload_result=upload_result,
+                batch_id=batch_id
+            )
+            self.workflows[workflow.workflow_id] = workflow
+            batch.file_workflow_ids.append(workflow.workflow_id)
+            # Lets a file that fails inside the batch be resumed as a standalone workflow
+            self.checkpoints.save(workflow.workflow_id, 'workflow', {
+                'options': options,
+                'upload_result': upload_result,
+                'pdf_filename': workflow.pdf_filename,
+                'started_at': workflow.started_at
+            })
+
+        self._cancel_events[batch_id] = threading.Event()
         try:
-            self._execute_workflow(workflow_id, pdf_file, default_options)
+            self._futures[batch_id] = self._executor.submit(self._execute_batch, batch_id, options)
         except Exception as e:
-            workflow_result.status = WorkflowStatus.FAILED
-            workflow_result.errors.append(f"Workflow execution failed: {str(e)}")
+            batch.status = WorkflowStatus.FAILED
+            batch.errors.append(f"Workflow execution failed: {str(e)}")
+            batch.completed_at = datetime.now().isoformat()
+            self._finish_batch(batch_id)
+
+        return batch_id
+
+    def resume_workflow(self, workflow_id: str) -> bool:
+        """Re-run a failed (or interrupted) workflow from its last checkpointed step"""
+        if workflow_id in self._cancel_events:
+            return False  # Still queued or running
+
+        checkpoints = self.checkpoints.load(workflow_id)
+        meta = checkpoints.pop('workflow', None)
+        if meta is None:
+            return False
+
+        workflow = self.workflows.get(workflow_id)
+        if workflow is None:
+            # Lost from memory (e.g. server restart); rebuild it from the checkpoint
+            workflow = WorkflowResult(
+                workflow_id=workflow_id,
+                status=WorkflowStatus.FAILED,
+                current_step=WorkflowStep.UPLOAD,
+                started_at=meta['started_at'],
+                pdf_filename=meta['pdf_filename'],
+                upload_result=meta['upload_result']
+            )
+            self.workflows[workflow_id] = workflow
+        elif workflow.status != WorkflowStatus.FAILED:
+            return False
+
+        upload_result = meta['upload_result']
+        is_spreadsheet = upload_result['filepath'].lower().endswith(SPREADSHEET_EXTENSIONS)
+        needs_file = is_spreadsheet or 'filtered' not in checkpoints
+        if needs_file and not os.path.exists(upload_result['filepath']):
+            workflow.errors.append("Cannot resume: the uploaded file is no longer available")
+            return False
+
+        workflow.warnings.extend(f"Resumed after: {error}" for error in workflow.errors)
+        workflow.errors = []
+        workflow.status = WorkflowStatus.PENDING
+        workflow.completed_at = None
+        workflow.resume_count += 1
+        workflow.resumed_from = self._last_checkpoint(checkpoints)
+        print(f"⏩ Resuming workflow {workflow_id} from {workflow.resumed_from or 'the start'}")
+
+        self._submit(workflow, upload_result, meta['options'], checkpoints)
+        return True
+
+    @staticmethod
+    def _last_checkpoint(checkpoints: Dict) -> Optional[str]:
+        for step in ('comparison', 'spreadsheet', 'filtered'):
+            if step in checkpoints:
+                return step
+        return None
+
+    def _submit(self, workflow: 'WorkflowResult', upload_result: Dict, options: Dict, checkpoints: Dict):
+        """Queue steps 2-6 on the bounded executor"""
+        workflow_id = workflow.workflow_id
+        self._cancel_events[workflow_id] = threading.Event()
+        try:
+            self._futures[workflow_id] = self._executor.submit(
+                self._execute_workflow, workflow_id, upload_result, options, checkpoints
+            )
+        except Exception as e:
+            workflow.status = WorkflowStatus.FAILED
+            workflow.errors.append(f"Workflow execution failed: {str(e)}")
+            self._finish_workflow(workflow_id)
+
+    def cancel_workflow(self, workflow_id: str) -> bool:
+        """Request cancellation; a queued workflow stops at once, a running one at its next checkpoint"""
+        workflow = self.workflows.get(workflow_id)
+        cancel_event = self._cancel_events.get(workflow_id)
+        if workflow is None or cancel_event is None:
+            return False
+
+        cancel_event.set()
+        future = self._futures.get(workflow_id)
+        if future is not None and future.cancel():
+            # Never started, so nothing else will record the cancellation
+            workflow.status = WorkflowStatus.CANCELLED
+            workflow.completed_at = datetime.now().isoformat()
+            if workflow.file_workflow_ids:
+                self._finish_batch(workflow_id)
+            else:
+                self._finish_workflow(workflow_id)
 
-        return workflow_id
+        print(f"🛑 Cancellation requested for workflow {workflow_id}")
+        return True
+
+    def _check_cancelled(self, workflow_id: str):
+        """Cancellation checkpoint, called between steps, pages, batches and products"""
+        cancel_event = self._cancel_events.get(workflow_id)
+        if cancel_event is not None and cancel_event.is_set():
+            raise WorkflowCancelled(f"Workflow {workflow_id} cancelled")
+
+    def _finish_workflow(self, workflow_id: str):
+        """Drop execution bookkeeping once a workflow has stopped.
+
+        A failed workflow keeps its upload and checkpoints for resume_workflow;
+        otherwise both are removed.
+        """
+        self._cancel_events.pop(workflow_id, None)
+        self._futures.pop(workflow_id, None)
+
+        workflow = self.workflows[workflow_id]
+        if workflow.status == WorkflowStatus.FAILED:
+            return
+
+        self.checkpoints.delete(workflow_id)
+        upload_result = workflow.upload_result or {}
+        if upload_result.get('filepath') and os.path.exists(upload_result['filepath']):
+            os.unlink(upload_result['filepath'])
 
     def get_workflow_status(self, workflow_id: str) -> Optional[Dict]:
         """Get current workflow status"""
@@ -112,107 +369,229 @@ class WorkflowManager:
         workflow = self.workflows[workflow_id]
         return asdict(workflow)
 
-    def _execute_workflow(self, workflow_id: str, pdf_file, options: Dict):
-        """Execute the complete workflow"""
+    def _execute_workflow(self, workflow_id: str, upload_result: Dict, options: Dict,
+                          checkpoints: Optional[Dict] = None):
+        """Execute steps 2-6 of the workflow on an executor thread, skipping checkpointed work.
+
+        The steps run as a DAG: the catalog prefetch overlaps extraction, and
+        creating missing products overlaps price updates once comparison is done.
+        """
+        checkpoints = checkpoints or {}
         workflow = self.workflows[workflow_id]
         start_time = datetime.now()
+        cancel_check = lambda: self._check_cancelled(workflow_id)
 
         try:
+            cancel_check()
             workflow.status = WorkflowStatus.PROCESSING
 
-            # Step 1: Upload and save PDF
-            workflow.current_step = WorkflowStep.UPLOAD
-            upload_result = self._step_upload_pdf(pdf_file)
-            workflow.upload_result = upload_result
+            dag = self._build_dag(workflow, options, checkpoints, cancel_check)
+            run = dag.run({'upload': upload_result})
+            workflow.step_timings = run['timings']
+
+            if not run['success']:
+                raise run['exception']
+
+            if run['results']['comparison'] is None:
+                workflow.warnings.append("No products passed validation threshold")
 
-            if not upload_result['success']:
-                raise Exception(f"Upload failed: {upload_result['error']}")
+            # Complete workflow
+            workflow.current_step = WorkflowStep.COMPLETE
+            workflow.status = WorkflowStatus.COMPLETED
+            workflow.completed_at = datetime.now().isoformat()
+            workflow.total_duration = (datetime.now() - start_time).total_seconds()
 
-            # Step 2: Extract text from PDF
-            workflow.current_step = WorkflowStep.EXTRACT
-            extraction_result = self._step_extract_text(upload_result['filepath'])
-            workflow.extraction_result = extraction_result
+        except Exception as e:
+            # Steps report a cancellation abort as their own failure; the cancel flag tells them apart
+            if self._cancel_events[workflow_id].is_set():
+                workflow.status = WorkflowStatus.CANCELLED
+                print(f"🛑 Workflow {workflow_id} cancelled during {workflow.current_step.value}")
+            else:
+                workflow.status = WorkflowStatus.FAILED
+                workflow.errors.append(str(e))
+            workflow.completed_at = datetime.now().isoformat()
+            workflow.total_duration = (datetime.now() - start_time).total_seconds()
 
-            if not extraction_result['success']:
-                raise Exception(f"Text extraction failed: {extraction_result['error']}")
+        finally:
+            self._finish_workflow(workflow_id)
 
-            # Step 3: Parse products from text
-            workflow.current_step = WorkflowStep.PARSE
-            parsing_result = self._step_parse_products(extraction_result['text'])
-            workflow.parsing_result = parsing_result
+    def _execute_batch(self, batch_id: str, options: Dict):
+        """Run steps 2-5 of every file of a batch concurrently, then one automation pass over their merged results"""
+        from comparison_engine.search_cache import SearchCache
 
-            if not parsing_result['success']:
-                raise Exception(f"Product parsing failed: {parsing_result['error']}")
+        batch = self.workflows[batch_id]
+        files = [self.workflows[workflow_id] for workflow_id in batch.file_workflow_ids]
+        start_time = datetime.now()
+        cancel_check = lambda: self._check_cancelled(batch_id)
 
-            workflow.products_extracted = parsing_result['products_found']
+        try:
+            cancel_check()
+            batch.status = WorkflowStatus.PROCESSING
+            batch.current_step = WorkflowStep.EXTRACT
+            for workflow in files:
+                workflow.status = WorkflowStatus.PROCESSING
+
+            # Suppliers list many of the same products: each distinct search runs once per batch
+            search_cache = SearchCache()
+            dag = DagExecutor(max_workers=max(1, options['max_parallel_files']) + 1, cancel_check=cancel_check)
+            dag.add('catalog', lambda: self._step_prefetch_catalog(options), optional=True)
+
+            # Files extract concurrently, so they split the cores for OCR instead of each taking all of them
+            concurrent_files = min(len(files), max(1, options['max_parallel_files']))
+            ocr_workers = max(1, (os.cpu_count() or 1) // concurrent_files)
+
+            initial = {}
+            for index, workflow in enumerate(files):
+                suffix = f':{index}'
+                initial['upload' + suffix] = workflow.upload_result
+                # Optional: a file that fails only fails its own workflow
+                self._add_file_steps(dag, workflow, options, {}, cancel_check, suffix, search_cache,
+                                     optional=True, ocr_workers=ocr_workers)
+
+            file_steps = [f'comparison:{index}' for index in range(len(files))]
+            dag.add('comparison', lambda **comparisons: self._step_merge_comparisons(
+                        batch, files, [comparisons[name] for name in file_steps]),
+                    inputs=file_steps)
+            self._add_automation_steps(dag, batch, options, cancel_check)
+
+            run = dag.run(initial)
+            batch.step_timings = run['timings']
+            for index, workflow in enumerate(files):
+                suffix = f':{index}'
+                workflow.step_timings = {
+                    name: timing for name, timing in run['timings'].items() if name.endswith(suffix)
+                }
+                errors = [timing['error'] for timing in workflow.step_timings.values() if timing.get('error')]
+                if errors:
+                    workflow.status = WorkflowStatus.FAILED
+                    workflow.errors.extend(errors)
+                    batch.warnings.append(f"{workflow.pdf_filename} failed: {errors[0]}")
 
-            # Step 4: Validate and clean product data
-            workflow.current_step = WorkflowStep.VALIDATE
-            validation_result = self._step_validate_products(parsing_result['products'])
-            workflow.validation_result = validation_result
+            if not run['success']:
+                raise run['exception']
+
+            if all(workflow.status == WorkflowStatus.FAILED for workflow in files):
+                raise Exception("Every file in the batch failed")
+
+            if run['results']['comparison'] is None:
+                batch.warnings.append("No products passed validation threshold")
+
+            batch.current_step = WorkflowStep.COMPLETE
+            batch.status = WorkflowStatus.COMPLETED
 
-            # Filter products based on validation threshold
-            valid_products = self._filter_valid_products(
-                parsing_result['products'], 
-                options['validation_threshold']
+        except Exception as e:
+            if self._cancel_events[batch_id].is_set():
+                batch.status = WorkflowStatus.CANCELLED
+                print(f"🛑 Batch workflow {batch_id} cancelled during {batch.current_step.value}")
+            else:
+                batch.status = WorkflowStatus.FAILED
+                batch.errors.append(str(e))
+
+        finally:
+            batch.completed_at = datetime.now().isoformat()
+            batch.total_duration = (datetime.now() - start_time).total_seconds()
+            self._finish_batch(batch_id)
+
+    def _finish_batch(self, batch_id: str):
+        """Settle the per-file workflows once the batch has stopped"""
+        batch = self.workflows[batch_id]
+        for workflow_id in batch.file_workflow_ids:
+            workflow = self.workflows[workflow_id]
+            if workflow.status in (WorkflowStatus.PENDING, WorkflowStatus.PROCESSING):
+                # Their results went into the batch's automation pass, so they share its outcome
+                workflow.status = batch.status
+                workflow.errors.extend(batch.errors)
+                if batch.status == WorkflowStatus.COMPLETED:
+                    workflow.current_step = WorkflowStep.COMPLETE
+            workflow.completed_at = batch.completed_at
+            self._finish_workflow(workflow_id)
+        self._finish_workflow(batch_id)
+
+    def _build_dag(self, workflow: WorkflowResult, options: Dict, checkpoints: Dict,
+                   cancel_check: Callable[[], None]) -> DagExecutor:
+        """Wire the workflow steps by their inputs; 'upload' is supplied when the DAG runs"""
+        dag = DagExecutor(max_workers=4, cancel_check=cancel_check)
+        dag.add('catalog', lambda: self._step_prefetch_catalog(options), optional=True)
+        self._add_file_steps(dag, workflow, options, checkpoints, cancel_check)
+        # A resumed run may follow an automation pass that died part-way: check the store first
+        self._add_automation_steps(dag, workflow, options, cancel_check, verify_existing=bool(checkpoints))
+        return dag
+
+    def _add_file_steps(self, dag: DagExecutor, workflow: WorkflowResult, options: Dict, checkpoints: Dict,
+                        cancel_check: Callable[[], None], suffix: str = '', search_cache=None,
+                        optional: bool = False, ocr_workers: Optional[int] = None):
+        """Steps 2-5 for one file: 'upload<suffix>' and 'catalog' in, 'comparison<suffix>' out"""
+
+        def spreadsheet_comparison(upload, catalog):
+            # Steps 2-5: Parse, validate and compare the sheet in fixed-size row batches
+            workflow.current_step = WorkflowStep.PARSE
+            comparison_result = self._step_stream_spreadsheet(
+                workflow, upload['filepath'], options, cancel_check, checkpoints.get('spreadsheet'),
+                catalog, search_cache
             )
+            workflow.comparison_result = comparison_result
+            if not comparison_result['success']:
+                raise Exception(f"Spreadsheet processing failed: {comparison_result['error']}")
+            return comparison_result if comparison_result['summary']['total_pdf_products'] else None
 
-            if not valid_products:
-                workflow.warnings.append("No products passed validation threshold")
-                workflow.status = WorkflowStatus.COMPLETED
-                return
+        def valid_products(upload):
+            # Steps 2-4: Extract, parse, validate and filter page by page (or restore them)
+            return self._step_valid_products(workflow, upload, options, checkpoints, cancel_check, ocr_workers)
 
+        def comparison(products, catalog):
             # Step 5: Compare with OpenCart inventory
+            if not products:
+                return None
             workflow.current_step = WorkflowStep.COMPARE
-            comparison_result = self._step_compare_products(valid_products, options)
+            comparison_result = self._step_compare_checkpointed(
+                workflow, products, options, cancel_check, checkpoints.get('comparison'), catalog, search_cache
+            )
             workflow.comparison_result = comparison_result
-
             if not comparison_result['success']:
                 raise Exception(f"Product comparison failed: {comparison_result['error']}")
-
             workflow.products_missing = len(comparison_result['missing_products'])
+            return comparison_result
+
+        upload = 'upload' + suffix
+        if workflow.upload_result['filepath'].lower().endswith(SPREADSHEET_EXTENSIONS):
+            dag.add('comparison' + suffix, lambda **inputs: spreadsheet_comparison(inputs[upload], inputs['catalog']),
+                    inputs=[upload, 'catalog'], optional=optional)
+        else:
+            products = 'products' + suffix
+            dag.add(products, lambda **inputs: valid_products(inputs[upload]), inputs=[upload], optional=optional)
+            dag.add('comparison' + suffix, lambda **inputs: comparison(inputs[products], inputs['catalog']),
+                    inputs=[products, 'catalog'], optional=optional)
+
+    def _add_automation_steps(self, dag: DagExecutor, workflow: WorkflowResult, options: Dict,
+                              cancel_check: Callable[[], None], verify_existing: bool = False):
+        """Step 6 off 'comparison'; creates and price updates are independent of each other"""
+        from automation_engine.product_automator import ProductAutomator
+
+        if options['dry_run']:
+            automator = None
+        else:
+            # One automator for creates and updates, so they share its write rate limit
+            automator = ProductAutomator(self.opencart_client)
+            automator.batch_size = options['batch_size']
+            automator.checkpoint = cancel_check
+            automator.verify_existing = verify_existing
 
-            # Step 6: Automation (create/update products)
-            workflow.current_step = WorkflowStep.AUTOMATION
-
-            if not options['dry_run']:
-                automation_result = self._step_automate_products(comparison_result, options)
-                workflow.automation_result = automation_result
-
-                if automation_result['success']:
-                    workflow.products_created = automation_result.get('created_count', 0)
-                    workflow.products_updated = automation_result.get('updated_count', 0)
-                else:
-                    workflow.warnings.append(f"Automation had issues: {automation_result.get('error', 'Unknown error')}")
-            else:
-                workflow.automation_result = {
-                    'success': True,
-                    'message': 'Dry run - no products were actually created/updated',
-                    'would_create': len(comparison_result['missing_products']),
-                    'would_update': len(comparison_result.get('price_differences', []))
-                }
-
-            # Cleanup
-            if upload_result.get('filepath') and os.path.exists(upload_result['filepath']):
-                os.unlink(upload_result['filepath'])
-
-            # Complete workflow
-            workflow.current_step = WorkflowStep.COMPLETE
-            workflow.status = WorkflowStatus.COMPLETED
-            workflow.completed_at = datetime.now().isoformat()
-            workflow.total_duration = (datetime.now() - start_time).total_seconds()
-
-        except Exception as e:
-            workflow.status = WorkflowStatus.FAILED
-            workflow.errors.append(str(e))
-            workflow.completed_at = datetime.now().isoformat()
-            workflow.total_duration = (datetime.now() - start_time).total_seconds()
+        dag.add('create_missing', lambda comparison: self._step_create_missing(comparison, options, automator),
+                inputs=['comparison'])
+        dag.add('update_prices', lambda comparison: self._step_update_prices(comparison, options, automator),
+                inputs=['comparison'])
+        dag.add('automation', lambda comparison, create_missing, update_prices: self._step_automation_summary(
+                    workflow, comparison, options, create_missing, update_prices),
+                inputs=['comparison', 'create_missing', 'update_prices'])
 
     def _step_upload_pdf(self, pdf_file) -> Dict:
-        """Step 1: Upload and save PDF"""
+        """Step 1: Upload and save PDF (or spreadsheet)"""
         try:
+            filename = pdf_file.filename if hasattr(pdf_file, 'filename') else 'unknown.pdf'
+            suffix = os.path.splitext(filename)[1].lower() or '.pdf'
+
             # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
                 pdf_file.save(tmp_file.name)
 
                 return {
@@ -228,31 +607,152 @@ class WorkflowManager:
                 'error': str(e)
             }
 
-    def _step_extract_text(self, pdf_path: str) -> Dict:
-        """Step 2: Extract text from PDF"""
+    def _step_upload_zip(self, zip_file, max_files: int = MAX_BATCH_FILES,
+                         max_bytes: int = MAX_BATCH_BYTES) -> List[Dict]:
+        """Step 1 for archives: save up to max_files PDF, Excel and CSV members as their own uploads"""
+        zip_upload = self._step_upload_pdf(zip_file)
+        if not zip_upload['success']:
+            return [zip_upload]
+
+        uploads = []
+        extracted = 0
+        extracted_bytes = 0
+        try:
+            with zipfile.ZipFile(zip_upload['filepath']) as archive:
+                for member in archive.infolist():
+                    # Member names are only used for their extension and display name, never as paths
+                    filename = os.path.basename(member.filename)
+                    if member.is_dir() or member.filename.startswith('__MACOSX/') or filename.startswith('.'):
+                        continue
+                    suffix = os.path.splitext(filename)[1].lower()
+                    if suffix not in WORKFLOW_FILE_EXTENSIONS:
+                        continue
+
+                    if extracted >= max_files:
+                        uploads.append({'success': False, 'filename': zip_upload['filename'],
+                                        'error': f"Batch file limit of {MAX_BATCH_FILES} reached; "
+                                                 f"remaining archive members were not extracted"})
+                        break
+
+                    # zipfile stops reading at the declared size, so it bounds what is written
+                    if extracted_bytes + member.file_size > max_bytes:
+                        uploads.append({'success': False, 'filename': filename,
+                                        'error': f"Exceeds the batch size limit of {MAX_BATCH_BYTES} bytes "
+                                                 f"({member.file_size} bytes uncompressed)"})
+                        continue
+
+                    with archive.open(member) as source, \
+                            tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+                        shutil.copyfileobj(source, tmp_file)
+                    extracted += 1
+                    extracted_bytes += member.file_size
+
+                    uploads.append({
+                        'success': True,
+                        'filepath': tmp_file.name,
+                        'filename': filename,
+                        'size': os.path.getsize(tmp_file.name)
+                    })
+        except (zipfile.BadZipFile, OSError) as e:
+            uploads.append({'success': False, 'filename': zip_upload['filename'], 'error': f"Invalid zip archive: {e}"})
+        finally:
+            os.unlink(zip_upload['filepath'])
+
+        return uploads
+
+    def _step_valid_products(self, workflow: WorkflowResult, upload_result: Dict, options: Dict,
+                             checkpoints: Dict, cancel_check: Callable[[], None],
+                             ocr_workers: Optional[int] = None) -> List[Dict]:
+        """Steps 2-4 for PDFs: products that passed validation, restored from checkpoints when resuming"""
+        workflow_id = workflow.workflow_id
+        if 'filtered' in checkpoints:
+            workflow.extraction_result = checkpoints['extraction']
+            workflow.parsing_result = checkpoints['parsing']
+            workflow.validation_result = checkpoints['validation']
+            workflow.page_count = workflow.pages_processed = workflow.extraction_result['page_count']
+            workflow.products_extracted = workflow.parsing_result['products_found']
+            workflow.quarantined_products = checkpoints['filtered']['quarantined']
+            workflow.products_quarantined = len(workflow.quarantined_products)
+            return checkpoints['filtered']['valid_products']
+
+        workflow.current_step = WorkflowStep.EXTRACT
+        stream_result = self._step_stream_pages(workflow, upload_result['filepath'], cancel_check, ocr_workers)
+
+        if not stream_result['success']:
+            raise Exception(f"Page processing failed: {stream_result['error']}")
+
+        parsing_result = workflow.parsing_result
+
+        # Filter products based on validation threshold
+        valid_products, quarantined = self._filter_valid_products(
+            parsing_result['products'],
+            workflow.validation_result,
+            options['validation_threshold']
+        )
+        self._quarantine(workflow, quarantined)
+
+        self.checkpoints.save(workflow_id, 'extraction', workflow.extraction_result)
+        self.checkpoints.save(workflow_id, 'parsing', parsing_result)
+        self.checkpoints.save(workflow_id, 'validation', workflow.validation_result)
+        self.checkpoints.save(workflow_id, 'filtered', {
+            'valid_products': valid_products,
+            'quarantined': quarantined
+        })
+        return valid_products
+
+    def _step_stream_pages(self, workflow: WorkflowResult, pdf_path: str,
+                           cancel_check: Optional[Callable[[], None]] = None,
+                           ocr_workers: Optional[int] = None) -> Dict:
+        """Steps 2-4: Extract, parse and validate one page at a time.
+
+        Parsed products are added to the workflow as each page finishes, so
+        status polls see them before the whole document is done. ocr_workers
+        caps the OCR process pool (default: one process per core).
+        """
         try:
+            from pdf_processor.data_validator import DataValidator
             from pdf_processor.ocr_extractor import OCRExtractor
+            from pdf_processor.page_pipeline import iter_processed_pages, summarize_extraction
 
-            extractor = OCRExtractor()
-            result = extractor.extract_text_from_pdf(pdf_path)
-
-            return result
+            validator = DataValidator()
+            page_validations = []
+            page_methods = []
+            parsing_methods = set()
+            products = []
+
+            workflow.extraction_result = {'success': True, 'method': None, 'page_count': 0}
+            workflow.parsing_result = {'success': True, 'products_found': 0, 'products': products, 'method': None}
+
+            extractor = OCRExtractor(max_workers=ocr_workers)
+            for page in iter_processed_pages(pdf_path, extractor=extractor, validator=validator):
+                if cancel_check:
+                    cancel_check()
+                workflow.current_step = WorkflowStep.PARSE
+                page_methods.append(page['extraction_method'])
+                parsing_methods.add(page['parsing_method'])
+                page_validations.append(page['validation'])
+                products.extend(page['products'])
+                if page['extraction_warning']:
+                    workflow.warnings.append(page['extraction_warning'])
+
+                workflow.page_count = page['page_count']
+                workflow.pages_processed = page['page']
+                workflow.products_extracted = len(products)
+                workflow.parsing_result['products_found'] = len(products)
 
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
+            workflow.current_step = WorkflowStep.VALIDATE
+            workflow.extraction_result = {
+                'success': True,
+                'method': summarize_extraction(page_methods, workflow.page_count),
+                'page_count': workflow.page_count
             }
+            workflow.parsing_result['method'] = '+'.join(sorted(parsing_methods)) or None
 
-    def _step_parse_products(self, text: str) -> Dict:
-        """Step 3: Parse products from extracted text"""
-        try:
-            from pdf_processor.data_parser import DataParser
+            validation_result = validator.merge_batch_results(page_validations)
+            validation_result['cleaned_products'] = products
+            workflow.validation_result = validation_result
 
-            parser = DataParser()
-            result = parser.parse_text(text)
-
-            return result
+            return {'success': True}
 
         except Exception as e:
             return {
@@ -260,24 +760,118 @@ class WorkflowManager:
                 'error': str(e)
             }
 
-    def _step_validate_products(self, products: List[Dict]) -> Dict:
-        """Step 4: Validate and clean product data"""
+    def _step_stream_spreadsheet(self, workflow: WorkflowResult, path: str, options: Dict,
+                                 cancel_check: Optional[Callable[[], None]] = None,
+                                 resume: Optional[Dict] = None, search_client=None,
+                                 search_cache=None) -> Dict:
+        """Steps 2-5 for spreadsheets: each row batch is parsed, validated and compared before the next is read.
+
+        Only the comparison outcome (missing products and price differences)
+        is kept across batches, so memory stays flat however large the sheet.
+        Progress is checkpointed per batch; a resumed run skips batches that
+        were already compared.
+        """
         try:
+            from pdf_processor.spreadsheet_parser import SpreadsheetParser
             from pdf_processor.data_validator import DataValidator
 
+            parser = SpreadsheetParser(batch_size=options['spreadsheet_batch_size'])
             validator = DataValidator()
+            comparator = self._new_comparator(options, cancel_check, search_client, search_cache)
+
+            progress = resume or {
+                'batches_done': 0,
+                'products_extracted': 0,
+                'valid_count': 0,
+                'total_confidence': 0.0,
+                'compared': 0,
+                'exact_matches': 0,
+                'missing_products': [],
+                'price_differences': [],
+                'search_errors': [],
+                'quarantined_products': []
+            }
+            if resume:
+                print(f"⏩ Resuming spreadsheet after batch {progress['batches_done']}")
+            workflow.products_extracted = progress['products_extracted']
+            workflow.quarantined_products = progress['quarantined_products']
+            workflow.products_quarantined = len(workflow.quarantined_products)
+            workflow.products_missing = len(progress['missing_products'])
+            layout = None
+
+            for batch in parser.iter_product_batches(path):
+                if cancel_check:
+                    cancel_check()
+                layout = batch
+                if batch['batch'] <= progress['batches_done']:
+                    continue
+
+                workflow.current_step = WorkflowStep.VALIDATE
+                cleaned_products = [validator.clean_product_data(product) for product in batch['products']]
+                validation = validator.validate_columns(cleaned_products)
+
+                valid_products, quarantined = self._filter_valid_products(
+                    cleaned_products, validation, options['validation_threshold'],
+                    offset=workflow.products_extracted
+                )
+
+                if valid_products:
+                    workflow.current_step = WorkflowStep.COMPARE
+                    comparison = comparator.compare_products(valid_products)
+                    if not comparison['success']:
+                        return comparison
+
+                    progress['compared'] += len(valid_products)
+                    progress['exact_matches'] += comparison['summary']['exact_matches']
+                    progress['missing_products'].extend(comparison['missing_products'])
+                    progress['price_differences'].extend(comparison['price_differences'])
+                    progress['search_errors'].extend(comparison['search_errors'])
+                    workflow.products_missing = len(progress['missing_products'])
+
+                # The batch only counts once it has been compared
+                self._quarantine(workflow, quarantined)
+                workflow.products_extracted += len(cleaned_products)
+                progress['valid_count'] += validation['valid_products']
+                progress['total_confidence'] += sum(validation['confidence_by_index'].values())
+                progress['products_extracted'] = workflow.products_extracted
+                progress['batches_done'] = batch['batch']
+                self.checkpoints.save(workflow.workflow_id, 'spreadsheet', progress)
+
+            total = workflow.products_extracted
+            valid_count = progress['valid_count']
+            average_confidence = progress['total_confidence'] / total if total else 0.0
+            workflow.parsing_result = {
+                'success': True,
+                'method': 'spreadsheet_parsing',
+                'products_found': total,
+                'rows_processed': layout['rows_processed'],
+                'batches': layout['batch'],
+                'header_row': layout['header_row'],
+                'column_map': layout['column_map']
+            }
+            workflow.validation_result = {
+                'total_products': total,
+                'valid_products': valid_count,
+                'invalid_products': total - valid_count,
+                'average_confidence': round(average_confidence, 2),
+                'overall_quality': validator._get_quality_rating(average_confidence)
+            }
 
-            # Clean each product
-            cleaned_products = []
-            for product in products:
-                cleaned_product = validator.clean_product_data(product)
-                cleaned_products.append(cleaned_product)
-
-            # Validate the batch
-            validation_result = validator.validate_product_batch(cleaned_products)
-            validation_result['cleaned_products'] = cleaned_products
-
-            return validation_result
+            return {
+                'success': True,
+                'method': 'batched_search_comparison',
+                'summary': {
+                    'total_pdf_products': progress['compared'],
+                    'exact_matches': progress['exact_matches'],
+                    'price_differences': len(progress['price_differences']),
+                    'missing_products': len(progress['missing_products']),
+                    'search_errors': len(progress['search_errors']),
+                    'batches': layout['batch']
+                },
+                'missing_products': progress['missing_products'],
+                'price_differences': progress['price_differences'],
+                'search_errors': progress['search_errors']
+            }
 
         except Exception as e:
             return {
@@ -285,13 +879,39 @@ class WorkflowManager:
                 'error': str(e)
             }
 
-    def _step_compare_products(self, products: List[Dict], options: Dict) -> Dict:
+    def _new_comparator(self, options: Dict, cancel_check: Optional[Callable[[], None]] = None,
+                        search_client=None, search_cache=None):
+        """ProductComparator searching the prefetched catalog when there is one, the live store otherwise"""
+        from comparison_engine.product_comparator import ProductComparator
+
+        comparator = ProductComparator(search_client or self.opencart_client, shared_search_cache=search_cache)
+        comparator.price_tolerance_percent = options['price_tolerance_percent']
+        comparator.checkpoint = cancel_check
+        if search_client is not None:
+            comparator.requests_per_second = None  # Local searches need no store rate limit
+        return comparator
+
+    def _step_prefetch_catalog(self, options: Dict):
+        """Refresh the local catalog snapshot; returns it as the search source, or None to search the store"""
+        if self.catalog_snapshot is None or not options['prefetch_catalog']:
+            return None
+
+        sync_result = self.catalog_snapshot.sync()
+        if sync_result['success']:
+            return self.catalog_snapshot
+        if not self.catalog_snapshot.is_empty() and self.catalog_snapshot.get_status()['sync_in_progress']:
+            # Another workflow is refreshing it right now; the current copy is recent enough
+            return self.catalog_snapshot
+
+        print(f"⚠️ Catalog prefetch failed, comparing against the live store: {sync_result.get('error')}")
+        return None
+
+    def _step_compare_products(self, products: List[Dict], options: Dict,
+                               cancel_check: Optional[Callable[[], None]] = None, search_client=None,
+                               search_cache=None) -> Dict:
         """Step 5: Compare products with OpenCart inventory"""
         try:
-            from comparison_engine.product_comparator import ProductComparator
-
-            comparator = ProductComparator(self.opencart_client)
-            comparator.price_tolerance_percent = options['price_tolerance_percent']
+            comparator = self._new_comparator(options, cancel_check, search_client, search_cache)
 
             result = comparator.compare_products(products)
 
@@ -303,45 +923,211 @@ class WorkflowManager:
                 'error': str(e)
             }
 
-    def _step_automate_products(self, comparison_result: Dict, options: Dict) -> Dict:
-        """Step 6: Automate product creation/updates"""
-        try:
-            from automation_engine.product_automator import ProductAutomator
+    def _step_compare_checkpointed(self, workflow: WorkflowResult, products: List[Dict], options: Dict,
+                                   cancel_check: Optional[Callable[[], None]] = None,
+                                   partial: Optional[Dict] = None, search_client=None,
+                                   search_cache=None) -> Dict:
+        """Step 5 in chunks, checkpointing the merged result after each so a resume continues from the last compared product"""
+        partial = partial or {'compared': 0, **{key: [] for key in COMPARISON_LISTS}}
+        if partial['compared']:
+            print(f"⏩ Resuming comparison at product {partial['compared'] + 1}/{len(products)}")
+
+        chunk_size = max(1, options['compare_checkpoint_size'])
+        started = time.time()
+
+        for start in range(partial['compared'], len(products), chunk_size):
+            chunk = products[start:start + chunk_size]
+            result = self._step_compare_products(chunk, options, cancel_check, search_client, search_cache)
+            if not result['success']:
+                return result
+
+            for key in COMPARISON_LISTS:
+                partial[key].extend(result.get(key, []))
+            partial['compared'] = start + len(chunk)
+            self.checkpoints.save(workflow.workflow_id, 'comparison', partial)
+            workflow.products_missing = len(partial['missing_products'])
 
-            automator = ProductAutomator(self.opencart_client)
-            automator.batch_size = options['batch_size']
+        return {
+            'success': True,
+            'method': 'search_based_comparison',
+            'summary': {
+                'total_pdf_products': len(products),
+                'exact_matches': len(partial['exact_matches']),
+                'price_differences': len(partial['price_differences']),
+                'missing_products': len(partial['missing_products']),
+                'search_errors': len(partial['search_errors']),
+                'duration_seconds': round(time.time() - started, 2)
+            },
+            **{key: partial[key] for key in COMPARISON_LISTS}
+        }
 
-            created_count = 0
-            updated_count = 0
-            errors = []
+    @staticmethod
+    def _batch_product_key(product: Dict) -> str:
+        """Identify a pricelist product across suppliers by model (falling back to SKU, then name)"""
+        key = str(product.get('model') or product.get('sku') or '').strip().upper()
+        return key or ' '.join(str(product.get('name') or '').lower().split())
+
+    def _step_merge_comparisons(self, batch: WorkflowResult, files: List[WorkflowResult],
+                                comparisons: List[Optional[Dict]]) -> Optional[Dict]:
+        """Combine per-file comparisons, keeping the first file's entry for products several suppliers list"""
+        batch.current_step = WorkflowStep.COMPARE
+        merged = {'missing_products': {}, 'price_differences': {}}
+        duplicates = 0
+        conflicting_prices = 0
+
+        for workflow, comparison in zip(files, comparisons):
+            batch.products_extracted += workflow.products_extracted
+            batch.pages_processed += workflow.pages_processed
+            batch.products_quarantined += workflow.products_quarantined
+            if comparison is None:
+                continue
+
+            for product in comparison['missing_products']:
+                key = self._batch_product_key(product)
+                if key in merged['missing_products']:
+                    duplicates += 1
+                    continue
+                merged['missing_products'][key] = product
+
+            for difference in comparison.get('price_differences', []):
+                # Rows that matched the same store product write the same price
+                store_product = (difference.get('opencart_matches') or [{}])[0]
+                key = str(store_product.get('product_id') or store_product.get('id')
+                          or self._batch_product_key(difference.get('pdf_product') or {}))
+                kept = merged['price_differences'].get(key)
+                if kept is not None:
+                    duplicates += 1
+                    if (kept.get('pdf_product') or {}).get('price') != (difference.get('pdf_product') or {}).get('price'):
+                        conflicting_prices += 1
+                    continue
+                merged['price_differences'][key] = difference
+
+        if conflicting_prices:
+            batch.warnings.append(
+                f"{conflicting_prices} products have different prices across files; the first file's price is used"
+            )
 
-            # Create missing products
-            if options['auto_create_missing'] and comparison_result['missing_products']:
-                create_result = automator.create_products_batch(comparison_result['missing_products'])
+        compared = [comparison for comparison in comparisons if comparison is not None]
+        if not compared:
+            return None
 
-                if create_result['success']:
-                    created_count = create_result['summary']['successful_creations']
-                else:
-                    errors.append(f"Product creation failed: {create_result.get('error', 'Unknown error')}")
+        missing_products = list(merged['missing_products'].values())
+        price_differences = list(merged['price_differences'].values())
+        batch.products_missing = len(missing_products)
+        print(f"🧮 Merged {len(compared)} file comparisons: {len(missing_products)} missing, "
+              f"{len(price_differences)} price differences, {duplicates} duplicates dropped")
 
-            return {
-                'success': len(errors) == 0,
-                'created_count': created_count,
-                'updated_count': updated_count,
-                'errors': errors,
-                'message': f"Created {created_count} products, updated {updated_count} products"
-            }
+        batch.comparison_result = {
+            'success': True,
+            'method': 'batch_merged_comparison',
+            'summary': {
+                'files_compared': len(compared),
+                'total_pdf_products': sum(c['summary']['total_pdf_products'] for c in compared),
+                'missing_products': len(missing_products),
+                'price_differences': len(price_differences),
+                'duplicates_removed': duplicates,
+                'conflicting_prices': conflicting_prices
+            },
+            'missing_products': missing_products,
+            'price_differences': price_differences
+        }
+        return batch.comparison_result
 
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
+    def _step_create_missing(self, comparison_result: Optional[Dict], options: Dict, automator) -> Optional[Dict]:
+        """Step 6a: Create products missing from the store"""
+        if automator is None or comparison_result is None or not options['auto_create_missing']:
+            return None
+        if not comparison_result['missing_products']:
+            return None
+        return automator.create_products_batch(comparison_result['missing_products'])
+
+    def _step_update_prices(self, comparison_result: Optional[Dict], options: Dict, automator) -> Optional[Dict]:
+        """Step 6b: Update store prices that differ from the pricelist"""
+        if automator is None or comparison_result is None or not options['auto_update_prices']:
+            return None
+        if not comparison_result.get('price_differences'):
+            return None
+        return automator.update_prices_batch(comparison_result['price_differences'])
+
+    def _step_automation_summary(self, workflow: WorkflowResult, comparison_result: Optional[Dict], options: Dict,
+                                 create_result: Optional[Dict], update_result: Optional[Dict]) -> Optional[Dict]:
+        """Step 6: Combine the create and update outcomes into the automation result"""
+        if comparison_result is None:
+            return None
+
+        workflow.current_step = WorkflowStep.AUTOMATION
+        if options['dry_run']:
+            workflow.automation_result = {
+                'success': True,
+                'message': 'Dry run - no products were actually created/updated',
+                'would_create': len(comparison_result['missing_products']),
+                'would_update': len(comparison_result.get('price_differences', []))
             }
+            return workflow.automation_result
+
+        created_count = 0
+        updated_count = 0
+        errors = []
+
+        if create_result is not None:
+            if create_result['success']:
+                created_count = create_result['summary']['successful_creations']
+            else:
+                errors.append(f"Product creation failed: {create_result.get('error', 'Unknown error')}")
+
+        if update_result is not None:
+            if update_result['success']:
+                updated_count = update_result['summary']['successful_updates']
+            else:
+                errors.append(f"Price update failed: {update_result.get('error', 'Unknown error')}")
+
+        automation_result = {
+            'success': len(errors) == 0,
+            'created_count': created_count,
+            'updated_count': updated_count,
+            'errors': errors,
+            'message': f"Created {created_count} products, updated {updated_count} products"
+        }
+        workflow.automation_result = automation_result
+        workflow.products_created = created_count
+        workflow.products_updated = updated_count
+        if errors:
+            workflow.warnings.append(f"Automation had issues: {'; '.join(errors)}")
+        return automation_result
+
+    def _filter_valid_products(self, products: List[Dict], validation_result: Dict, threshold: float,
+                               offset: int = 0) -> Tuple[List[Dict], List[Dict]]:
+        """Split products into those passing validation at the confidence threshold and quarantined rejects"""
+        confidence_by_index = validation_result.get('confidence_by_index', {})
+        errors_by_index = validation_result.get('errors_by_index', {})
+        valid_products = []
+        quarantined = []
+
+        for index, product in enumerate(products):
+            confidence = confidence_by_index.get(index, 0.0)
+            reasons = list(errors_by_index.get(index, []))
+            if confidence < threshold:
+                reasons.append(f"Confidence {confidence:.2f} below threshold {threshold:.2f}")
+
+            if reasons:
+                quarantined.append({
+                    'index': offset + index,
+                    'product': product,
+                    'confidence': round(confidence, 2),
+                    'reasons': reasons
+                })
+            else:
+                valid_products.append(product)
+
+        return valid_products, quarantined
 
-    def _filter_valid_products(self, products: List[Dict], threshold: float) -> List[Dict]:
-        """Filter products based on validation confidence threshold"""
-        # For now, return all products since we don't have detailed validation scores per product
-        return products
+    def _quarantine(self, workflow: WorkflowResult, quarantined: List[Dict]):
+        """Record validation rejects on the workflow so they can be reviewed instead of compared"""
+        if not quarantined:
+            return
+        workflow.quarantined_products.extend(quarantined)
+        workflow.products_quarantined = len(workflow.quarantined_products)
+        print(f"🚧 Quarantined {len(quarantined)} products that failed validation")
 
     def get_workflow_summary(self, workflow_id: str) -> Optional[Dict]:
         """Get a summary of workflow execution"""
@@ -356,9 +1142,13 @@ class WorkflowManager:
             'current_step': workflow.current_step.value,
             'pdf_filename': workflow.pdf_filename,
             'duration': workflow.total_duration,
+            'batch_id': workflow.batch_id,
+            'file_workflow_ids': workflow.file_workflow_ids,
+            'step_durations': {name: timing.get('duration_seconds') for name, timing in workflow.step_timings.items()},
             'summary': {
                 'products_extracted': workflow.products_extracted,
                 'products_missing': workflow.products_missing,
+                'products_quarantined': workflow.products_quarantined,
                 'products_created': workflow.products_created,
                 'products_updated': workflow.products_updated
             },